@@ -10,6 +10,8 @@ import (
 )
 
 type TaskHandler interface {
+	// ClaimTasks claims every new event of a poll window in one round-trip before any is handled.
+	ClaimTasks(ctx context.Context, evs []*TaskCreatedEvent) error
 	HandleTask(ctx context.Context, ev *TaskCreatedEvent) error
 }
 
@@ -84,14 +86,23 @@ func (p *Poller) pollOnce(ctx context.Context, handler TaskHandler) error {
 		return err
 	}
 
+	var unseen []*TaskCreatedEvent
 	for _, ev := range events {
 		seen, err := p.store.SeenLog(ctx, p.chainID, ev.Raw.TxHash, ev.Raw.Index)
 		if err != nil {
 			return err
 		}
-		if seen {
-			continue
+		if !seen {
+			unseen = append(unseen, ev)
 		}
+	}
+	if len(unseen) > 0 {
+		if err := handler.ClaimTasks(ctx, unseen); err != nil {
+			return err
+		}
+	}
+
+	for _, ev := range unseen {
 		if err := handler.HandleTask(ctx, ev); err != nil {
 			return err
 		}
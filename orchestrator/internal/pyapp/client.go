@@ -70,6 +70,32 @@ func (c *Client) ClaimTask(ctx context.Context, req ClaimTaskRequest) (*ClaimTas
 	return &out, nil
 }
 
+type ClaimTaskBatchItem struct {
+	TaskID    uint64 `json:"task_id"`
+	InputHash string `json:"input_hash"`
+	Status    string `json:"status"`
+	UpdatedAt string `json:"updated_at"`
+	Error     string `json:"error"`
+}
+
+type claimTasksRequest struct {
+	Items []ClaimTaskRequest `json:"items"`
+}
+
+type claimTasksResponse struct {
+	Items []ClaimTaskBatchItem `json:"items"`
+}
+
+// ClaimTasks claims many tasks in one round-trip; each item carries its own status
+// ("created", "not_found" or "conflict").
+func (c *Client) ClaimTasks(ctx context.Context, reqs []ClaimTaskRequest) ([]ClaimTaskBatchItem, error) {
+	var out claimTasksResponse
+	if err := c.doJSON(ctx, http.MethodPost, "/tasks/claim/batch", claimTasksRequest{Items: reqs}, &out); err != nil {
+		return nil, err
+	}
+	return out.Items, nil
+}
+
 type InputPayload struct {
 	Text           string `json:"text"`
 	Mode           string `json:"mode"`
@@ -34,29 +34,59 @@ func New(contract *chain.Contract, txmgr *tx.Manager, py *pyapp.Client, chainID
 	}
 }
 
-func (r *Runner) HandleTask(ctx context.Context, ev *chain.TaskCreatedEvent) error {
+// claimBatchSize stays under the /tasks/claim/batch item limit.
+const claimBatchSize = 1000
+
+func (r *Runner) claimRequest(ev *chain.TaskCreatedEvent) (pyapp.ClaimTaskRequest, error) {
 	taskID, err := pyapp.TaskIDToUint64(ev.TaskId)
 	if err != nil {
-		return err
+		return pyapp.ClaimTaskRequest{}, err
 	}
-
-	inputHash := common.BytesToHash(ev.InputHash[:])
-	model := common.BytesToHash(ev.Model[:]).Hex()
-	requester := ev.Requester.Hex()
-
-	claimReq := pyapp.ClaimTaskRequest{
+	return pyapp.ClaimTaskRequest{
 		TaskID:      taskID,
-		InputHash:   inputHash.Hex(),
-		Requester:   requester,
-		Model:       model,
+		InputHash:   common.BytesToHash(ev.InputHash[:]).Hex(),
+		Requester:   ev.Requester.Hex(),
+		Model:       common.BytesToHash(ev.Model[:]).Hex(),
 		Fee:         ev.Fee.String(),
 		ChainID:     r.chainID,
 		TxHash:      ev.Raw.TxHash.Hex(),
 		BlockNumber: ev.Raw.BlockNumber,
+	}, nil
+}
+
+// ClaimTasks binds a poll window's task ids to their prepared inputs, batching the claims.
+// Claiming a task already bound to the same input succeeds, so a re-polled window is harmless.
+func (r *Runner) ClaimTasks(ctx context.Context, evs []*chain.TaskCreatedEvent) error {
+	reqs := make([]pyapp.ClaimTaskRequest, 0, len(evs))
+	for _, ev := range evs {
+		req, err := r.claimRequest(ev)
+		if err != nil {
+			return err
+		}
+		reqs = append(reqs, req)
 	}
-	if _, err := r.pyapp.ClaimTask(ctx, claimReq); err != nil {
+	for start := 0; start < len(reqs); start += claimBatchSize {
+		end := min(start+claimBatchSize, len(reqs))
+		items, err := r.pyapp.ClaimTasks(ctx, reqs[start:end])
+		if err != nil {
+			return err
+		}
+		for _, item := range items {
+			if item.Status != "created" {
+				return fmt.Errorf("claim task %d: %s: %s", item.TaskID, item.Status, item.Error)
+			}
+		}
+	}
+	return nil
+}
+
+// HandleTask runs a claimed task through the model and submits its result on-chain.
+func (r *Runner) HandleTask(ctx context.Context, ev *chain.TaskCreatedEvent) error {
+	taskID, err := pyapp.TaskIDToUint64(ev.TaskId)
+	if err != nil {
 		return err
 	}
+	inputHash := common.BytesToHash(ev.InputHash[:])
 
 	input, err := r.pyapp.GetInput(ctx, inputHash)
 	if err != nil {
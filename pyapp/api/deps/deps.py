@@ -1,7 +1,11 @@
 from typing import Optional
 
-from fastapi import Header, HTTPException
+from fastapi import Header, HTTPException, Request
 
+from pyapp.services.task_events import TaskEventBus
+from pyapp.services.task_runner import TaskRunner
+from pyapp.services.task_service import TaskService
+from pyapp.services.translator import TranslatorService
 from pyapp.settings import get_settings
 
 
@@ -17,3 +21,23 @@ def require_internal_api_key(x_api_key: Optional[str] = Header(None, alias="X-AP
             status_code=401,
             detail={"code": "UNAUTHORIZED", "message": "invalid api key"},
         )
+
+
+def get_translator_service(request: Request) -> TranslatorService:
+    """Return the app-lifetime TranslatorService created in the lifespan handler."""
+    return request.app.state.translator_service
+
+
+def get_task_service(request: Request) -> TaskService:
+    """Return the app-lifetime TaskService created in the lifespan handler."""
+    return request.app.state.task_service
+
+
+def get_task_runner(request: Request) -> TaskRunner:
+    """Return the app-lifetime TaskRunner created in the lifespan handler."""
+    return request.app.state.task_runner
+
+
+def get_task_events(request: Request) -> TaskEventBus:
+    """Return the app-lifetime TaskEventBus created in the lifespan handler."""
+    return request.app.state.task_events
@@ -1,11 +1,32 @@
-from fastapi import Depends, FastAPI, HTTPException, Query
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import AsyncIterator, List, Literal, Optional, Set
+from urllib.parse import quote
 
+import orjson
+from fastapi import Depends, FastAPI, File, Form, Header, HTTPException, Query, Request, UploadFile
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+
+from pyapp.api.deps.deps import get_task_events, get_task_runner, get_task_service, get_translator_service
 from pyapp.api.internal_auth import require_internal_api_key
+from pyapp.api.responses import ORJSONResponse
+from pyapp.clients.openai_client import close_async_openai_client
+from pyapp.clients.scheduler import Priority
+from pyapp.db import close_database, init_task_job_repository, init_task_repository
 from pyapp.models.schemas import (
+    BatchTextRequest,
+    BatchTranslationResponse,
+    TaskClaimBatchRequest,
+    TaskClaimBatchResponse,
     TaskClaimRequest,
     TaskClaimResponse,
     TaskInput,
     TaskInputResponse,
+    TaskJobResponse,
+    TaskListResponse,
+    TaskPrepareBatchRequest,
+    TaskPrepareBatchResponse,
     TaskPrepareResponse,
     TaskPublicResponse,
     TaskResultRequest,
@@ -14,27 +35,170 @@ from pyapp.models.schemas import (
     TaskStatusUpdateRequest,
     TextRequest,
     TranslationResponse,
+    TranslationSearchResponse,
 )
+from pyapp.repositories.sqlite_repo import MIN_SEARCH_LENGTH
+from pyapp.repositories.write_behind import WriteQueueFullError
+from pyapp.services.documents import DocumentTranslator, detect_format
+from pyapp.services.task_events import TaskEventBus
+from pyapp.services.task_runner import JobQueueFullError, TaskRunner
 from pyapp.services.task_service import (
     HashMismatchError,
     TaskConflictError,
     TaskNotFoundError,
     TaskService,
-    get_task_service,
 )
 from pyapp.services.translator import TranslatorService, get_service
+from pyapp.services.webhooks import WebhookNotifier
+from pyapp.settings import get_settings
+from pyapp.utils.metrics import REGISTRY
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.translator_service = get_service()
+    if app.state.translator_service.reader is not None:
+        # Fail fast without pykakasi, and keep the dictionary load off the first request.
+        await asyncio.to_thread(app.state.translator_service.reader.warm_up)
+    settings = get_settings()
+    app.state.task_events = TaskEventBus(history=settings.task_events_history)
+    app.state.task_service = TaskService(repository=init_task_repository(), events=app.state.task_events)
+    webhooks = None
+    if settings.task_webhook_url:
+        webhooks = WebhookNotifier(
+            settings.task_webhook_url,
+            secret=settings.task_webhook_secret,
+            batch_size=settings.task_webhook_batch_size,
+            flush_interval=settings.task_webhook_flush_interval_ms / 1000,
+            max_retries=settings.task_webhook_max_retries,
+        )
+        app.state.task_events.add_callback(webhooks.notify)
+    app.state.task_runner = TaskRunner(
+        app.state.task_service,
+        app.state.translator_service.with_priority(Priority.TASK),
+        init_task_job_repository(),
+        workers=settings.task_runner_workers,
+        max_attempts=settings.task_job_max_attempts,
+        lease_seconds=settings.task_job_lease_seconds,
+        poll_interval=settings.task_job_poll_interval_ms / 1000,
+        max_queued=settings.task_job_queue_max,
+        retry_backoff=settings.task_job_retry_backoff_seconds,
+        retry_backoff_max=settings.task_job_retry_backoff_max_seconds,
+    )
+    app.state.task_runner.start()
+    yield
+    await asyncio.to_thread(app.state.task_runner.stop)
+    if webhooks is not None:
+        await asyncio.to_thread(webhooks.close)
+    await asyncio.to_thread(app.state.translator_service.repository.close)
+    await close_async_openai_client()
+    close_database()
+
+
+app = FastAPI(title="AI Translator", version="0.1.0", lifespan=lifespan)
+
+
+@app.exception_handler(WriteQueueFullError)
+async def write_queue_full(_: Request, exc: WriteQueueFullError) -> ORJSONResponse:
+    return ORJSONResponse(
+        status_code=503,
+        content={"detail": {"code": "WRITE_QUEUE_FULL", "message": str(exc)}},
+        headers={"Retry-After": "1"},
+    )
+
 
-app = FastAPI(title="AI Translator", version="0.1.0")
+@app.exception_handler(JobQueueFullError)
+async def job_queue_full(_: Request, exc: JobQueueFullError) -> ORJSONResponse:
+    return ORJSONResponse(
+        status_code=503,
+        content={"detail": {"code": "JOB_QUEUE_FULL", "message": str(exc)}},
+        headers={"Retry-After": "5"},
+    )
 
 
 @app.post("/translate/chinese", response_model=TranslationResponse)
-def translate_chinese(req: TextRequest, svc: TranslatorService = Depends(get_service)) -> TranslationResponse:
-    return svc.translate_chinese(req.text, include_grammar=req.include_grammar)
+async def translate_chinese(
+    req: TextRequest, svc: TranslatorService = Depends(get_translator_service)
+) -> TranslationResponse:
+    return await svc.translate_chinese_async(req.text, include_grammar=req.include_grammar)
+
+
+def _sse(event: str, data: dict, event_id: Optional[str] = None) -> str:
+    id_line = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{id_line}event: {event}\ndata: {orjson.dumps(data).decode('utf-8')}\n\n"
+
+
+@app.post("/translate/chinese/stream")
+async def translate_chinese_stream(
+    req: TextRequest, svc: TranslatorService = Depends(get_translator_service)
+) -> StreamingResponse:
+    """Server-Sent Events: one `field` event per completed field, then a `result` event."""
+
+    async def events() -> AsyncIterator[str]:
+        try:
+            async for event in svc.stream_async("translate-zh", req.text, include_grammar=req.include_grammar):
+                if event.kind == "final":
+                    yield _sse("result", event.value.model_dump(mode="json"))
+                else:
+                    yield _sse("field", {"field": event.field, "value": event.value})
+        except Exception as exc:
+            yield _sse("error", {"code": "MODEL_ERROR", "message": str(exc)})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.post("/translate/batch", response_model=BatchTranslationResponse)
+async def translate_batch(
+    req: BatchTextRequest, svc: TranslatorService = Depends(get_translator_service)
+) -> BatchTranslationResponse:
+    items = await svc.with_priority(Priority.BATCH).translate_many_async(req.items)
+    return BatchTranslationResponse(items=items)
 
 
 @app.post("/correct/english", response_model=TranslationResponse)
-def correct_english(req: TextRequest, svc: TranslatorService = Depends(get_service)) -> TranslationResponse:
-    return svc.correct_english(req.text, include_grammar=req.include_grammar)
+async def correct_english(
+    req: TextRequest, svc: TranslatorService = Depends(get_translator_service)
+) -> TranslationResponse:
+    return await svc.correct_english_async(req.text, include_grammar=req.include_grammar)
+
+
+@app.post("/documents/translate")
+def translate_document(
+    file: UploadFile = File(..., description="Plain text, Markdown or SRT file (UTF-8)."),
+    mode: Literal["translate-zh", "correct-en"] = Form("translate-zh"),
+    target: Literal["en", "ja"] = Form("en"),
+    fmt: Optional[Literal["text", "markdown", "srt"]] = Form(None, alias="format"),
+    svc: TranslatorService = Depends(get_translator_service),
+) -> StreamingResponse:
+    """Translate an uploaded document segment by segment and stream it back in order."""
+    try:
+        content = file.file.read().decode("utf-8")
+    except UnicodeDecodeError as exc:
+        raise HTTPException(status_code=400, detail={"code": "BAD_ENCODING", "message": "file must be UTF-8"}) from exc
+    translator = DocumentTranslator(svc.with_priority(Priority.BATCH), workers=get_settings().document_workers)
+    chunks = translator.translate(content, fmt=fmt or detect_format(file.filename), mode=mode, target=target)
+    filename = quote(f"translated-{file.filename or 'document.txt'}")
+    return StreamingResponse(
+        chunks,
+        media_type="text/plain; charset=utf-8",
+        headers={"Content-Disposition": f"attachment; filename*=UTF-8''{filename}"},
+    )
+
+
+@app.get("/translations/search", response_model=TranslationSearchResponse)
+def search_translations(
+    q: str = Query(
+        ..., min_length=MIN_SEARCH_LENGTH, description="Text to look up in Chinese, English or Japanese."
+    ),
+    limit: int = Query(20, ge=1, le=200),
+    before_id: Optional[int] = Query(None, description="Keyset cursor from next_before_id."),
+    svc: TranslatorService = Depends(get_translator_service),
+) -> TranslationSearchResponse:
+    return svc.search_history(q, limit=limit, before_id=before_id)
 
 
 @app.post("/tasks/prepare", response_model=TaskPrepareResponse)
@@ -42,6 +206,13 @@ def prepare_task(payload: TaskInput, svc: TaskService = Depends(get_task_service
     return svc.prepare(payload)
 
 
+@app.post("/tasks/prepare/batch", response_model=TaskPrepareBatchResponse)
+def prepare_tasks(
+    req: TaskPrepareBatchRequest, svc: TaskService = Depends(get_task_service)
+) -> TaskPrepareBatchResponse:
+    return TaskPrepareBatchResponse(items=svc.prepare_many(req.items))
+
+
 @app.post(
     "/tasks/claim",
     response_model=TaskClaimResponse,
@@ -56,14 +227,96 @@ def claim_task(req: TaskClaimRequest, svc: TaskService = Depends(get_task_servic
         raise HTTPException(status_code=409, detail={"code": "CONFLICT", "message": str(exc)}) from exc
 
 
+@app.post(
+    "/tasks/claim/batch",
+    response_model=TaskClaimBatchResponse,
+    dependencies=[Depends(require_internal_api_key)],
+)
+def claim_tasks(req: TaskClaimBatchRequest, svc: TaskService = Depends(get_task_service)) -> TaskClaimBatchResponse:
+    return TaskClaimBatchResponse(items=svc.claim_many(req.items))
+
+
+@app.get(
+    "/tasks",
+    response_model=TaskListResponse,
+    dependencies=[Depends(require_internal_api_key)],
+)
+def list_tasks(
+    status: Optional[List[str]] = Query(None, description="Only tasks in these statuses (repeatable)."),
+    updated_before: Optional[datetime] = Query(
+        None,
+        description="Only tasks last updated before this time; combine with status, alone it scans tasks in id order.",
+    ),
+    after_id: Optional[int] = Query(None, ge=0, description="Keyset cursor from next_after_id."),
+    limit: int = Query(100, ge=1, le=1000),
+    svc: TaskService = Depends(get_task_service),
+) -> TaskListResponse:
+    """Compact task listing (no payloads) for reconciliation, e.g. tasks stuck in `prepared`."""
+    return svc.list_tasks(statuses=status, updated_before=updated_before, after_id=after_id, limit=limit)
+
+
+@app.get("/tasks/events", dependencies=[Depends(require_internal_api_key)])
+async def task_events(
+    task_id: Optional[List[int]] = Query(None, description="Only events for these task ids (repeatable)."),
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID"),
+    bus: TaskEventBus = Depends(get_task_events),
+) -> StreamingResponse:
+    """Server-Sent Events: one `task` event per state change (claimed, result stored, status update).
+
+    Only changes made by this server process are streamed. Event ids are "<boot_id>-<seq>"; a
+    reconnect with Last-Event-ID replays the buffered events after it. If that is impossible (the
+    id is from another process or run, or too old) the stream starts with a `resync` event and the
+    client should re-read task state, e.g. with GET /tasks. A client that falls too far behind gets
+    a `lagged` event and should reconnect.
+    """
+    wanted: Optional[Set[int]] = set(task_id) if task_id else None
+    subscription = bus.subscribe()
+
+    async def events() -> AsyncIterator[str]:
+        last_seq = 0
+        try:
+            if last_event_id is not None:
+                replay = bus.since(last_event_id)
+                if replay is None:
+                    yield _sse("resync", {"last_event_id": last_event_id, "boot_id": bus.boot_id})
+                else:
+                    last_seq = int(last_event_id.rpartition("-")[2])
+                    for event in replay:
+                        if wanted is None or event.task_id in wanted:
+                            yield _sse("task", event.to_dict(), bus.event_id(event))
+                        last_seq = event.seq
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if event is None:
+                    yield _sse("lagged", {"last_event_id": f"{bus.boot_id}-{last_seq}"})
+                    return
+                if event.seq <= last_seq:
+                    continue
+                last_seq = event.seq
+                if wanted is None or event.task_id in wanted:
+                    yield _sse("task", event.to_dict(), bus.event_id(event))
+        finally:
+            bus.unsubscribe(subscription)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.get(
     "/tasks/input/{input_hash}",
     response_model=TaskInputResponse,
     dependencies=[Depends(require_internal_api_key)],
 )
-def get_task_input(input_hash: str, svc: TaskService = Depends(get_task_service)) -> TaskInputResponse:
+def get_task_input(input_hash: str, svc: TaskService = Depends(get_task_service)) -> Response:
     try:
-        return svc.get_input(input_hash)
+        return Response(svc.get_input_raw(input_hash), media_type="application/json")
     except TaskNotFoundError as exc:
         raise HTTPException(status_code=404, detail={"code": "NOT_FOUND", "message": str(exc)}) from exc
 
@@ -98,18 +351,84 @@ def update_task_status(
         raise HTTPException(status_code=404, detail={"code": "NOT_FOUND", "message": str(exc)}) from exc
 
 
+@app.post(
+    "/tasks/{task_id}/run",
+    response_model=TaskJobResponse,
+    status_code=202,
+    dependencies=[Depends(require_internal_api_key)],
+)
+def run_task(task_id: int, runner: TaskRunner = Depends(get_task_runner)) -> TaskJobResponse:
+    """Queue server-side execution of a claimed task: translate its input and store the result."""
+    try:
+        return runner.submit(task_id)
+    except TaskNotFoundError as exc:
+        raise HTTPException(status_code=404, detail={"code": "NOT_FOUND", "message": str(exc)}) from exc
+
+
+@app.get(
+    "/tasks/{task_id}/run",
+    response_model=TaskJobResponse,
+    dependencies=[Depends(require_internal_api_key)],
+)
+def get_task_run(task_id: int, runner: TaskRunner = Depends(get_task_runner)) -> TaskJobResponse:
+    try:
+        return runner.get(task_id)
+    except TaskNotFoundError as exc:
+        raise HTTPException(status_code=404, detail={"code": "NOT_FOUND", "message": str(exc)}) from exc
+
+
 @app.get("/tasks/{task_id}", response_model=TaskPublicResponse)
-def get_task(
+async def get_task(
     task_id: int,
     include_result: bool = Query(False, description="Include result payload when available."),
+    wait: float = Query(0, ge=0, le=60, description="Long-poll: hold up to this many seconds for a change."),
     svc: TaskService = Depends(get_task_service),
-) -> TaskPublicResponse:
+    bus: TaskEventBus = Depends(get_task_events),
+) -> Response:
+    """Served from the stored canonical JSON; the response model documents the shape.
+
+    With `wait`, a task that has no result yet (and is not failed or refunded) is held until its
+    next state change or the timeout, then the current state is returned. Changes made in this
+    process wake the request at once; changes made by other processes (other workers, a separate
+    task runner) are seen by re-reading the task every TASK_WAIT_RECHECK_MS.
+    """
     try:
-        return svc.get_public(task_id, include_result=include_result)
+        async with bus.watch(task_id) as changed:
+            body, settled = await asyncio.to_thread(svc.poll_public, task_id, include_result)
+            if settled or not wait:
+                return Response(body, media_type="application/json")
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + wait
+            recheck = get_settings().task_wait_recheck_ms / 1000
+            while not changed.is_set():
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    await asyncio.wait_for(changed.wait(), timeout=min(remaining, recheck))
+                except asyncio.TimeoutError:
+                    current, _ = await asyncio.to_thread(svc.poll_public, task_id, include_result)
+                    if current != body:
+                        return Response(current, media_type="application/json")
+        body, _ = await asyncio.to_thread(svc.poll_public, task_id, include_result)
+        return Response(body, media_type="application/json")
     except TaskNotFoundError as exc:
         raise HTTPException(status_code=404, detail={"code": "NOT_FOUND", "message": str(exc)}) from exc
 
 
-@app.get("/health")
+@app.get("/cache/stats", response_class=ORJSONResponse, dependencies=[Depends(require_internal_api_key)])
+def cache_stats(svc: TranslatorService = Depends(get_translator_service)) -> dict:
+    if svc.cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **svc.cache.stats()}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics() -> PlainTextResponse:
+    """Per-stage latency histograms and token/cost counters in Prometheus text format."""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/health", response_class=ORJSONResponse)
 def health() -> dict:
     return {"status": "ok"}
@@ -0,0 +1,15 @@
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson, for handlers that return plain dicts.
+
+    Routes with a response_model are left on FastAPI's default class: it serializes
+    them straight to bytes with pydantic-core, which is faster than any response class.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
@@ -1,5 +1,5 @@
 from datetime import datetime, timezone
-from typing import Literal, Optional
+from typing import List, Literal, Optional
 
 from pydantic import BaseModel, Field
 
@@ -19,6 +19,99 @@ class TextRequest(BaseModel):
     include_grammar: bool = Field(False, description="Whether to include grammar explanations.")
 
 
+class ChineseTranslationText(BaseModel):
+    """Model output for translate-zh when hiragana is generated locally."""
+
+    translated_text: str = Field(..., description="English translation.")
+    japanese_text: str = Field(..., description="Japanese translation.")
+
+
+class ChineseTranslation(ChineseTranslationText):
+    """Model output for translate-zh; original_text and timestamp are filled in server-side."""
+
+    hiragana_pronunciation: str = Field(..., description="Hiragana reading of the Japanese translation.")
+
+
+class ChineseTranslationTextWithGrammar(ChineseTranslationText):
+    english_grammar: str = Field(..., description="Grammar explanation for the English translation.")
+    japanese_grammar: str = Field(..., description="Grammar explanation for the Japanese translation.")
+
+
+class ChineseTranslationWithGrammar(ChineseTranslation):
+    english_grammar: str = Field(..., description="Grammar explanation for the English translation.")
+    japanese_grammar: str = Field(..., description="Grammar explanation for the Japanese translation.")
+
+
+class EnglishCorrectionText(BaseModel):
+    """Model output for correct-en when hiragana is generated locally."""
+
+    translated_text: str = Field(..., description="The corrected English sentence.")
+    japanese_text: str = Field(..., description="Japanese translation of the corrected sentence.")
+
+
+class EnglishCorrection(EnglishCorrectionText):
+    """Model output for correct-en; original_text and timestamp are filled in server-side."""
+
+    hiragana_pronunciation: str = Field(..., description="Hiragana reading of the Japanese translation.")
+
+
+class EnglishCorrectionTextWithGrammar(EnglishCorrectionText):
+    english_grammar: str = Field(..., description="What was wrong in the original English and why.")
+    japanese_grammar: str = Field(..., description="Grammar explanation for the Japanese translation.")
+
+
+class EnglishCorrectionWithGrammar(EnglishCorrection):
+    english_grammar: str = Field(..., description="What was wrong in the original English and why.")
+    japanese_grammar: str = Field(..., description="Grammar explanation for the Japanese translation.")
+
+
+class ChineseTranslationBatch(BaseModel):
+    items: List[ChineseTranslation] = Field(..., description="One result per input, in input order.")
+
+
+class ChineseTranslationWithGrammarBatch(BaseModel):
+    items: List[ChineseTranslationWithGrammar] = Field(..., description="One result per input, in input order.")
+
+
+class ChineseTranslationTextBatch(BaseModel):
+    items: List[ChineseTranslationText] = Field(..., description="One result per input, in input order.")
+
+
+class ChineseTranslationTextWithGrammarBatch(BaseModel):
+    items: List[ChineseTranslationTextWithGrammar] = Field(..., description="One result per input, in input order.")
+
+
+class BatchTextRequest(BaseModel):
+    items: List[TextRequest] = Field(..., min_length=1, max_length=1000, description="Texts to translate.")
+
+
+class BatchItemResult(BaseModel):
+    index: int = Field(..., description="Position of the item in the request.")
+    status: Literal["ok", "cached", "error"] = Field(..., description="Per-item outcome.")
+    result: Optional[TranslationResponse] = None
+    error: Optional[str] = Field(None, description="Error message when status is error.")
+
+
+class BatchTranslationResponse(BaseModel):
+    items: List[BatchItemResult]
+
+
+class TranslationRecord(BaseModel):
+    id: int = Field(..., description="Row id of the stored translation.")
+    original_text: str = Field(..., description="The original input text.")
+    translated_text: str = Field(..., description="The translated or corrected English text.")
+    english_grammar: Optional[str] = Field(None, description="Grammar explanation for the English text.")
+    japanese_text: Optional[str] = Field(None, description="Japanese translation.")
+    hiragana_pronunciation: Optional[str] = Field(None, description="Hiragana pronunciation for the Japanese text.")
+    japanese_grammar: Optional[str] = Field(None, description="Grammar explanation for the Japanese translation.")
+    timestamp: str = Field(..., description="Timestamp when the translation was generated.")
+
+
+class TranslationSearchResponse(BaseModel):
+    items: List[TranslationRecord]
+    next_before_id: Optional[int] = Field(None, description="Pass as before_id to fetch the next page.")
+
+
 class TaskInput(BaseModel):
     text: str = Field(..., min_length=1, description="Input text to process.")
     mode: Literal["translate-zh", "correct-en"] = Field(..., description="Task mode.")
@@ -32,6 +125,14 @@ class TaskPrepareResponse(BaseModel):
     deduped: bool = Field(..., description="True if the input already existed.")
 
 
+class TaskPrepareBatchRequest(BaseModel):
+    items: List[TaskInput] = Field(..., min_length=1, max_length=5000, description="Inputs to prepare.")
+
+
+class TaskPrepareBatchResponse(BaseModel):
+    items: List[TaskPrepareResponse]
+
+
 class TaskClaimRequest(BaseModel):
     task_id: int = Field(..., description="On-chain task id.")
     input_hash: str = Field(..., description="Prepared input hash.")
@@ -49,6 +150,22 @@ class TaskClaimResponse(BaseModel):
     updated_at: str = Field(..., description="RFC3339 UTC timestamp for the update.")
 
 
+class TaskClaimBatchRequest(BaseModel):
+    items: List[TaskClaimRequest] = Field(..., min_length=1, max_length=5000, description="Claims to apply in order.")
+
+
+class TaskClaimBatchItem(BaseModel):
+    task_id: int = Field(..., description="On-chain task id.")
+    input_hash: str = Field(..., description="Prepared input hash.")
+    status: Literal["created", "not_found", "conflict"] = Field(..., description="Per-claim outcome.")
+    updated_at: Optional[str] = Field(None, description="RFC3339 UTC timestamp when the claim was applied.")
+    error: Optional[str] = Field(None, description="Reason when the claim was rejected.")
+
+
+class TaskClaimBatchResponse(BaseModel):
+    items: List[TaskClaimBatchItem]
+
+
 class TaskInputResponse(BaseModel):
     input_hash: str = Field(..., description="Prepared input hash.")
     input_payload: TaskInput
@@ -95,3 +212,29 @@ class TaskPublicResponse(BaseModel):
     input_hash: str = Field(..., description="Prepared input hash.")
     result_hash: Optional[str] = Field(None, description="Result hash.")
     result: Optional[TaskResultPayload] = None
+
+
+class TaskSummary(BaseModel):
+    id: int = Field(..., description="Row id; pass the last one as after_id to fetch the next page.")
+    task_id: Optional[int] = Field(None, description="On-chain task id (unset until claimed).")
+    input_hash: str = Field(..., description="Prepared input hash.")
+    result_hash: Optional[str] = Field(None, description="Result hash.")
+    status: str = Field(..., description="Task status.")
+    created_at: str = Field(..., description="RFC3339 UTC timestamp for preparation.")
+    updated_at: str = Field(..., description="RFC3339 UTC timestamp for the last change.")
+
+
+class TaskListResponse(BaseModel):
+    items: List[TaskSummary]
+    next_after_id: Optional[int] = Field(None, description="Keyset cursor for the next page, if there may be one.")
+
+
+class TaskJobResponse(BaseModel):
+    task_id: int = Field(..., description="On-chain task id.")
+    status: Literal["queued", "running", "succeeded", "failed"] = Field(..., description="Job status.")
+    attempts: int = Field(..., description="Execution attempts started so far.")
+    result_hash: Optional[str] = Field(None, description="Result hash once the job succeeded.")
+    error: Optional[str] = Field(None, description="Error from the last failed attempt.")
+    enqueued_at: str = Field(..., description="RFC3339 UTC timestamp when the job was queued.")
+    started_at: Optional[str] = Field(None, description="RFC3339 UTC timestamp when the last attempt started.")
+    finished_at: Optional[str] = Field(None, description="RFC3339 UTC timestamp when the job finished.")
@@ -0,0 +1,134 @@
+import asyncio
+import json
+import tempfile
+from pathlib import Path
+from typing import List, Optional
+
+import typer
+
+from pyapp.bench.fake_openai import FakeOpenAIConfig
+from pyapp.bench.report import compare, format_table, write_report
+
+app = typer.Typer(help="Offline benchmarks: a fake OpenAI server, end-to-end load tests and micro-benchmarks")
+
+DEFAULT_SCENARIOS = [
+    "health",
+    "translate_chinese",
+    "correct_english",
+    "translate_chinese_stream",
+    "translate_batch",
+    "translations_search",
+    "tasks_prepare",
+    "tasks_claim",
+    "tasks_get",
+    "metrics",
+]
+
+
+@app.command("fake-openai")
+def fake_openai(
+    port: int = typer.Option(9100, "--port"),
+    host: str = typer.Option("127.0.0.1", "--host"),
+    latency_ms: float = typer.Option(200.0, "--latency-ms", help="Mean response latency"),
+    jitter_ms: float = typer.Option(50.0, "--jitter-ms", help="Uniform +/- jitter around the mean"),
+    error_rate: float = typer.Option(0.0, "--error-rate", help="Fraction of calls answered with HTTP 500"),
+    rate_limit_rate: float = typer.Option(0.0, "--rate-limit-rate", help="Fraction answered with HTTP 429"),
+    seed: Optional[int] = typer.Option(None, "--seed"),
+) -> None:
+    """Serve a stand-in for /v1/chat/completions that returns canned structured outputs."""
+    import uvicorn
+
+    from pyapp.bench.fake_openai import create_app
+
+    config = FakeOpenAIConfig(
+        latency_ms=latency_ms, jitter_ms=jitter_ms, error_rate=error_rate, rate_limit_rate=rate_limit_rate, seed=seed
+    )
+    uvicorn.run(create_app(config), host=host, port=port, log_level="warning", access_log=False)
+
+
+@app.command("load")
+def load(
+    requests: int = typer.Option(200, "--requests", "-n", help="Requests per scenario"),
+    concurrency: int = typer.Option(16, "--concurrency", "-c"),
+    scenario: Optional[List[str]] = typer.Option(None, "--scenario", "-s", help="Repeatable; default: all"),
+    latency_ms: float = typer.Option(200.0, "--latency-ms"),
+    jitter_ms: float = typer.Option(50.0, "--jitter-ms"),
+    error_rate: float = typer.Option(0.0, "--error-rate"),
+    rate_limit_rate: float = typer.Option(0.0, "--rate-limit-rate"),
+    workers: int = typer.Option(1, "--workers", help="uvicorn workers for the API under test"),
+    api_url: Optional[str] = typer.Option(
+        None, "--api-url", help="Benchmark an already running API instead of starting one"
+    ),
+    internal_key: str = typer.Option("bench-internal-key", "--internal-key"),
+    output: Optional[Path] = typer.Option(None, "--output", "-o", help="Write the JSON report here"),
+) -> None:
+    """Start the fake OpenAI server and the API, then load-test each endpoint in turn."""
+    from pyapp.bench.load import SCENARIOS, api_server, fake_openai_server, run_load
+
+    names = scenario or DEFAULT_SCENARIOS
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        raise typer.BadParameter(f"unknown scenario(s): {', '.join(unknown)}; choose from {', '.join(SCENARIOS)}")
+    config = FakeOpenAIConfig(
+        latency_ms=latency_ms, jitter_ms=jitter_ms, error_rate=error_rate, rate_limit_rate=rate_limit_rate
+    )
+
+    if api_url:
+        results = asyncio.run(run_load(api_url, names, requests, concurrency, internal_key))
+    else:
+        with fake_openai_server(config) as openai_url, api_server(openai_url, internal_key, workers) as url:
+            results = asyncio.run(run_load(url, names, requests, concurrency, internal_key))
+
+    params = {
+        "requests": requests,
+        "concurrency": concurrency,
+        "workers": workers,
+        "api_url": api_url,
+        "fake_openai": None if api_url else vars(config),
+    }
+    write_report(output, "load", params, results)
+    typer.echo(format_table(results))
+
+
+@app.command("micro")
+def micro(
+    rows: int = typer.Option(100_000, "--rows", help="Rows pre-seeded into translations and tasks"),
+    iterations: int = typer.Option(500, "--iterations", "-n"),
+    db: Optional[Path] = typer.Option(
+        None, "--db", help="Reuse (and top up) this database; default is a throwaway file"
+    ),
+    output: Optional[Path] = typer.Option(None, "--output", "-o", help="Write the JSON report here"),
+) -> None:
+    """Time hash_payload, canonical_json_dumps and repository operations on a large database."""
+    from pyapp.bench.micro import run_micro
+    from pyapp.repositories.connection import close_pools
+
+    with tempfile.TemporaryDirectory(prefix="pyapp-bench-") as scratch:
+        try:
+            results = run_micro(db or Path(scratch) / "micro.db", rows, iterations)
+        finally:
+            close_pools()
+    write_report(output, "micro", {"rows": rows, "iterations": iterations, "db": str(db) if db else None}, results)
+    typer.echo(format_table(results))
+
+
+@app.command("compare")
+def compare_reports(
+    baseline: Path = typer.Argument(..., exists=True, dir_okay=False),
+    candidate: Path = typer.Argument(..., exists=True, dir_okay=False),
+) -> None:
+    """Show p50/p99/throughput changes between two JSON reports."""
+    typer.echo(
+        compare(
+            json.loads(baseline.read_text(encoding="utf-8")),
+            json.loads(candidate.read_text(encoding="utf-8")),
+        )
+    )
+
+
+def main() -> None:
+    app()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+import asyncio
+import json
+import random
+import re
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+_ITEM_COUNT = re.compile(r"Return exactly (\d+) items")
+
+
+@dataclass
+class FakeOpenAIConfig:
+    latency_ms: float = 200.0
+    jitter_ms: float = 50.0
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    stream_chunk_chars: int = 24
+    seed: Optional[int] = None
+
+
+def fake_value(schema: Dict[str, Any], defs: Dict[str, Any], name: str, array_len: int) -> Any:
+    """Produce a value that satisfies a strict structured-output JSON schema."""
+    if "$ref" in schema:
+        return fake_value(defs[schema["$ref"].rsplit("/", 1)[-1]], defs, name, array_len)
+    if "anyOf" in schema:
+        options = [option for option in schema["anyOf"] if option.get("type") != "null"]
+        return fake_value(options[0], defs, name, array_len) if options else None
+    kind = schema.get("type")
+    if isinstance(kind, list):
+        kind = next((item for item in kind if item != "null"), "null")
+    if kind == "object":
+        return {
+            key: fake_value(prop, defs, key, array_len) for key, prop in schema.get("properties", {}).items()
+        }
+    if kind == "array":
+        return [fake_value(schema.get("items", {}), defs, name, array_len) for _ in range(array_len)]
+    if kind == "string":
+        if schema.get("format") == "date-time":
+            return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        if "enum" in schema:
+            return schema["enum"][0]
+        return f"benchmark {name.replace('_', ' ')}"
+    if kind == "integer":
+        return 1
+    if kind == "number":
+        return 1.0
+    if kind == "boolean":
+        return False
+    return None
+
+
+def _prompt_text(body: Dict[str, Any]) -> str:
+    return "\n".join(str(message.get("content", "")) for message in body.get("messages", []))
+
+
+def _estimate(text: str) -> int:
+    return max(1, len(text) // 3)
+
+
+def _error(status: int, kind: str, message: str, headers: Optional[Dict[str, str]] = None) -> JSONResponse:
+    return JSONResponse(
+        status_code=status,
+        content={"error": {"message": message, "type": kind, "code": kind}},
+        headers=headers,
+    )
+
+
+def create_app(config: FakeOpenAIConfig) -> FastAPI:
+    """A stand-in for POST /v1/chat/completions that fills the requested json_schema with canned values."""
+    rng = random.Random(config.seed)
+    app = FastAPI(title="Fake OpenAI")
+    app.state.requests = 0
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        app.state.requests += 1
+        delay = max(0.0, config.latency_ms + rng.uniform(-config.jitter_ms, config.jitter_ms)) / 1000.0
+        await asyncio.sleep(delay)
+        roll = rng.random()
+        if roll < config.rate_limit_rate:
+            return _error(429, "rate_limit_exceeded", "fake rate limit", headers={"retry-after-ms": "200"})
+        if roll < config.rate_limit_rate + config.error_rate:
+            return _error(500, "server_error", "fake upstream failure")
+
+        prompt = _prompt_text(body)
+        match = _ITEM_COUNT.search(prompt)
+        json_schema = (body.get("response_format") or {}).get("json_schema") or {}
+        schema = json_schema.get("schema") or {"type": "object", "properties": {}}
+        content = json.dumps(
+            fake_value(schema, schema.get("$defs", {}), "value", int(match.group(1)) if match else 1),
+            ensure_ascii=False,
+        )
+        usage = {
+            "prompt_tokens": _estimate(prompt),
+            "completion_tokens": _estimate(content),
+            "total_tokens": _estimate(prompt) + _estimate(content),
+        }
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        model = body.get("model", "fake")
+        if body.get("stream"):
+            include_usage = bool((body.get("stream_options") or {}).get("include_usage"))
+            return StreamingResponse(
+                _stream(completion_id, model, content, usage if include_usage else None, config.stream_chunk_chars),
+                media_type="text/event-stream",
+            )
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [
+                {"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}
+            ],
+            "usage": usage,
+        }
+
+    @app.get("/health")
+    async def health() -> dict:
+        return {"status": "ok", "requests": app.state.requests}
+
+    return app
+
+
+async def _stream(
+    completion_id: str, model: str, content: str, usage: Optional[Dict[str, int]], chunk_chars: int
+) -> AsyncIterator[str]:
+    def event(choices: list, **extra: Any) -> str:
+        payload = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": choices,
+            **extra,
+        }
+        return f"data: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+    def delta(fields: Dict[str, Any], finish_reason: Optional[str] = None) -> str:
+        return event([{"index": 0, "delta": fields, "finish_reason": finish_reason}])
+
+    yield delta({"role": "assistant", "content": ""})
+    for start in range(0, len(content), chunk_chars):
+        yield delta({"content": content[start : start + chunk_chars]})
+        await asyncio.sleep(0)
+    yield delta({}, finish_reason="stop")
+    if usage is not None:
+        yield event([], usage=usage)
+    yield "data: [DONE]\n\n"
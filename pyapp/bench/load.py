@@ -0,0 +1,242 @@
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Sequence
+
+import httpx
+
+from pyapp.bench.fake_openai import FakeOpenAIConfig
+from pyapp.bench.report import summarize
+
+_PACKAGE_ROOT = Path(__file__).resolve().parents[2]
+
+
+@dataclass
+class LoadContext:
+    internal_key: str
+    nonce: str = field(default_factory=lambda: uuid.uuid4().hex[:8])
+    input_hashes: List[str] = field(default_factory=list)
+    task_base: int = field(default_factory=lambda: int(time.time()) * 1000)
+
+
+Scenario = Callable[[httpx.AsyncClient, int, LoadContext], Awaitable[None]]
+
+
+async def _health(client: httpx.AsyncClient, i: int, ctx: LoadContext) -> None:
+    (await client.get("/health")).raise_for_status()
+
+
+async def _translate_chinese(client: httpx.AsyncClient, i: int, ctx: LoadContext) -> None:
+    response = await client.post("/translate/chinese", json={"text": f"基准测试句子{ctx.nonce}第{i}号"})
+    response.raise_for_status()
+
+
+async def _correct_english(client: httpx.AsyncClient, i: int, ctx: LoadContext) -> None:
+    response = await client.post("/correct/english", json={"text": f"This are benchmark sentence {ctx.nonce} {i}"})
+    response.raise_for_status()
+
+
+async def _translate_chinese_stream(client: httpx.AsyncClient, i: int, ctx: LoadContext) -> None:
+    payload = {"text": f"流式基准测试{ctx.nonce}第{i}号"}
+    async with client.stream("POST", "/translate/chinese/stream", json=payload) as response:
+        response.raise_for_status()
+        body = "".join([chunk async for chunk in response.aiter_text()])
+    if "event: result" not in body:
+        raise RuntimeError("stream ended without a result event")
+
+
+async def _translate_batch(client: httpx.AsyncClient, i: int, ctx: LoadContext) -> None:
+    items = [{"text": f"批量基准{ctx.nonce}第{i}组第{j}句"} for j in range(5)]
+    response = await client.post("/translate/batch", json={"items": items})
+    response.raise_for_status()
+    if any(item["status"] == "error" for item in response.json()["items"]):
+        raise RuntimeError("batch item failed")
+
+
+async def _search(client: httpx.AsyncClient, i: int, ctx: LoadContext) -> None:
+    (await client.get("/translations/search", params={"q": "基准测试", "limit": 20})).raise_for_status()
+
+
+async def _tasks_prepare(client: httpx.AsyncClient, i: int, ctx: LoadContext) -> None:
+    payload = {"text": f"任务基准{ctx.nonce}第{i}号", "mode": "translate-zh"}
+    response = await client.post("/tasks/prepare", json=payload)
+    response.raise_for_status()
+    ctx.input_hashes.append(response.json()["input_hash"])
+
+
+async def _tasks_claim(client: httpx.AsyncClient, i: int, ctx: LoadContext) -> None:
+    if i >= len(ctx.input_hashes):
+        raise RuntimeError("run tasks_prepare with at least as many requests first")
+    response = await client.post(
+        "/tasks/claim",
+        json={"task_id": ctx.task_base + i, "input_hash": ctx.input_hashes[i]},
+        headers={"X-API-KEY": ctx.internal_key},
+    )
+    response.raise_for_status()
+
+
+async def _tasks_get(client: httpx.AsyncClient, i: int, ctx: LoadContext) -> None:
+    task_id = ctx.task_base + i % max(1, len(ctx.input_hashes))
+    (await client.get(f"/tasks/{task_id}")).raise_for_status()
+
+
+async def _metrics(client: httpx.AsyncClient, i: int, ctx: LoadContext) -> None:
+    (await client.get("/metrics")).raise_for_status()
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    "health": _health,
+    "translate_chinese": _translate_chinese,
+    "correct_english": _correct_english,
+    "translate_chinese_stream": _translate_chinese_stream,
+    "translate_batch": _translate_batch,
+    "translations_search": _search,
+    "tasks_prepare": _tasks_prepare,
+    "tasks_claim": _tasks_claim,
+    "tasks_get": _tasks_get,
+    "metrics": _metrics,
+}
+
+# One unrecorded call each so connection pools and lazily built clients are not measured.
+_WARMUP = (_health, _translate_chinese, _translate_chinese_stream)
+
+
+async def run_scenario(
+    client: httpx.AsyncClient, scenario: Scenario, requests: int, concurrency: int, ctx: LoadContext
+) -> Dict[str, Any]:
+    """Fire `requests` calls with `concurrency` workers; latencies of failed calls are not sampled."""
+    samples: List[float] = []
+    errors: List[str] = []
+    counter = iter(range(requests))
+
+    async def worker() -> None:
+        for i in counter:
+            started = time.perf_counter()
+            try:
+                await scenario(client, i, ctx)
+            except Exception as exc:
+                errors.append(f"{type(exc).__name__}: {exc}")
+                continue
+            samples.append((time.perf_counter() - started) * 1000.0)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    summary = summarize(samples, time.perf_counter() - started, errors=len(errors))
+    if errors:
+        summary["first_error"] = errors[0]
+    return summary
+
+
+async def run_load(
+    base_url: str, scenarios: Sequence[str], requests: int, concurrency: int, internal_key: str
+) -> Dict[str, Dict[str, Any]]:
+    ctx = LoadContext(internal_key=internal_key)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    results: Dict[str, Dict[str, Any]] = {}
+    async with httpx.AsyncClient(base_url=base_url, timeout=120.0, limits=limits) as client:
+        for warmup in _WARMUP:
+            try:
+                await warmup(client, -1, ctx)
+            except Exception:
+                pass
+        for name in scenarios:
+            results[name] = await run_scenario(client, SCENARIOS[name], requests, concurrency, ctx)
+    return results
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_healthy(url: str, process: subprocess.Popen, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{url} exited with code {process.returncode} before becoming healthy")
+        try:
+            if httpx.get(url, timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError(f"{url} did not become healthy within {timeout:.0f}s")
+
+
+@contextmanager
+def _process(args: List[str], health_url: str, env: Dict[str, str]) -> Iterator[subprocess.Popen]:
+    process = subprocess.Popen(args, env=env)
+    try:
+        _wait_healthy(health_url, process)
+        yield process
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def _child_env(extra: Dict[str, str]) -> Dict[str, str]:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(_PACKAGE_ROOT), env.get("PYTHONPATH")]))
+    env.update(extra)
+    return env
+
+
+def _flags(**options: Any) -> List[str]:
+    args: List[str] = []
+    for name, value in options.items():
+        if value is not None:
+            args += ["--" + name.replace("_", "-"), str(value)]
+    return args
+
+
+@contextmanager
+def fake_openai_server(config: FakeOpenAIConfig) -> Iterator[str]:
+    """Run the fake OpenAI API in a child process; yields its /v1 base URL."""
+    port = free_port()
+    args = [sys.executable, "-m", "pyapp.bench", "fake-openai"] + _flags(
+        port=port,
+        latency_ms=config.latency_ms,
+        jitter_ms=config.jitter_ms,
+        error_rate=config.error_rate,
+        rate_limit_rate=config.rate_limit_rate,
+        seed=config.seed,
+    )
+    with _process(args, f"http://127.0.0.1:{port}/health", _child_env({})):
+        yield f"http://127.0.0.1:{port}/v1"
+
+
+@contextmanager
+def api_server(
+    openai_base_url: str, internal_key: str, workers: int = 1, env: Optional[Dict[str, str]] = None
+) -> Iterator[str]:
+    """Run pyapp.api.main under uvicorn against a scratch database; yields its base URL."""
+    port = free_port()
+    with tempfile.TemporaryDirectory(prefix="pyapp-bench-") as scratch:
+        child_env = _child_env(
+            {
+                "OPENAI_BASE_URL": openai_base_url,
+                "OPENAI_BASE_URLS": "",
+                "OPENAI_API_KEY": "bench",
+                "OPENAI_API_KEYS": "",
+                "DB_PATH": str(Path(scratch) / "bench.db"),
+                "INTERNAL_API_KEY": internal_key,
+                **(env or {}),
+            }
+        )
+        args = [sys.executable, "-m", "uvicorn", "pyapp.api.main:app", "--no-access-log"] + _flags(
+            host="127.0.0.1", port=port, workers=workers, log_level="warning"
+        )
+        with _process(args, f"http://127.0.0.1:{port}/health", child_env):
+            yield f"http://127.0.0.1:{port}"
@@ -0,0 +1,125 @@
+import itertools
+import random
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from pyapp.bench.report import summarize
+from pyapp.models.schemas import TaskClaimRequest, TranslationResponse
+from pyapp.repositories.cache_repo import CacheRepository
+from pyapp.repositories.connection import get_pool
+from pyapp.repositories.migrations import migrate
+from pyapp.repositories.sqlite_repo import TranslationRepository
+from pyapp.repositories.task_repo import TaskRepository
+from pyapp.utils.hash_utils import canonical_json_dumps, hash_payload
+
+_SEED_CHUNK = 5000
+_SENTENCES = [
+    "今天天气很好，我们去公园散步吧。",
+    "这个项目的性能瓶颈在数据库写入。",
+    "请把这份文件翻译成英文和日文。",
+    "他昨天晚上一直在准备明天的会议。",
+]
+
+
+def sample_result_payload(index: int = 0) -> Dict[str, Any]:
+    text = _SENTENCES[index % len(_SENTENCES)] * 4
+    return {
+        "original_text": text,
+        "translated_text": "The weather is nice today, let's take a walk in the park. " * 4,
+        "english_grammar": "Uses a let's-imperative for a suggestion. " * 3,
+        "japanese_text": "今日は天気がいいので、公園を散歩しましょう。" * 4,
+        "hiragana_pronunciation": "きょうはてんきがいいので、こうえんをさんぽしましょう。" * 4,
+        "japanese_grammar": "ましょう expresses a suggestion. " * 3,
+        "timestamp": "2024-01-01T00:00:00Z",
+    }
+
+
+def time_op(fn: Callable[[int], Any], iterations: int) -> Dict[str, Any]:
+    samples: List[float] = []
+    started = time.perf_counter()
+    for i in range(iterations):
+        op_started = time.perf_counter()
+        fn(i)
+        samples.append((time.perf_counter() - op_started) * 1000.0)
+    return summarize(samples, time.perf_counter() - started)
+
+
+def _count(db_path: Path, table: str) -> int:
+    with get_pool(db_path).connection() as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def seed_database(db_path: Path, rows: int) -> None:
+    """Top the database up to `rows` translations and `rows` tasks (half of them claimed)."""
+    migrate(db_path)
+    translations = TranslationRepository(db_path)
+    existing = _count(db_path, "translations")
+    for start in range(existing, rows, _SEED_CHUNK):
+        translations.save_many(
+            TranslationResponse(**{**sample_result_payload(i), "original_text": f"{_SENTENCES[i % 4]}#{i}"})
+            for i in range(start, min(rows, start + _SEED_CHUNK))
+        )
+
+    tasks = TaskRepository(db_path)
+    existing = _count(db_path, "tasks")
+    for start in range(existing, rows, _SEED_CHUNK):
+        chunk = range(start, min(rows, start + _SEED_CHUNK))
+        entries = [_task_entry(i) for i in chunk]
+        tasks.prepare_many(entries, "2024-01-01T00:00:00Z")
+        claims = [TaskClaimRequest(task_id=i, input_hash=entries[i - start][0]) for i in chunk if i % 2 == 0]
+        tasks.claim_many(claims, "2024-01-01T00:00:00Z")
+
+
+def _task_entry(index: int):
+    return hash_payload({"text": f"seed task {index}", "mode": "translate-zh", "include_grammar": False})
+
+
+def run_micro(db_path: Path, rows: int, iterations: int, seed: int = 0) -> Dict[str, Dict[str, Any]]:
+    rng = random.Random(seed)
+    payload = sample_result_payload()
+    results: Dict[str, Dict[str, Any]] = {
+        "hash_payload": time_op(lambda i: hash_payload(payload), iterations * 10),
+        "canonical_json_dumps": time_op(lambda i: canonical_json_dumps(payload), iterations * 10),
+    }
+
+    started = time.perf_counter()
+    seed_database(db_path, rows)
+    results["seed_database"] = summarize([(time.perf_counter() - started) * 1000.0], time.perf_counter() - started)
+
+    translations = TranslationRepository(db_path)
+    tasks = TaskRepository(db_path)
+    cache = CacheRepository(db_path)
+    batch = [TranslationResponse(**sample_result_payload(i)) for i in range(50)]
+    fresh = itertools.count(rows + rng.randrange(1 << 30))
+
+    results["translations.save_many[50]"] = time_op(lambda i: translations.save_many(batch), iterations)
+    results["translations.search_fts"] = time_op(lambda i: translations.search("公园散步"), iterations)
+    results["translations.search_like"] = time_op(lambda i: translations.search("公园"), iterations)
+    results["translations.search_page"] = time_op(
+        lambda i: translations.search("会议", before_id=rng.randrange(1, rows + 1)), iterations
+    )
+    results["tasks.get_by_input_hash"] = time_op(
+        lambda i: tasks.get_by_input_hash(_task_entry(rng.randrange(rows))[0]), iterations
+    )
+    results["tasks.get_by_task_id"] = time_op(lambda i: tasks.get_by_task_id(rng.randrange(0, rows, 2)), iterations)
+    results["tasks.prepare_many[20]"] = time_op(
+        lambda i: tasks.prepare_many([_task_entry(next(fresh)) for _ in range(20)], "2024-01-01T00:00:00Z"),
+        iterations,
+    )
+
+    def claim_one(i: int) -> None:
+        index = next(fresh)
+        entry = _task_entry(index)
+        tasks.prepare_many([entry], "2024-01-01T00:00:00Z")
+        tasks.claim_many([TaskClaimRequest(task_id=index, input_hash=entry[0])], "2024-01-01T00:00:00Z")
+
+    results["tasks.prepare_and_claim"] = time_op(claim_one, iterations)
+    results["tasks.update_status"] = time_op(
+        lambda i: tasks.update_status(rng.randrange(0, rows, 2), "submitted", None, None, "2024-01-01T00:00:00Z"),
+        iterations,
+    )
+    cached = canonical_json_dumps(payload)
+    results["cache.put"] = time_op(lambda i: cache.put(f"bench-{i}", cached, time.time()), iterations)
+    results["cache.get"] = time_op(lambda i: cache.get(f"bench-{rng.randrange(iterations)}", time.time()), iterations)
+    return results
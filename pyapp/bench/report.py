@@ -0,0 +1,70 @@
+import json
+import platform
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from pyapp.utils.time_utils import format_utc_timestamp, utc_now
+
+
+def percentile(sorted_samples: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted sequence (q in 0..100)."""
+    if not sorted_samples:
+        return 0.0
+    rank = max(1, int(round(q / 100.0 * len(sorted_samples) + 0.5)))
+    return sorted_samples[min(rank, len(sorted_samples)) - 1]
+
+
+def summarize(samples_ms: List[float], elapsed_seconds: float, errors: int = 0) -> Dict[str, Any]:
+    ordered = sorted(samples_ms)
+    count = len(ordered)
+    return {
+        "count": count,
+        "errors": errors,
+        "throughput_per_s": round(count / elapsed_seconds, 2) if elapsed_seconds > 0 else 0.0,
+        "mean_ms": round(sum(ordered) / count, 4) if count else 0.0,
+        "p50_ms": round(percentile(ordered, 50), 4),
+        "p95_ms": round(percentile(ordered, 95), 4),
+        "p99_ms": round(percentile(ordered, 99), 4),
+        "max_ms": round(ordered[-1], 4) if count else 0.0,
+    }
+
+
+def write_report(path: Optional[Path], kind: str, params: Dict[str, Any], results: Dict[str, Any]) -> Dict[str, Any]:
+    report = {
+        "kind": kind,
+        "created_at": format_utc_timestamp(utc_now()),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "params": params,
+        "results": results,
+    }
+    if path is not None:
+        path.write_text(json.dumps(report, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    return report
+
+
+def format_table(results: Dict[str, Dict[str, Any]]) -> str:
+    lines = [f"{'name':<32} {'count':>7} {'err':>5} {'ops/s':>10} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10}"]
+    for name, row in results.items():
+        lines.append(
+            f"{name:<32} {row['count']:>7} {row['errors']:>5} {row['throughput_per_s']:>10.1f} "
+            f"{row['p50_ms']:>10.3f} {row['p95_ms']:>10.3f} {row['p99_ms']:>10.3f}"
+        )
+    return "\n".join(lines)
+
+
+def compare(baseline: Dict[str, Any], candidate: Dict[str, Any]) -> str:
+    """Side-by-side p50/p99/throughput deltas for the benchmarks present in both reports."""
+    lines = [f"{'name':<32} {'p50 ms':>21} {'p99 ms':>21} {'ops/s':>21}"]
+    for name, new in candidate["results"].items():
+        old = baseline["results"].get(name)
+        if old is None:
+            continue
+        cells = []
+        for key in ("p50_ms", "p99_ms", "throughput_per_s"):
+            change = (new[key] - old[key]) / old[key] * 100 if old[key] else 0.0
+            cells.append(f"{old[key]:>8.2f}→{new[key]:<8.2f}{change:+6.1f}%")
+        lines.append(f"{name:<32} " + " ".join(cells))
+    return "\n".join(lines)
@@ -1,40 +1,248 @@
+import time
+from enum import Enum
+from pathlib import Path
+from typing import Any, Dict, Optional
+
 import typer
 
-from pyapp.services.translator import get_service
+from pyapp import daemon
+
+# Service modules pull in pydantic, openai and the database layer; they are imported inside the
+# commands that need them so that `--help` and daemon-forwarded calls start quickly.
 
 app = typer.Typer(help="AI Translator CLI")
+history_app = typer.Typer(help="Query stored translations")
+app.add_typer(history_app, name="history")
+
+
+_FIELD_LABELS = {
+    "original_text": "Original",
+    "translated_text": "English",
+    "english_grammar": "English grammar",
+    "japanese_text": "Japanese",
+    "hiragana_pronunciation": "Hiragana",
+    "japanese_grammar": "Japanese grammar",
+}
+_GRAMMAR_FIELDS = {"english_grammar", "japanese_grammar"}
+
+
+def _print_field(field: str, value: Any, show_grammar: bool) -> None:
+    if field not in _FIELD_LABELS:
+        return
+    if field in _GRAMMAR_FIELDS and not (show_grammar and value):
+        return
+    typer.echo(f"{_FIELD_LABELS[field]}: {value}")
+
+
+def _stream_result(mode: str, text: str, show_grammar: bool) -> None:
+    from pyapp.services.translator import get_service
+
+    svc = get_service()
+    for event in svc.stream(mode, text, include_grammar=show_grammar):
+        if event.kind == "final":
+            typer.echo(f"Timestamp: {event.value.timestamp}")
+        else:
+            _print_field(event.field, event.value, show_grammar)
 
 
-def _print_result(result, show_grammar: bool) -> None:
-    typer.echo(f"Original: {result.original_text}")
-    typer.echo(f"English: {result.translated_text}")
-    if show_grammar and result.english_grammar:
-        typer.echo(f"English grammar: {result.english_grammar}")
-    typer.echo(f"Japanese: {result.japanese_text}")
-    typer.echo(f"Hiragana: {result.hiragana_pronunciation}")
-    if show_grammar and result.japanese_grammar:
-        typer.echo(f"Japanese grammar: {result.japanese_grammar}")
-    typer.echo(f"Timestamp: {result.timestamp}")
+def _print_result(fields: Dict[str, Any], show_grammar: bool) -> None:
+    typer.echo(f"Original: {fields['original_text']}")
+    typer.echo(f"English: {fields['translated_text']}")
+    if show_grammar and fields["english_grammar"]:
+        typer.echo(f"English grammar: {fields['english_grammar']}")
+    typer.echo(f"Japanese: {fields['japanese_text']}")
+    typer.echo(f"Hiragana: {fields['hiragana_pronunciation']}")
+    if show_grammar and fields["japanese_grammar"]:
+        typer.echo(f"Japanese grammar: {fields['japanese_grammar']}")
+    typer.echo(f"Timestamp: {fields['timestamp']}")
+
+
+def _forward(command: str, text: str, grammar: bool, stream: bool) -> bool:
+    """Run the command in a resident daemon if one is listening; False means do it in-process."""
+    try:
+        events = daemon.request({"command": command, "text": text, "grammar": grammar, "stream": stream})
+    except daemon.DaemonUnavailable:
+        return False
+    for event in events:
+        kind = event["event"]
+        if kind == "mismatch":
+            # Sent before any output, so the command can still run here with this shell's settings.
+            typer.echo(f"Daemon runs with different {', '.join(event['settings'])}; running in-process.", err=True)
+            return False
+        if kind == "field":
+            _print_field(event["field"], event["value"], grammar)
+        elif kind == "final":
+            typer.echo(f"Timestamp: {event['timestamp']}")
+        elif kind == "result":
+            _print_result(event["result"], grammar)
+        elif kind == "error":
+            typer.echo(f"Error: {event['message']}", err=True)
+            raise typer.Exit(code=1)
+    return True
 
 
 @app.command("zh")
 def translate_zh(
     text: str = typer.Argument(..., help="Chinese text to translate"),
     grammar: bool = typer.Option(False, "--grammar", help="Include grammar explanations"),
+    stream: bool = typer.Option(False, "--stream", help="Print fields as soon as the model produces them"),
 ) -> None:
+    if _forward("zh", text, grammar, stream):
+        return
+    if stream:
+        _stream_result("translate-zh", text, grammar)
+        return
+    from pyapp.services.translator import get_service
+
     svc = get_service()
     result = svc.translate_chinese(text, include_grammar=grammar)
-    _print_result(result, grammar)
+    _print_result(daemon.result_fields(result), grammar)
 
 
 @app.command("en")
 def correct_en(
     text: str = typer.Argument(..., help="English text to correct"),
     grammar: bool = typer.Option(False, "--grammar", help="Include grammar explanations"),
+    stream: bool = typer.Option(False, "--stream", help="Print fields as soon as the model produces them"),
 ) -> None:
+    if _forward("en", text, grammar, stream):
+        return
+    if stream:
+        _stream_result("correct-en", text, grammar)
+        return
+    from pyapp.services.translator import get_service
+
     svc = get_service()
     result = svc.correct_english(text, include_grammar=grammar)
-    _print_result(result, grammar)
+    _print_result(daemon.result_fields(result), grammar)
+
+
+@app.command("daemon")
+def run_daemon(
+    socket_path: Optional[Path] = typer.Option(
+        None, "--socket", help=f"Unix socket to listen on (default: ${daemon.SOCKET_ENV} or a per-user path)"
+    ),
+    workers: int = typer.Option(8, "--workers", help="Requests served concurrently"),
+) -> None:
+    """Keep the translator warm and serve `zh`/`en` for other CLI invocations over a Unix socket."""
+    path = socket_path or daemon.default_socket_path()
+    server = daemon.Daemon(path, workers=workers)
+    typer.echo(f"Listening on {path}", err=True)
+    server.serve_forever()
+
+
+class DocFormat(str, Enum):
+    text = "text"
+    markdown = "markdown"
+    srt = "srt"
+
+
+class DocMode(str, Enum):
+    translate_zh = "translate-zh"
+    correct_en = "correct-en"
+
+
+class DocTarget(str, Enum):
+    en = "en"
+    ja = "ja"
+
+
+@app.command("doc")
+def translate_doc(
+    path: Path = typer.Argument(..., exists=True, dir_okay=False, help="Plain text, Markdown or SRT file"),
+    output: Optional[Path] = typer.Option(None, "--output", "-o", help="Write the result here instead of stdout"),
+    fmt: Optional[DocFormat] = typer.Option(None, "--format", help="Document format (default: from extension)"),
+    mode: DocMode = typer.Option(DocMode.translate_zh, "--mode", help="Translate Chinese or correct English"),
+    target: DocTarget = typer.Option(DocTarget.en, "--target", help="Output language"),
+    workers: int = typer.Option(8, "--workers", help="Segments translated concurrently"),
+) -> None:
+    from pyapp.clients.scheduler import Priority
+    from pyapp.services.documents import DocumentTranslator, detect_format
+    from pyapp.services.translator import get_service
+
+    translator = DocumentTranslator(get_service(priority=Priority.BATCH), workers=workers)
+    chunks = translator.translate(
+        path.read_text(encoding="utf-8"),
+        fmt=fmt.value if fmt else detect_format(path.name),
+        mode=mode.value,
+        target=target.value,
+    )
+    if output is None:
+        for chunk in chunks:
+            typer.echo(chunk, nl=False)
+        return
+    with output.open("w", encoding="utf-8") as handle:
+        for chunk in chunks:
+            handle.write(chunk)
+            handle.flush()
+
+
+def _format_duration(seconds: float) -> str:
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:d}:{minutes:02d}:{secs:02d}"
+
+
+@app.command("batch")
+def run_batch(
+    input_path: Path = typer.Argument(..., exists=True, dir_okay=False, help="JSONL of {text, mode, include_grammar}"),
+    output: Optional[Path] = typer.Option(None, "--output", "-o", help="Results JSONL (default: <input>.out.jsonl)"),
+    concurrency: int = typer.Option(8, "--concurrency", "-c", help="Items translated concurrently"),
+    run_id: Optional[str] = typer.Option(None, "--run-id", help="Checkpoint key (default: the input path)"),
+    restart: bool = typer.Option(False, "--restart", help="Ignore earlier checkpoints and overwrite the output"),
+) -> None:
+    from pyapp.clients.scheduler import Priority
+    from pyapp.db import init_batch_progress_repository
+    from pyapp.services.batch_runner import BatchRunner, BatchStats
+    from pyapp.services.translator import get_service
+
+    output = output or input_path.with_suffix(".out.jsonl")
+    run_id = run_id or str(input_path.resolve())
+    progress = init_batch_progress_repository()
+    runner = BatchRunner(get_service(priority=Priority.BATCH), progress, concurrency=concurrency)
+    last_report = 0.0
+
+    def report(stats: "BatchStats", final: bool = False) -> None:
+        nonlocal last_report
+        now = time.monotonic()
+        if not final and now - last_report < 0.5:
+            return
+        last_report = now
+        eta = stats.eta_seconds
+        typer.echo(
+            f"\r{stats.skipped + stats.processed}/{stats.total} "
+            f"done={stats.done} failed={stats.failed} skipped={stats.skipped} "
+            f"{stats.throughput:.1f}/s eta={_format_duration(eta) if eta is not None else '?'}",
+            err=True,
+            nl=final,
+        )
+
+    stats = runner.run(input_path, output, run_id, on_progress=report, restart=restart)
+    report(stats, final=True)
+    if stats.failed:
+        raise typer.Exit(code=1)
+
+
+@history_app.command("search")
+def history_search(
+    query: str = typer.Argument(..., help="Text to look up in Chinese, English or Japanese"),
+    limit: int = typer.Option(20, "--limit", help="Maximum number of results"),
+    before_id: int = typer.Option(None, "--before-id", help="Only show results older than this id"),
+) -> None:
+    from pyapp.repositories.sqlite_repo import MIN_SEARCH_LENGTH
+    from pyapp.services.translator import get_service
+
+    if len(query) < MIN_SEARCH_LENGTH:
+        raise typer.BadParameter(f"must be at least {MIN_SEARCH_LENGTH} characters", param_hint="QUERY")
+    svc = get_service()
+    page = svc.search_history(query, limit=limit, before_id=before_id)
+    for item in page.items:
+        typer.echo(f"[{item.id}] {item.original_text}")
+        typer.echo(f"  English: {item.translated_text}")
+        if item.japanese_text:
+            typer.echo(f"  Japanese: {item.japanese_text}")
+    if page.next_before_id is not None:
+        typer.echo(f"More results: --before-id {page.next_before_id}")
 
 
 def main() -> None:
@@ -1,38 +1,520 @@
-from typing import Optional, Type
+import asyncio
+import itertools
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterator,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+)
 
-from openai import OpenAI
+import httpx
+from openai import APIConnectionError, AsyncOpenAI, InternalServerError, OpenAI, RateLimitError
 from pydantic import BaseModel
 
-from pyapp.settings import get_settings
+from pyapp.clients.router import Endpoint, EndpointRouter, get_router
+from pyapp.clients.scheduler import Priority, Ticket, get_scheduler
+from pyapp.settings import Settings, get_settings
+from pyapp.utils.metrics import MODEL_COST, MODEL_STAGE_SECONDS, MODEL_TOKENS
+from pyapp.utils.token_utils import estimate_tokens
 
-_client: Optional[OpenAI] = None
+SYSTEM_PROMPT = "Translate the given text and explain the grammar"
 
 
-def get_openai_client() -> OpenAI:
-    """Return a singleton OpenAI client configured from settings."""
-    global _client
-    if _client is None:
-        settings = get_settings()
-        if not settings.openai_api_key:
-            raise ValueError("OPENAI_API_KEY is not set in environment or .env file.")
-        _client = OpenAI(
-            api_key=settings.openai_api_key,
-            base_url=settings.openai_base_url,
-            http_client=None,
+class StreamEvent(NamedTuple):
+    """A streamed structured-output event: kind is "field" (one completed field) or "final" (parsed model)."""
+
+    kind: str
+    field: Optional[str]
+    value: Any
+
+
+_hedge_pool: Optional[ThreadPoolExecutor] = None
+_hedge_pool_lock = threading.Lock()
+
+_ENDPOINT_ERRORS = (APIConnectionError, InternalServerError, RateLimitError)
+
+
+def _http_timeout(settings: Settings) -> httpx.Timeout:
+    return httpx.Timeout(settings.openai_timeout_seconds, connect=settings.openai_connect_timeout_seconds)
+
+
+def _http_limits(settings: Settings) -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=settings.openai_max_connections,
+        max_keepalive_connections=settings.openai_max_keepalive_connections,
+        keepalive_expiry=settings.openai_keepalive_expiry_seconds,
+    )
+
+
+def _build_client(endpoint: Endpoint) -> OpenAI:
+    settings = get_settings()
+    return OpenAI(
+        api_key=endpoint.api_key,
+        base_url=endpoint.base_url,
+        timeout=_http_timeout(settings),
+        max_retries=0,
+        http_client=httpx.Client(timeout=_http_timeout(settings), limits=_http_limits(settings)),
+    )
+
+
+def _build_async_client(endpoint: Endpoint) -> AsyncOpenAI:
+    settings = get_settings()
+    return AsyncOpenAI(
+        api_key=endpoint.api_key,
+        base_url=endpoint.base_url,
+        timeout=_http_timeout(settings),
+        max_retries=0,
+        http_client=httpx.AsyncClient(timeout=_http_timeout(settings), limits=_http_limits(settings)),
+    )
+
+
+def get_openai_client(endpoint: Optional[Endpoint] = None) -> OpenAI:
+    """Return the pooled OpenAI client for an endpoint (the primary one by default)."""
+    return (endpoint or get_router().primary).get_client(_build_client)
+
+
+def get_async_openai_client(endpoint: Optional[Endpoint] = None) -> AsyncOpenAI:
+    """Return the pooled AsyncOpenAI client for an endpoint (the primary one by default)."""
+    return (endpoint or get_router().primary).get_async_client(_build_async_client)
+
+
+async def close_async_openai_client() -> None:
+    """Close every endpoint's pooled async client (call on application shutdown)."""
+    for endpoint in get_router().endpoints:
+        client, endpoint.async_client = endpoint.async_client, None
+        if client is not None:
+            await client.close()
+
+
+def _messages(prompt: str) -> list:
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": prompt},
+    ]
+
+
+def _estimate_request_tokens(prompt: str) -> int:
+    """Prompt tokens plus a conservative guess at the completion, charged before the call."""
+    prompt_tokens = estimate_tokens(SYSTEM_PROMPT) + estimate_tokens(prompt)
+    return prompt_tokens + max(get_settings().model_output_tokens_estimate, 2 * prompt_tokens)
+
+
+def _retry_after(exc: RateLimitError) -> Optional[float]:
+    headers = exc.response.headers
+    for name, scale in (("retry-after-ms", 1000.0), ("retry-after", 1.0)):
+        value = headers.get(name)
+        if value:
+            try:
+                return float(value) / scale
+            except ValueError:
+                continue
+    return None
+
+
+def _usage_tokens(completion: Any) -> Optional[int]:
+    usage = getattr(completion, "usage", None)
+    return usage.total_tokens if usage is not None else None
+
+
+def _backoff(attempt: int) -> float:
+    return min(8.0, 0.25 * 2**attempt) * (0.5 + random.random() / 2)
+
+
+def _should_retry(exc: BaseException, attempt: int, settings: Settings) -> bool:
+    if isinstance(exc, RateLimitError):
+        return attempt < settings.model_rate_limit_retries
+    if isinstance(exc, (APIConnectionError, InternalServerError)):
+        return attempt < settings.openai_max_retries
+    return False
+
+
+def _release_after_error(ticket: Ticket, exc: BaseException) -> None:
+    if isinstance(exc, RateLimitError):
+        get_scheduler().release(ticket, rate_limited=True, retry_after=_retry_after(exc))
+    else:
+        get_scheduler().release(ticket)
+
+
+def _get_hedge_pool() -> ThreadPoolExecutor:
+    global _hedge_pool
+    if _hedge_pool is None:
+        with _hedge_pool_lock:
+            if _hedge_pool is None:
+                workers = get_settings().model_max_concurrency * 2
+                _hedge_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="model-hedge")
+    return _hedge_pool
+
+
+def _hedge_delay(router: EndpointRouter) -> Optional[float]:
+    delay_ms = get_settings().model_hedge_delay_ms
+    if delay_ms is None or len(router) < 2:
+        return None
+    return delay_ms / 1000.0
+
+
+def _record_usage(completion: Any, endpoint: Endpoint) -> None:
+    usage = getattr(completion, "usage", None)
+    if usage is None:
+        return
+    settings = get_settings()
+    model = settings.openai_model
+    MODEL_TOKENS.inc(usage.prompt_tokens or 0, model=model, endpoint=endpoint.name, kind="prompt")
+    MODEL_TOKENS.inc(usage.completion_tokens or 0, model=model, endpoint=endpoint.name, kind="completion")
+    if settings.model_prompt_price_per_million is not None or settings.model_completion_price_per_million is not None:
+        cost = (usage.prompt_tokens or 0) * (settings.model_prompt_price_per_million or 0.0) + (
+            usage.completion_tokens or 0
+        ) * (settings.model_completion_price_per_million or 0.0)
+        MODEL_COST.inc(cost / 1_000_000, model=model, endpoint=endpoint.name)
+
+
+def _parse_response(raw: Any, endpoint: Endpoint) -> Any:
+    """Parse a raw structured-output response, timing the parse separately from the request."""
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        completion = raw.parse()
+        outcome = "ok"
+    finally:
+        MODEL_STAGE_SECONDS.observe(
+            time.perf_counter() - started,
+            stage="parse",
+            model=get_settings().openai_model,
+            endpoint=endpoint.name,
+            outcome=outcome,
         )
-    return _client
+    _record_usage(completion, endpoint)
+    return completion
+
+
+def _observe_request(endpoint: Endpoint, started: float, outcome: str) -> float:
+    latency = time.monotonic() - started
+    MODEL_STAGE_SECONDS.observe(
+        latency, stage="request", model=get_settings().openai_model, endpoint=endpoint.name, outcome=outcome
+    )
+    return latency
+
+
+def _routed_call(call: Callable[[OpenAI], Any], endpoint: Endpoint) -> Any:
+    """Run one raw-response call against an endpoint, feeding its latency or failure back to the router."""
+    started = time.monotonic()
+    try:
+        raw = call(get_openai_client(endpoint))
+    except _ENDPOINT_ERRORS:
+        _observe_request(endpoint, started, "error")
+        get_router().record_failure(endpoint)
+        raise
+    get_router().record_success(endpoint, _observe_request(endpoint, started, "ok"))
+    return _parse_response(raw, endpoint)
+
+
+async def _routed_call_async(call: Callable[[AsyncOpenAI], Awaitable[Any]], endpoint: Endpoint) -> Any:
+    started = time.monotonic()
+    try:
+        raw = await call(get_async_openai_client(endpoint))
+    except _ENDPOINT_ERRORS:
+        _observe_request(endpoint, started, "error")
+        get_router().record_failure(endpoint)
+        raise
+    get_router().record_success(endpoint, _observe_request(endpoint, started, "ok"))
+    return _parse_response(raw, endpoint)
+
+
+def _hedged_call(call: Callable[[OpenAI], Any], failed: Set[Endpoint]) -> Tuple[Any, Set[Future]]:
+    """Call the fastest endpoint; if it has not answered after the hedge delay, race a second one.
+
+    Returns the first successful completion and the requests still running. A thread cannot be
+    cancelled, so the losing request keeps going until it finishes on its own.
+    """
+    router = get_router()
+    primary = router.pick(exclude=failed)
+    delay = _hedge_delay(router)
+    if delay is None:
+        return _call_recording(call, primary, failed), set()
+    pool = _get_hedge_pool()
+    pending: Set[Future] = {pool.submit(_call_recording, call, primary, failed)}
+    done, _ = wait(pending, timeout=delay)
+    if not done:
+        backup = router.pick(exclude=failed | {primary})
+        if backup is not primary:
+            pending.add(pool.submit(_call_recording, call, backup, failed))
+    error: Optional[BaseException] = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                return future.result(), pending
+            error = error or future.exception()
+    raise error
+
+
+def _release_when_settled(ticket: Ticket, completion: Any, running: Set[Future]) -> None:
+    """Release the ticket once the hedged requests still running have finished, so they keep counting."""
+    used_tokens = _usage_tokens(completion)
+    if not running:
+        get_scheduler().release(ticket, used_tokens=used_tokens)
+        return
+    lock = threading.Lock()
+    remaining = len(running)
+
+    def settled(future: Future) -> None:
+        nonlocal used_tokens, remaining
+        tokens = None if future.cancelled() or future.exception() is not None else _usage_tokens(future.result())
+        with lock:
+            if tokens is not None and used_tokens is not None:
+                used_tokens += tokens
+            remaining -= 1
+            if remaining:
+                return
+        get_scheduler().release(ticket, used_tokens=used_tokens)
+
+    for future in running:
+        future.add_done_callback(settled)
+
+
+async def _hedged_call_async(
+    call: Callable[[AsyncOpenAI], Awaitable[Any]], failed: Set[Endpoint]
+) -> Tuple[Any, Endpoint]:
+    router = get_router()
+    primary = router.pick(exclude=failed)
+    delay = _hedge_delay(router)
+    if delay is None:
+        return await _call_recording_async(call, primary, failed), primary
+    tasks: Dict[asyncio.Task, Endpoint] = {
+        asyncio.ensure_future(_call_recording_async(call, primary, failed)): primary
+    }
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        if not done:
+            backup = router.pick(exclude=failed | {primary})
+            if backup is not primary:
+                tasks[asyncio.ensure_future(_call_recording_async(call, backup, failed))] = backup
+        error: Optional[BaseException] = None
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result(), tasks[task]
+                error = error or task.exception()
+        raise error
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def _call_recording(call: Callable[[OpenAI], Any], endpoint: Endpoint, failed: Set[Endpoint]) -> Any:
+    try:
+        return _routed_call(call, endpoint)
+    except _ENDPOINT_ERRORS:
+        failed.add(endpoint)
+        raise
+
+
+async def _call_recording_async(
+    call: Callable[[AsyncOpenAI], Awaitable[Any]], endpoint: Endpoint, failed: Set[Endpoint]
+) -> Any:
+    try:
+        return await _routed_call_async(call, endpoint)
+    except _ENDPOINT_ERRORS:
+        failed.add(endpoint)
+        raise
+
 
+def _scheduled_call(call: Callable[[OpenAI], Any], prompt: str, priority: Priority) -> Any:
+    """Run one model call under the scheduler, routed (and optionally hedged) across endpoints.
 
-def run_structured_chat(prompt: str, response_model: Type[BaseModel]) -> BaseModel:
-    """Call OpenAI chat completion API and parse into the given Pydantic model."""
+    429s and transient errors are retried; each retry avoids the endpoints that already failed
+    for this call while a healthy alternative exists.
+    """
     settings = get_settings()
-    client = get_openai_client()
-    completion = client.beta.chat.completions.parse(
-        model=settings.openai_model,
-        messages=[
-            {"role": "system", "content": "Translate the given text and explain the grammar"},
-            {"role": "user", "content": prompt},
-        ],
-        response_format=response_model,
+    scheduler = get_scheduler()
+    tokens = _estimate_request_tokens(prompt)
+    failed: Set[Endpoint] = set()
+    for attempt in itertools.count():
+        ticket = scheduler.acquire(tokens, priority)
+        try:
+            completion, running = _hedged_call(call, failed)
+        except BaseException as exc:
+            _release_after_error(ticket, exc)
+            if not _should_retry(exc, attempt, settings):
+                raise
+            if not isinstance(exc, RateLimitError):
+                time.sleep(_backoff(attempt))
+            continue
+        _release_when_settled(ticket, completion, running)
+        return completion
+
+
+async def _scheduled_call_async(
+    call: Callable[[AsyncOpenAI], Awaitable[Any]], prompt: str, priority: Priority
+) -> Any:
+    settings = get_settings()
+    scheduler = get_scheduler()
+    tokens = _estimate_request_tokens(prompt)
+    failed: Set[Endpoint] = set()
+    for attempt in itertools.count():
+        ticket = await scheduler.acquire_async(tokens, priority)
+        try:
+            completion, _ = await _hedged_call_async(call, failed)
+        except BaseException as exc:
+            _release_after_error(ticket, exc)
+            if not _should_retry(exc, attempt, settings):
+                raise
+            if not isinstance(exc, RateLimitError):
+                await asyncio.sleep(_backoff(attempt))
+            continue
+        scheduler.release(ticket, used_tokens=_usage_tokens(completion))
+        return completion
+
+
+def run_structured_chat(
+    prompt: str,
+    response_model: Type[BaseModel],
+    priority: Priority = Priority.INTERACTIVE,
+    model: Optional[str] = None,
+) -> BaseModel:
+    """Call OpenAI chat completion API and parse into the given Pydantic model (OPENAI_MODEL unless `model` is given)."""
+    settings = get_settings()
+    completion = _scheduled_call(
+        lambda client: client.beta.chat.completions.with_raw_response.parse(
+            model=model or settings.openai_model,
+            messages=_messages(prompt),
+            response_format=response_model,
+        ),
+        prompt,
+        priority,
+    )
+    return completion.choices[0].message.parsed
+
+
+async def run_structured_chat_async(
+    prompt: str,
+    response_model: Type[BaseModel],
+    priority: Priority = Priority.INTERACTIVE,
+    model: Optional[str] = None,
+) -> BaseModel:
+    """Async variant of run_structured_chat using the endpoints' AsyncOpenAI clients."""
+    settings = get_settings()
+    completion = await _scheduled_call_async(
+        lambda client: client.beta.chat.completions.with_raw_response.parse(
+            model=model or settings.openai_model,
+            messages=_messages(prompt),
+            response_format=response_model,
+        ),
+        prompt,
+        priority,
     )
     return completion.choices[0].message.parsed
+
+
+def _completed_fields(parsed: Optional[Dict[str, Any]], emitted: Set[str], final: bool) -> Iterator[StreamEvent]:
+    """Yield fields that can no longer change: all but the key still being written, or all of them at the end."""
+    if not isinstance(parsed, dict):
+        return
+    keys = list(parsed)
+    done = keys if final else keys[:-1]
+    for key in done:
+        if key not in emitted:
+            emitted.add(key)
+            yield StreamEvent("field", key, parsed[key])
+
+
+def _observe_stream(endpoint: Endpoint, started: float, outcome: str) -> None:
+    MODEL_STAGE_SECONDS.observe(
+        time.monotonic() - started,
+        stage="stream",
+        model=get_settings().openai_model,
+        endpoint=endpoint.name,
+        outcome=outcome,
+    )
+
+
+def stream_structured_chat(
+    prompt: str,
+    response_model: Type[BaseModel],
+    priority: Priority = Priority.INTERACTIVE,
+    model: Optional[str] = None,
+) -> Iterator[StreamEvent]:
+    """Stream a structured completion, yielding each field as it completes and then the parsed model."""
+    settings = get_settings()
+    endpoint = get_router().pick()
+    client = get_openai_client(endpoint)
+    emitted: Set[str] = set()
+    parsed: Optional[Dict[str, Any]] = None
+    ticket = get_scheduler().acquire(_estimate_request_tokens(prompt), priority)
+    started = time.monotonic()
+    try:
+        with client.beta.chat.completions.stream(
+            model=model or settings.openai_model,
+            messages=_messages(prompt),
+            response_format=response_model,
+        ) as stream:
+            for event in stream:
+                if event.type == "content.delta":
+                    parsed = event.parsed
+                    yield from _completed_fields(parsed, emitted, final=False)
+            completion = stream.get_final_completion()
+    except BaseException as exc:
+        if isinstance(exc, _ENDPOINT_ERRORS):
+            get_router().record_failure(endpoint)
+        _observe_stream(endpoint, started, "error")
+        _release_after_error(ticket, exc)
+        raise
+    get_router().record_success(endpoint)
+    _observe_stream(endpoint, started, "ok")
+    _record_usage(completion, endpoint)
+    get_scheduler().release(ticket, used_tokens=_usage_tokens(completion))
+    yield from _completed_fields(parsed, emitted, final=True)
+    yield StreamEvent("final", None, completion.choices[0].message.parsed)
+
+
+async def stream_structured_chat_async(
+    prompt: str,
+    response_model: Type[BaseModel],
+    priority: Priority = Priority.INTERACTIVE,
+    model: Optional[str] = None,
+) -> AsyncIterator[StreamEvent]:
+    """Async variant of stream_structured_chat using the endpoints' AsyncOpenAI clients."""
+    settings = get_settings()
+    endpoint = get_router().pick()
+    client = get_async_openai_client(endpoint)
+    emitted: Set[str] = set()
+    parsed: Optional[Dict[str, Any]] = None
+    ticket = await get_scheduler().acquire_async(_estimate_request_tokens(prompt), priority)
+    started = time.monotonic()
+    try:
+        async with client.beta.chat.completions.stream(
+            model=model or settings.openai_model,
+            messages=_messages(prompt),
+            response_format=response_model,
+        ) as stream:
+            async for event in stream:
+                if event.type == "content.delta":
+                    parsed = event.parsed
+                    for field_event in _completed_fields(parsed, emitted, final=False):
+                        yield field_event
+            completion = await stream.get_final_completion()
+    except BaseException as exc:
+        if isinstance(exc, _ENDPOINT_ERRORS):
+            get_router().record_failure(endpoint)
+        _observe_stream(endpoint, started, "error")
+        _release_after_error(ticket, exc)
+        raise
+    get_router().record_success(endpoint)
+    _observe_stream(endpoint, started, "ok")
+    _record_usage(completion, endpoint)
+    get_scheduler().release(ticket, used_tokens=_usage_tokens(completion))
+    for field_event in _completed_fields(parsed, emitted, final=True):
+        yield field_event
+    yield StreamEvent("final", None, completion.choices[0].message.parsed)
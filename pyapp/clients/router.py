@@ -0,0 +1,142 @@
+import threading
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Callable, Collection, Dict, List, Optional
+
+from pyapp.settings import get_settings
+
+
+@dataclass(eq=False)
+class Endpoint:
+    """One upstream (base URL + key) with its own clients and health/latency state."""
+
+    name: str
+    base_url: str
+    api_key: str
+    ewma_latency: Optional[float] = None
+    consecutive_failures: int = 0
+    unhealthy_until: float = 0.0
+    requests: int = 0
+    failures: int = 0
+    sync_client: Any = None
+    async_client: Any = None
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def get_client(self, factory: Callable[["Endpoint"], Any]) -> Any:
+        if self.sync_client is None:
+            with self.lock:
+                if self.sync_client is None:
+                    self.sync_client = factory(self._require_key())
+        return self.sync_client
+
+    def get_async_client(self, factory: Callable[["Endpoint"], Any]) -> Any:
+        if self.async_client is None:
+            with self.lock:
+                if self.async_client is None:
+                    self.async_client = factory(self._require_key())
+        return self.async_client
+
+    def _require_key(self) -> "Endpoint":
+        # Checked when a client is first needed rather than in get_router(), so that building
+        # the router (e.g. to close clients on shutdown) works without a key.
+        if not self.api_key:
+            raise ValueError("OPENAI_API_KEY is not set in environment or .env file.")
+        return self
+
+
+class EndpointRouter:
+    """Least-latency routing over endpoints, tracking an EWMA of latency and ejecting failing ones."""
+
+    def __init__(
+        self,
+        endpoints: List[Endpoint],
+        alpha: float = 0.3,
+        failure_threshold: int = 3,
+        cooldown_seconds: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if not endpoints:
+            raise ValueError("at least one model endpoint is required")
+        self.endpoints = endpoints
+        self.alpha = alpha
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.endpoints)
+
+    @property
+    def primary(self) -> Endpoint:
+        return self.endpoints[0]
+
+    def pick(self, exclude: Collection[Endpoint] = ()) -> Endpoint:
+        """Healthy endpoint with the lowest EWMA latency; untried endpoints go first."""
+        now = self._clock()
+        with self._lock:
+            candidates = [ep for ep in self.endpoints if ep not in exclude] or list(self.endpoints)
+            healthy = [ep for ep in candidates if ep.unhealthy_until <= now]
+            if not healthy:
+                return min(candidates, key=lambda ep: ep.unhealthy_until)
+            return min(healthy, key=lambda ep: ep.ewma_latency if ep.ewma_latency is not None else -1.0)
+
+    def record_success(self, endpoint: Endpoint, latency: Optional[float] = None) -> None:
+        """Mark the endpoint healthy; latency (omitted for streams) feeds the EWMA."""
+        with self._lock:
+            endpoint.requests += 1
+            endpoint.consecutive_failures = 0
+            endpoint.unhealthy_until = 0.0
+            if latency is None:
+                return
+            if endpoint.ewma_latency is None:
+                endpoint.ewma_latency = latency
+            else:
+                endpoint.ewma_latency += self.alpha * (latency - endpoint.ewma_latency)
+
+    def record_failure(self, endpoint: Endpoint) -> None:
+        with self._lock:
+            endpoint.requests += 1
+            endpoint.failures += 1
+            endpoint.consecutive_failures += 1
+            if endpoint.consecutive_failures >= self.failure_threshold:
+                endpoint.unhealthy_until = self._clock() + self.cooldown_seconds
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        now = self._clock()
+        with self._lock:
+            return [
+                {
+                    "name": ep.name,
+                    "base_url": ep.base_url,
+                    "healthy": ep.unhealthy_until <= now,
+                    "ewma_latency": ep.ewma_latency,
+                    "requests": ep.requests,
+                    "failures": ep.failures,
+                }
+                for ep in self.endpoints
+            ]
+
+
+def _split(value: Optional[str]) -> List[str]:
+    return [item.strip() for item in (value or "").split(",") if item.strip()]
+
+
+@lru_cache
+def get_router() -> EndpointRouter:
+    """Build the process-wide router from OPENAI_BASE_URLS / OPENAI_API_KEYS (or the single-URL settings)."""
+    settings = get_settings()
+    urls = _split(settings.openai_base_urls) or [settings.openai_base_url]
+    keys = _split(settings.openai_api_keys) or [settings.openai_api_key or ""]
+    if len(keys) not in (1, len(urls)):
+        raise ValueError("OPENAI_API_KEYS must have one key, or one key per OPENAI_BASE_URLS entry.")
+    endpoints = [
+        Endpoint(name=f"endpoint-{index}", base_url=url, api_key=keys[index] if len(keys) > 1 else keys[0])
+        for index, url in enumerate(urls)
+    ]
+    return EndpointRouter(
+        endpoints,
+        failure_threshold=settings.openai_endpoint_failure_threshold,
+        cooldown_seconds=settings.openai_endpoint_cooldown_seconds,
+    )
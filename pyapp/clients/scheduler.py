@@ -0,0 +1,221 @@
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from dataclasses import dataclass
+from enum import IntEnum
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional
+
+from pyapp.settings import get_settings
+
+
+class Priority(IntEnum):
+    """Lower values are served first."""
+
+    INTERACTIVE = 0
+    TASK = 1
+    BATCH = 2
+
+
+@dataclass
+class Ticket:
+    tokens: int
+    granted_at: float
+
+
+class _Bucket:
+    """Per-minute budget refilled continuously; None capacity means unlimited."""
+
+    def __init__(self, per_minute: Optional[int], now: float):
+        self.capacity = float(per_minute) if per_minute else None
+        self.level = self.capacity or 0.0
+        self.updated_at = now
+
+    def refill(self, now: float) -> None:
+        if self.capacity is None:
+            return
+        self.level = min(self.capacity, self.level + (now - self.updated_at) * self.capacity / 60.0)
+        self.updated_at = now
+
+    def wait_time(self, amount: float) -> float:
+        if self.capacity is None:
+            return 0.0
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) * 60.0 / self.capacity
+
+    def take(self, amount: float) -> None:
+        if self.capacity is not None:
+            self.level -= min(amount, self.capacity)
+
+    def adjust(self, delta: float) -> None:
+        """Charge (or refund) the difference between actual and estimated usage."""
+        if self.capacity is not None:
+            self.level = min(self.capacity, self.level - delta)
+
+
+class _Waiter:
+    def __init__(self, priority: int, seq: int, tokens: int, loop: Optional[asyncio.AbstractEventLoop]):
+        self.priority = priority
+        self.seq = seq
+        self.tokens = tokens
+        self.loop = loop
+        self.event = asyncio.Event() if loop is not None else threading.Event()
+        self.granted = False
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+    def wake(self) -> None:
+        if self.loop is None:
+            self.event.set()
+        else:
+            self.loop.call_soon_threadsafe(self.event.set)
+
+
+class ModelScheduler:
+    """Admission control for model calls.
+
+    Enforces requests-per-minute and tokens-per-minute budgets (estimated up front, corrected
+    with the usage reported by the API), serves waiters in priority order, and adapts the
+    concurrency limit AIMD-style: +1/limit per success, halved on a 429, with a cooldown taken
+    from Retry-After. Works for threads and asyncio tasks alike.
+    """
+
+    def __init__(
+        self,
+        rpm: Optional[int] = None,
+        tpm: Optional[int] = None,
+        max_concurrency: int = 64,
+        min_concurrency: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        now = clock()
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self._clock = clock
+        self._requests = _Bucket(rpm, now)
+        self._tokens = _Bucket(tpm, now)
+        self._limit = float(max_concurrency)
+        self._in_flight = 0
+        self._cooldown_until = 0.0
+        self._waiters: List[_Waiter] = []
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._rate_limited = 0
+
+    def acquire(self, tokens: int, priority: int = Priority.INTERACTIVE) -> Ticket:
+        waiter = self._enqueue(tokens, priority, loop=None)
+        try:
+            while True:
+                waiter.event.clear()
+                with self._lock:
+                    delay = self._try_grant(waiter)
+                if waiter.granted:
+                    return Ticket(tokens=tokens, granted_at=self._clock())
+                waiter.event.wait(delay)
+        except BaseException:
+            self._abandon(waiter)
+            raise
+
+    async def acquire_async(self, tokens: int, priority: int = Priority.INTERACTIVE) -> Ticket:
+        waiter = self._enqueue(tokens, priority, loop=asyncio.get_running_loop())
+        try:
+            while True:
+                waiter.event.clear()
+                with self._lock:
+                    delay = self._try_grant(waiter)
+                if waiter.granted:
+                    return Ticket(tokens=tokens, granted_at=self._clock())
+                try:
+                    await asyncio.wait_for(waiter.event.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+        except BaseException:
+            self._abandon(waiter)
+            raise
+
+    def release(
+        self,
+        ticket: Ticket,
+        used_tokens: Optional[int] = None,
+        rate_limited: bool = False,
+        retry_after: Optional[float] = None,
+    ) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            if used_tokens is not None:
+                self._tokens.adjust(used_tokens - ticket.tokens)
+            if rate_limited:
+                self._rate_limited += 1
+                self._limit = max(float(self.min_concurrency), self._limit / 2)
+                self._cooldown_until = max(self._cooldown_until, self._clock() + (retry_after or 1.0))
+            else:
+                self._limit = min(float(self.max_concurrency), self._limit + 1.0 / self._limit)
+            self._wake_head()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "in_flight": self._in_flight,
+                "concurrency_limit": self._limit,
+                "waiting": len(self._waiters),
+                "rate_limited": self._rate_limited,
+            }
+
+    def _enqueue(self, tokens: int, priority: int, loop: Optional[asyncio.AbstractEventLoop]) -> _Waiter:
+        waiter = _Waiter(int(priority), next(self._seq), tokens, loop)
+        with self._lock:
+            heapq.heappush(self._waiters, waiter)
+        return waiter
+
+    def _abandon(self, waiter: _Waiter) -> None:
+        with self._lock:
+            if waiter.granted:
+                return
+            was_head = bool(self._waiters) and self._waiters[0] is waiter
+            self._waiters.remove(waiter)
+            heapq.heapify(self._waiters)
+            if was_head:
+                self._wake_head()
+
+    def _try_grant(self, waiter: _Waiter) -> Optional[float]:
+        """Grant the slot if this waiter is first in line and budgets allow; else return how long to wait."""
+        if self._waiters[0] is not waiter:
+            return None
+        now = self._clock()
+        if now < self._cooldown_until:
+            return self._cooldown_until - now
+        if self._in_flight >= int(self._limit):
+            return None
+        self._requests.refill(now)
+        self._tokens.refill(now)
+        delay = max(self._requests.wait_time(1), self._tokens.wait_time(waiter.tokens))
+        if delay > 0:
+            return delay
+        self._requests.take(1)
+        self._tokens.take(waiter.tokens)
+        self._in_flight += 1
+        heapq.heappop(self._waiters)
+        waiter.granted = True
+        self._wake_head()
+        return None
+
+    def _wake_head(self) -> None:
+        if self._waiters:
+            self._waiters[0].wake()
+
+
+@lru_cache
+def get_scheduler() -> ModelScheduler:
+    """Return the process-wide scheduler configured from settings."""
+    settings = get_settings()
+    return ModelScheduler(
+        rpm=settings.model_rpm,
+        tpm=settings.model_tpm,
+        max_concurrency=settings.model_max_concurrency,
+        min_concurrency=settings.model_min_concurrency,
+    )
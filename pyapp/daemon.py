@@ -0,0 +1,228 @@
+"""Resident CLI daemon: a Unix-socket server that keeps the translator, its HTTP pool and DB handles warm.
+
+Only the standard library is imported at module level, so the CLI can check for a running daemon
+and forward a request without paying for pydantic, openai or the database setup.
+"""
+
+import json
+import os
+import signal
+import socket
+import stat
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+SOCKET_ENV = "PYAPP_DAEMON_SOCKET"
+_MODES = {"zh": "translate-zh", "en": "correct-en"}
+# Settings that change what a request returns or where it is stored; the CLI and daemon must agree on them.
+_SHARED_SETTINGS = ("DB_PATH", "OPENAI_MODEL", "HIRAGANA_ENGINE")
+_DEFAULT_DB_PATH = "translations.db"  # Settings.database_path default
+
+
+class DaemonUnavailable(Exception):
+    """No daemon is listening on the socket; the caller should do the work in-process."""
+
+
+def default_socket_path() -> Path:
+    """$PYAPP_DAEMON_SOCKET, else pyapp.sock in $XDG_RUNTIME_DIR or in a per-user directory under the temp dir."""
+    configured = os.environ.get(SOCKET_ENV)
+    if configured:
+        return Path(configured)
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return Path(runtime_dir) / "pyapp.sock"
+    return Path(tempfile.gettempdir()) / f"pyapp-{os.getuid()}" / "pyapp.sock"
+
+
+def _private_dir(path: Path) -> None:
+    """Create `path` mode 0700 if missing; refuse one another user owns or could swap the socket in."""
+    path.mkdir(mode=0o700, parents=True, exist_ok=True)
+    info = os.stat(path)
+    if info.st_uid != os.getuid() or info.st_mode & 0o022:
+        raise RuntimeError(f"{path} must be owned and writable only by the current user")
+
+
+def settings_fingerprint() -> Dict[str, Optional[str]]:
+    """The shared settings as this process sees them: environment first, then ./.env; DB_PATH made absolute.
+
+    Only python-dotenv is loaded, so forwarding a CLI call still skips pydantic and the settings module.
+    """
+    from dotenv import dotenv_values
+
+    dotenv = dotenv_values(".env")
+    values = {key: os.environ.get(key, dotenv.get(key)) for key in _SHARED_SETTINGS}
+    values["DB_PATH"] = str(Path(values["DB_PATH"] or _DEFAULT_DB_PATH).resolve())
+    return values
+
+
+def _owned_socket(path: Path) -> bool:
+    """True if `path` is a socket created by the current user, so requests are not sent to someone else's."""
+    try:
+        info = os.lstat(path)
+    except OSError:
+        return False
+    return stat.S_ISSOCK(info.st_mode) and info.st_uid == os.getuid()
+
+
+def request(payload: Dict[str, Any], socket_path: Optional[Path] = None) -> Iterator[Dict[str, Any]]:
+    """Send one request, with this process's settings fingerprint, and return an iterator over its JSON-line events.
+
+    Raises DaemonUnavailable, before anything is sent, when no daemon of the current user is listening.
+    A daemon started with other settings answers with a single `mismatch` event instead of running it.
+    """
+    path = socket_path or default_socket_path()
+    if not _owned_socket(path):
+        raise DaemonUnavailable(str(path))
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(str(path))
+    except (FileNotFoundError, ConnectionRefusedError, PermissionError) as exc:
+        sock.close()
+        raise DaemonUnavailable(str(path)) from exc
+    return _exchange(sock, {**payload, "settings": settings_fingerprint()})
+
+
+def _exchange(sock: socket.socket, payload: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    with sock, sock.makefile("rwb") as stream:
+        stream.write(json.dumps(payload, ensure_ascii=False).encode("utf-8") + b"\n")
+        stream.flush()
+        for line in stream:
+            yield json.loads(line)
+
+
+def result_fields(result) -> Dict[str, Any]:
+    """A TranslationResponse as the CLI prints it (timestamp in str() form)."""
+    return {**result.model_dump(exclude={"timestamp"}), "timestamp": str(result.timestamp)}
+
+
+class Daemon:
+    """Serve CLI requests over a Unix socket with a fixed pool of worker threads.
+
+    Workers are long-lived so each keeps its pooled SQLite connection; the OpenAI client
+    and its keep-alive connections are shared by all of them.
+    """
+
+    def __init__(self, socket_path: Path, workers: int = 8):
+        self.socket_path = Path(socket_path)
+        self.workers = workers
+        self.service = None
+        # Taken before the settings module loads .env into the environment, the same way clients compute it.
+        self.settings = settings_fingerprint()
+        self._server: Optional[socket.socket] = None
+        self._stopping = threading.Event()
+
+    def serve_forever(self) -> None:
+        from pyapp.clients.openai_client import get_openai_client
+        from pyapp.services.translator import get_service
+
+        self.service = get_service()
+        if self.service.reader is not None:
+            self.service.reader.warm_up()
+        get_openai_client()
+
+        self._bind()
+        previous = {sig: signal.signal(sig, self._on_signal) for sig in (signal.SIGINT, signal.SIGTERM)}
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="pyapp-daemon") as pool:
+                while not self._stopping.is_set():
+                    try:
+                        conn, _ = self._server.accept()
+                    except OSError:
+                        break
+                    pool.submit(self._handle, conn)
+        finally:
+            for sig, handler in previous.items():
+                signal.signal(sig, handler)
+            self._close()
+
+    def stop(self) -> None:
+        self._stopping.set()
+        if self._server is not None:
+            # Unblock accept(); shutdown alone is not enough on every platform.
+            try:
+                self._server.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self._server.close()
+
+    def _on_signal(self, signum, frame) -> None:
+        self.stop()
+
+    def _bind(self) -> None:
+        _private_dir(self.socket_path.parent)
+        if self.socket_path.exists():
+            try:
+                # A daemon that is shutting down may accept and close without answering.
+                pong = next(request({"command": "ping"}, self.socket_path), None)
+            except (DaemonUnavailable, OSError):
+                pong = None
+            if pong is not None:
+                raise RuntimeError(f"a daemon is already listening on {self.socket_path}")
+            self.socket_path.unlink()
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        old_umask = os.umask(0o177)
+        try:
+            server.bind(str(self.socket_path))
+        finally:
+            os.umask(old_umask)
+        server.listen(64)
+        self._server = server
+
+    def _close(self) -> None:
+        from pyapp.db import close_database
+
+        self.socket_path.unlink(missing_ok=True)
+        if self.service is not None:
+            self.service.repository.close()
+        close_database()
+
+    def _handle(self, conn: socket.socket) -> None:
+        with conn, conn.makefile("rwb") as stream:
+
+            def send(event: Dict[str, Any]) -> None:
+                stream.write(json.dumps(event, ensure_ascii=False).encode("utf-8") + b"\n")
+                stream.flush()
+
+            try:
+                line = stream.readline()
+                if not line:
+                    return
+                payload = json.loads(line)
+                for event in self._run(payload):
+                    send(event)
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+            except Exception as exc:
+                try:
+                    send({"event": "error", "message": f"{type(exc).__name__}: {exc}"})
+                except OSError:
+                    pass
+
+    def _run(self, payload: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        command = payload.get("command")
+        if command == "ping":
+            yield {"event": "pong", "pid": os.getpid()}
+            return
+        if command not in _MODES:
+            raise ValueError(f"unsupported command: {command}")
+        client_settings = payload.get("settings") or {}
+        mismatched = [key for key in _SHARED_SETTINGS if client_settings.get(key) != self.settings[key]]
+        if mismatched:
+            yield {"event": "mismatch", "settings": mismatched}
+            return
+        mode, text, grammar = _MODES[command], payload["text"], bool(payload.get("grammar"))
+        if payload.get("stream"):
+            for event in self.service.stream(mode, text, include_grammar=grammar):
+                if event.kind == "final":
+                    yield {"event": "final", "timestamp": str(event.value.timestamp)}
+                else:
+                    yield {"event": "field", "field": event.field, "value": event.value}
+            return
+        if mode == "translate-zh":
+            result = self.service.translate_chinese(text, include_grammar=grammar)
+        else:
+            result = self.service.correct_english(text, include_grammar=grammar)
+        yield {"event": "result", "result": result_fields(result)}
@@ -1,15 +1,109 @@
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+from pyapp.repositories.batch_repo import BatchProgressRepository
+from pyapp.repositories.cache_repo import CacheRepository
+from pyapp.repositories.connection import close_pools
+from pyapp.repositories.job_repo import TaskJobRepository
+from pyapp.repositories.memory_repo import TranslationMemoryRepository
+from pyapp.repositories.migrations import migrate
 from pyapp.repositories.sqlite_repo import TranslationRepository
 from pyapp.repositories.task_repo import TaskRepository
+from pyapp.repositories.write_behind import WriteBehindTranslationRepository
+from pyapp.services.cache import TranslationCache
+from pyapp.services.hiragana import HiraganaReader, create_reader
+from pyapp.services.memory import TranslationMemory
 from pyapp.settings import get_settings
 
 
+@lru_cache
+def _migrate_once(db_path: Path) -> int:
+    return migrate(db_path)
+
+
+def init_database() -> Path:
+    """Run pending schema migrations (once per process) and return the database path."""
+    settings = get_settings()
+    _migrate_once(settings.database_path)
+    return settings.database_path
+
+
+@lru_cache
+def _write_behind_repository(db_path: Path) -> WriteBehindTranslationRepository:
+    settings = get_settings()
+    return WriteBehindTranslationRepository(
+        db_path,
+        max_queue=settings.write_behind_queue_size,
+        batch_size=settings.write_behind_batch_size,
+        flush_interval=settings.write_behind_flush_interval_ms / 1000,
+    )
+
+
 def init_repository() -> TranslationRepository:
     """Initialize repository with current settings (ensures schema)."""
-    settings = get_settings()
-    return TranslationRepository(settings.database_path)
+    db_path = init_database()
+    if get_settings().write_behind_enabled:
+        repository = _write_behind_repository(db_path)
+        if repository.closed:
+            # Closed at the end of an earlier app lifespan (e.g. a previous TestClient): start a new writer.
+            _write_behind_repository.cache_clear()
+            repository = _write_behind_repository(db_path)
+        return repository
+    return TranslationRepository(db_path)
 
 
 def init_task_repository() -> TaskRepository:
     """Initialize task repository with current settings (ensures schema)."""
+    return TaskRepository(init_database())
+
+
+def init_task_job_repository() -> TaskJobRepository:
+    """Initialize the durable task job queue with current settings (ensures schema)."""
+    return TaskJobRepository(init_database())
+
+
+def init_batch_progress_repository() -> BatchProgressRepository:
+    """Initialize batch checkpoint repository with current settings (ensures schema)."""
+    return BatchProgressRepository(init_database())
+
+
+@lru_cache
+def get_translation_cache() -> Optional[TranslationCache]:
+    """Return the process-wide translation result cache, or None when disabled."""
+    settings = get_settings()
+    if not settings.cache_enabled:
+        return None
+    return TranslationCache(
+        repository=CacheRepository(init_database()),
+        max_entries=settings.cache_max_entries,
+        ttl_seconds=settings.cache_ttl_seconds,
+        persistent_max_entries=settings.cache_persistent_max_entries,
+    )
+
+
+@lru_cache
+def get_translation_memory() -> Optional[TranslationMemory]:
+    """Return the process-wide fuzzy translation memory, or None when disabled."""
+    settings = get_settings()
+    if not settings.tm_enabled:
+        return None
+    return TranslationMemory(TranslationMemoryRepository(init_database()), sync_batch=settings.tm_sync_batch)
+
+
+def close_database() -> None:
+    """Close every pooled connection and drop the cached repositories built on them (call on shutdown).
+
+    Close the translator's repository first so a write-behind queue is drained while the pool is open.
+    """
+    _write_behind_repository.cache_clear()
+    get_translation_cache.cache_clear()
+    get_translation_memory.cache_clear()
+    close_pools()
+
+
+@lru_cache
+def get_hiragana_reader() -> Optional[HiraganaReader]:
+    """Return the process-wide local hiragana reader, or None when the model supplies readings."""
     settings = get_settings()
-    return TaskRepository(settings.database_path)
+    return create_reader(settings.hiragana_engine, settings.hiragana_cache_size)
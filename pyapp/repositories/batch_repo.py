@@ -0,0 +1,42 @@
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional, Sequence, Set, Tuple
+
+from pyapp.repositories.connection import get_pool
+
+
+class BatchProgressRepository:
+    """SQLite-backed checkpoints for resumable batch runs."""
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.pool = get_pool(self.db_path)
+
+    @contextmanager
+    def _connection(self):
+        with self.pool.connection() as conn:
+            yield conn
+
+    def completed_lines(self, run_id: str) -> Set[int]:
+        with self._connection() as conn:
+            rows = conn.execute(
+                "SELECT line_no FROM batch_progress WHERE run_id = ? AND status = 'done'",
+                (run_id,),
+            ).fetchall()
+            return {row[0] for row in rows}
+
+    def mark_many(self, run_id: str, entries: Sequence[Tuple[int, str, Optional[str]]], timestamp: str) -> None:
+        """Record (line_no, status, error) checkpoints in one transaction."""
+        with self.pool.transaction() as conn:
+            conn.executemany(
+                """
+                INSERT OR REPLACE INTO batch_progress (run_id, line_no, status, error, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                [(run_id, line_no, status, error, timestamp) for line_no, status, error in entries],
+            )
+
+    def reset(self, run_id: str) -> None:
+        with self._connection() as conn:
+            conn.execute("DELETE FROM batch_progress WHERE run_id = ?", (run_id,))
+            conn.commit()
@@ -0,0 +1,73 @@
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional, Tuple
+
+from pyapp.repositories.connection import get_pool
+
+
+class CacheRepository:
+    """SQLite-backed persistent tier of the translation result cache."""
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.pool = get_pool(self.db_path)
+
+    @contextmanager
+    def _connection(self):
+        with self.pool.connection() as conn:
+            yield conn
+
+    def get(self, cache_key: str, accessed_at: float) -> Optional[Tuple[str, float]]:
+        """Return (payload, created_at) for a key and bump its access time."""
+        with self._connection() as conn:
+            row = conn.execute(
+                "SELECT payload, created_at FROM translation_cache WHERE cache_key = ?",
+                (cache_key,),
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE translation_cache SET accessed_at = ? WHERE cache_key = ?",
+                (accessed_at, cache_key),
+            )
+            conn.commit()
+            return row[0], row[1]
+
+    def put(self, cache_key: str, payload: str, created_at: float) -> None:
+        with self._connection() as conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO translation_cache (cache_key, payload, created_at, accessed_at)
+                VALUES (?, ?, ?, ?)
+                """,
+                (cache_key, payload, created_at, created_at),
+            )
+            conn.commit()
+
+    def delete(self, cache_key: str) -> None:
+        with self._connection() as conn:
+            conn.execute("DELETE FROM translation_cache WHERE cache_key = ?", (cache_key,))
+            conn.commit()
+
+    def evict(self, created_before: Optional[float], max_entries: Optional[int]) -> int:
+        """Drop expired rows, then the least recently used rows beyond max_entries."""
+        removed = 0
+        with self._connection() as conn:
+            if created_before is not None:
+                removed += conn.execute(
+                    "DELETE FROM translation_cache WHERE created_at < ?",
+                    (created_before,),
+                ).rowcount
+            if max_entries is not None:
+                removed += conn.execute(
+                    """
+                    DELETE FROM translation_cache WHERE cache_key IN (
+                        SELECT cache_key FROM translation_cache
+                        ORDER BY accessed_at DESC
+                        LIMIT -1 OFFSET ?
+                    )
+                    """,
+                    (max_entries,),
+                ).rowcount
+            conn.commit()
+        return removed
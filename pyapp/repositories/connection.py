@@ -0,0 +1,119 @@
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator
+
+from pyapp.settings import get_settings
+
+
+class ConnectionPool:
+    """Long-lived, per-thread SQLite connections configured for concurrent readers and writers.
+
+    A thread's connection is closed once the thread has exited (checked whenever a new thread
+    connects). After close() the pool refuses to hand out connections.
+    """
+
+    def __init__(self, db_path: Path, busy_timeout_ms: int = 5000, cached_statements: int = 256):
+        self.db_path = Path(db_path)
+        self.busy_timeout_ms = busy_timeout_ms
+        self.cached_statements = cached_statements
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: Dict[threading.Thread, sqlite3.Connection] = {}
+        self._closed = False
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.busy_timeout_ms / 1000,
+            cached_statements=self.cached_statements,
+            check_same_thread=False,
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+        conn.execute("PRAGMA foreign_keys=ON")
+        with self._lock:
+            if self._closed:
+                conn.close()
+                raise RuntimeError(f"connection pool for {self.db_path} is closed")
+            dead = [thread for thread in self._connections if not thread.is_alive()]
+            stale = [self._connections.pop(thread) for thread in dead]
+            self._connections[threading.current_thread()] = conn
+        for old in stale:
+            old.close()
+        return conn
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def _thread_connection(self) -> sqlite3.Connection:
+        if self._closed:
+            raise RuntimeError(f"connection pool for {self.db_path} is closed")
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Yield this thread's connection, rolling back any open transaction on error."""
+        conn = self._thread_connection()
+        try:
+            yield conn
+        except BaseException:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run a block in one write transaction, taking the write lock up front."""
+        with self.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            yield conn
+            conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            connections, self._connections = list(self._connections.values()), {}
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+
+_pools: Dict[Path, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path: Path) -> ConnectionPool:
+    """Return the process-wide pool for a database file."""
+    key = Path(db_path).resolve()
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            settings = get_settings()
+            pool = ConnectionPool(
+                key,
+                busy_timeout_ms=settings.db_busy_timeout_ms,
+                cached_statements=settings.db_cached_statements,
+            )
+            _pools[key] = pool
+        return pool
+
+
+def close_pools() -> None:
+    """Close every pool; repositories still holding one fail loudly instead of reconnecting.
+
+    Use pyapp.db.close_database() on shutdown, which also drops the cached repositories.
+    """
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
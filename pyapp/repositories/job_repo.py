@@ -0,0 +1,120 @@
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from pyapp.repositories.connection import get_pool
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+
+class TaskJobRepository:
+    """SQLite-backed durable queue of server-side task executions.
+
+    A claimed job holds a lease (epoch seconds); a job whose lease ran out, because the
+    process running it died, is claimable again. A requeued job waits until its
+    available_at. Completions are fenced on the attempt number so a worker whose lease
+    was taken over cannot overwrite the newer attempt.
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.pool = get_pool(self.db_path)
+
+    @contextmanager
+    def _connection(self):
+        with self.pool.connection() as conn:
+            yield conn
+
+    def get(self, task_id: int) -> Optional[Dict[str, Any]]:
+        with self._connection() as conn:
+            row = conn.execute("SELECT * FROM task_jobs WHERE task_id = ?", (task_id,)).fetchone()
+            return dict(row) if row else None
+
+    def queued_count(self) -> int:
+        with self._connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM task_jobs WHERE status = ?", (JOB_QUEUED,)).fetchone()[0]
+
+    def enqueue(self, task_id: int, timestamp: str) -> Tuple[Dict[str, Any], bool]:
+        """Queue a job for the task unless one is already queued, running or done.
+
+        A failed job is reset and queued again. Returns the job row and whether it was (re)queued.
+        """
+        with self.pool.transaction() as conn:
+            row = conn.execute("SELECT * FROM task_jobs WHERE task_id = ?", (task_id,)).fetchone()
+            if row is not None and row["status"] != JOB_FAILED:
+                return dict(row), False
+            if row is not None:
+                row = conn.execute(
+                    """
+                    UPDATE task_jobs
+                    SET status = ?, attempts = 0, lease_until = NULL, available_at = NULL, result_hash = NULL,
+                        error = NULL, enqueued_at = ?, started_at = NULL, finished_at = NULL
+                    WHERE task_id = ?
+                    RETURNING *
+                    """,
+                    (JOB_QUEUED, timestamp, task_id),
+                ).fetchone()
+            else:
+                row = conn.execute(
+                    "INSERT INTO task_jobs (task_id, status, enqueued_at) VALUES (?, ?, ?) RETURNING *",
+                    (task_id, JOB_QUEUED, timestamp),
+                ).fetchone()
+            return dict(row), True
+
+    def claim(self, limit: int, now: float, lease_until: float, timestamp: str) -> List[Tuple[int, int]]:
+        """Lease up to `limit` due queued (or lease-expired) jobs in FIFO order; returns (task_id, attempt) pairs."""
+        with self.pool.transaction() as conn:
+            rows = conn.execute(
+                """
+                UPDATE task_jobs
+                SET status = ?, attempts = attempts + 1, lease_until = ?, started_at = ?
+                WHERE id IN (
+                    SELECT id FROM task_jobs
+                    WHERE (status = ? AND (available_at IS NULL OR available_at <= ?))
+                       OR (status = ? AND lease_until < ?)
+                    ORDER BY id LIMIT ?
+                )
+                RETURNING task_id, attempts
+                """,
+                (JOB_RUNNING, lease_until, timestamp, JOB_QUEUED, now, JOB_RUNNING, now, limit),
+            ).fetchall()
+            return [(row["task_id"], row["attempts"]) for row in rows]
+
+    def finish(
+        self,
+        task_id: int,
+        attempt: int,
+        status: str,
+        timestamp: str,
+        result_hash: Optional[str] = None,
+        error: Optional[str] = None,
+    ) -> bool:
+        """Record the outcome of an attempt; False if the attempt no longer owns the job."""
+        with self._connection() as conn:
+            updated = conn.execute(
+                """
+                UPDATE task_jobs
+                SET status = ?, lease_until = NULL, result_hash = ?, error = ?, finished_at = ?
+                WHERE task_id = ? AND attempts = ? AND status = ?
+                """,
+                (status, result_hash, error, timestamp, task_id, attempt, JOB_RUNNING),
+            ).rowcount
+            conn.commit()
+            return updated == 1
+
+    def requeue(self, task_id: int, attempt: int, error: str, available_at: Optional[float] = None) -> bool:
+        """Put a failed attempt back in the queue for another try, not claimable before `available_at`."""
+        with self._connection() as conn:
+            updated = conn.execute(
+                """
+                UPDATE task_jobs
+                SET status = ?, lease_until = NULL, available_at = ?, error = ?
+                WHERE task_id = ? AND attempts = ? AND status = ?
+                """,
+                (JOB_QUEUED, available_at, error, task_id, attempt, JOB_RUNNING),
+            ).rowcount
+            conn.commit()
+            return updated == 1
@@ -0,0 +1,82 @@
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from pyapp.repositories.connection import get_pool
+
+
+class TranslationMemoryRepository:
+    """SQLite-backed MinHash band index over stored translations."""
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.pool = get_pool(self.db_path)
+
+    @contextmanager
+    def _connection(self):
+        with self.pool.connection() as conn:
+            yield conn
+
+    def last_indexed_id(self) -> int:
+        with self._connection() as conn:
+            return conn.execute("SELECT COALESCE(MAX(translation_id), 0) FROM translation_memory").fetchone()[0]
+
+    def unindexed_rows(self, after_id: int, limit: int) -> List[Dict[str, Any]]:
+        """Translations stored after `after_id` that the index has not seen yet, oldest first."""
+        with self._connection() as conn:
+            rows = conn.execute(
+                """
+                SELECT id, chinese, model,
+                       english_grammar IS NOT NULL AND japanese_grammar IS NOT NULL AS has_grammar
+                FROM translations WHERE id > ? ORDER BY id LIMIT ?
+                """,
+                (after_id, limit),
+            ).fetchall()
+            return [dict(row) for row in rows]
+
+    def index_many(self, entries: Sequence[Tuple[int, str, Optional[str], bool, Sequence[int]]]) -> None:
+        """Record (translation_id, mode, model, has_grammar, band_keys) entries in one transaction."""
+        with self.pool.transaction() as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO translation_memory (translation_id, mode, model, has_grammar) "
+                "VALUES (?, ?, ?, ?)",
+                [
+                    (translation_id, mode, model, int(has_grammar))
+                    for translation_id, mode, model, has_grammar, _ in entries
+                ],
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO translation_memory_bands (band_key, translation_id) VALUES (?, ?)",
+                [(band_key, entry[0]) for entry in entries for band_key in entry[4]],
+            )
+
+    def candidates(self, band_keys: Sequence[int], per_band: int, limit: int) -> List[Dict[str, Any]]:
+        """Translations sharing MinHash bands with the query, those sharing the most bands first.
+
+        Each band contributes at most its `per_band` newest rows, so a large cluster of
+        near-identical sentences costs a bounded index range scan per band.
+        """
+        if not band_keys:
+            return []
+        per_band_sql = " UNION ALL ".join(
+            "SELECT * FROM (SELECT translation_id FROM translation_memory_bands "
+            "WHERE band_key = ? ORDER BY translation_id DESC LIMIT ?)"
+            for _ in band_keys
+        )
+        params: List[Any] = []
+        for band_key in band_keys:
+            params += [band_key, per_band]
+        with self._connection() as conn:
+            rows = conn.execute(
+                f"""
+                SELECT t.*, m.has_grammar FROM (
+                    SELECT translation_id, COUNT(*) AS shared FROM ({per_band_sql})
+                    GROUP BY translation_id ORDER BY shared DESC, translation_id DESC LIMIT ?
+                ) c
+                JOIN translation_memory m ON m.translation_id = c.translation_id
+                JOIN translations t ON t.id = c.translation_id
+                ORDER BY c.shared DESC, c.translation_id DESC
+                """,
+                (*params, limit),
+            ).fetchall()
+            return [dict(row) for row in rows]
@@ -0,0 +1,209 @@
+import sqlite3
+from pathlib import Path
+from typing import List, Tuple
+
+from pyapp.repositories.connection import get_pool
+
+# Ordered (version, statements) pairs. Append new migrations; never edit applied ones.
+MIGRATIONS: List[Tuple[int, List[str]]] = [
+    (
+        1,
+        [
+            """
+            CREATE TABLE IF NOT EXISTS translations (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                chinese TEXT NOT NULL,
+                english TEXT NOT NULL,
+                english_grammar TEXT,
+                japanese TEXT,
+                hiragana TEXT,
+                japanese_grammar TEXT,
+                timestamp TEXT NOT NULL
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS tasks (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                task_id INTEGER UNIQUE,
+                input_hash TEXT UNIQUE NOT NULL,
+                input_payload TEXT NOT NULL,
+                result_hash TEXT,
+                result_payload TEXT,
+                status TEXT NOT NULL,
+                requester TEXT,
+                model TEXT,
+                fee TEXT,
+                chain_id INTEGER,
+                tx_hash TEXT,
+                block_number INTEGER,
+                created_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL
+            )
+            """,
+        ],
+    ),
+    (
+        2,
+        [
+            """
+            CREATE TABLE IF NOT EXISTS translation_cache (
+                cache_key TEXT PRIMARY KEY,
+                payload TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """,
+            "CREATE INDEX IF NOT EXISTS idx_translation_cache_accessed ON translation_cache(accessed_at)",
+        ],
+    ),
+    (
+        3,
+        [
+            """
+            CREATE VIRTUAL TABLE IF NOT EXISTS translations_fts USING fts5(
+                chinese, english, japanese,
+                content='translations', content_rowid='id', tokenize='trigram'
+            )
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS translations_fts_ai AFTER INSERT ON translations BEGIN
+                INSERT INTO translations_fts (rowid, chinese, english, japanese)
+                VALUES (new.id, new.chinese, new.english, new.japanese);
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS translations_fts_ad AFTER DELETE ON translations BEGIN
+                INSERT INTO translations_fts (translations_fts, rowid, chinese, english, japanese)
+                VALUES ('delete', old.id, old.chinese, old.english, old.japanese);
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS translations_fts_au AFTER UPDATE ON translations BEGIN
+                INSERT INTO translations_fts (translations_fts, rowid, chinese, english, japanese)
+                VALUES ('delete', old.id, old.chinese, old.english, old.japanese);
+                INSERT INTO translations_fts (rowid, chinese, english, japanese)
+                VALUES (new.id, new.chinese, new.english, new.japanese);
+            END
+            """,
+            "INSERT INTO translations_fts (translations_fts) VALUES ('rebuild')",
+        ],
+    ),
+    (
+        4,
+        [
+            """
+            CREATE TABLE IF NOT EXISTS batch_progress (
+                run_id TEXT NOT NULL,
+                line_no INTEGER NOT NULL,
+                status TEXT NOT NULL,
+                error TEXT,
+                updated_at TEXT NOT NULL,
+                PRIMARY KEY (run_id, line_no)
+            ) WITHOUT ROWID
+            """,
+        ],
+    ),
+    (
+        5,
+        [
+            """
+            CREATE TABLE IF NOT EXISTS translation_memory (
+                translation_id INTEGER PRIMARY KEY REFERENCES translations(id) ON DELETE CASCADE,
+                mode TEXT NOT NULL,
+                has_grammar INTEGER NOT NULL
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS translation_memory_bands (
+                band_key INTEGER NOT NULL,
+                translation_id INTEGER NOT NULL REFERENCES translation_memory(translation_id) ON DELETE CASCADE,
+                PRIMARY KEY (band_key, translation_id)
+            ) WITHOUT ROWID
+            """,
+            "CREATE INDEX IF NOT EXISTS idx_translation_memory_bands_id ON translation_memory_bands(translation_id)",
+        ],
+    ),
+    (
+        6,
+        [
+            # Covering index for task listing: a keyset scan in id order per status.
+            """
+            CREATE INDEX IF NOT EXISTS idx_tasks_status_id
+            ON tasks(status, id, updated_at, task_id, input_hash, result_hash, created_at)
+            """,
+        ],
+    ),
+    (
+        7,
+        [
+            """
+            CREATE TABLE IF NOT EXISTS task_jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                task_id INTEGER UNIQUE NOT NULL REFERENCES tasks(task_id),
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                lease_until REAL,
+                result_hash TEXT,
+                error TEXT,
+                enqueued_at TEXT NOT NULL,
+                started_at TEXT,
+                finished_at TEXT
+            )
+            """,
+            "CREATE INDEX IF NOT EXISTS idx_task_jobs_status_id ON task_jobs(status, id)",
+        ],
+    ),
+    # Version 8 was withdrawn; databases that applied it only lost an index version 6 no longer creates.
+    (
+        9,
+        [
+            # Translation memory is scoped to the model that produced each row; older rows have none
+            # and are never matched. The index is rebuilt so every band key includes the model.
+            "ALTER TABLE translations ADD COLUMN model TEXT",
+            "ALTER TABLE translation_memory ADD COLUMN model TEXT",
+            "DELETE FROM translation_memory_bands",
+            "DELETE FROM translation_memory",
+        ],
+    ),
+    (
+        10,
+        [
+            # Epoch seconds before which a requeued job is not claimed (retry backoff); NULL means now.
+            "ALTER TABLE task_jobs ADD COLUMN available_at REAL",
+        ],
+    ),
+]
+
+
+def current_version(conn: sqlite3.Connection) -> int:
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'schema_version'"
+    ).fetchone()
+    if not exists:
+        return 0
+    row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    return row[0] or 0
+
+
+def migrate(db_path: Path) -> int:
+    """Apply pending migrations in order, each in its own transaction. Returns the schema version."""
+    pool = get_pool(db_path)
+    with pool.connection() as conn:
+        version = current_version(conn)
+    for target, statements in MIGRATIONS:
+        if target <= version:
+            continue
+        with pool.transaction() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS schema_version (version INTEGER PRIMARY KEY, applied_at TEXT NOT NULL)"
+            )
+            if current_version(conn) < target:
+                for statement in statements:
+                    conn.execute(statement)
+                conn.execute(
+                    "INSERT INTO schema_version (version, applied_at) "
+                    "VALUES (?, strftime('%Y-%m-%dT%H:%M:%SZ', 'now'))",
+                    (target,),
+                )
+        version = target
+    return version
@@ -1,8 +1,12 @@
-import sqlite3
 from contextlib import contextmanager
 from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 from pyapp.models.schemas import TranslationResponse
+from pyapp.repositories.connection import get_pool
+
+# The trigram index cannot answer anything shorter; such a search would scan the whole table.
+MIN_SEARCH_LENGTH = 3
 
 
 class TranslationRepository:
@@ -10,55 +14,59 @@ class TranslationRepository:
 
     def __init__(self, db_path: Path):
         self.db_path = Path(db_path)
-        self._ensure_schema()
+        self.pool = get_pool(self.db_path)
 
     @contextmanager
     def _connection(self):
-        conn = sqlite3.connect(self.db_path)
-        try:
+        with self.pool.connection() as conn:
             yield conn
-        finally:
-            conn.close()
 
-    def _ensure_schema(self) -> None:
-        """Create table if it does not exist."""
-        with self._connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                """
-                CREATE TABLE IF NOT EXISTS translations (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    chinese TEXT NOT NULL,
-                    english TEXT NOT NULL,
-                    english_grammar TEXT,
-                    japanese TEXT,
-                    hiragana TEXT,
-                    japanese_grammar TEXT,
-                    timestamp TEXT NOT NULL
-                )
-                """
-            )
-            conn.commit()
+    def save(self, result: TranslationResponse, model: Optional[str] = None) -> None:
+        """Persist a translation result, with the model that produced it, to the database."""
+        self.save_many([result], model)
 
-    def save(self, result: TranslationResponse) -> None:
-        """Persist a translation result to the database."""
+    def save_many(self, results: Iterable[TranslationResponse], model: Optional[str] = None) -> None:
+        """Persist several translation results from one model in a single transaction."""
         with self._connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(
+            conn.executemany(
                 """
                 INSERT INTO translations
-                (chinese, english, english_grammar, japanese, hiragana, japanese_grammar, timestamp)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
+                (chinese, english, english_grammar, japanese, hiragana, japanese_grammar, timestamp, model)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
                 """,
-                (
-                    result.original_text,
-                    result.translated_text,
-                    result.english_grammar,
-                    result.japanese_text,
-                    result.hiragana_pronunciation,
-                    result.japanese_grammar,
-                    result.timestamp.isoformat(),
-                ),
+                [(*self._row(result), model) for result in results],
             )
             conn.commit()
 
+    def search(self, query: str, limit: int = 20, before_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Full-text search over stored translations, newest first, paginated by id.
+
+        Raises ValueError for queries shorter than MIN_SEARCH_LENGTH characters.
+        """
+        if len(query) < MIN_SEARCH_LENGTH:
+            raise ValueError(f"search query must be at least {MIN_SEARCH_LENGTH} characters")
+        sql = """
+            SELECT t.* FROM translations_fts f JOIN translations t ON t.id = f.rowid
+            WHERE translations_fts MATCH ? AND f.rowid < ?
+            ORDER BY f.rowid DESC LIMIT ?
+        """
+        term = '"' + query.replace('"', '""') + '"'
+        cursor_id = before_id if before_id is not None else 2**63 - 1
+        with self._connection() as conn:
+            rows = conn.execute(sql, (term, cursor_id, limit)).fetchall()
+            return [dict(row) for row in rows]
+
+    def close(self) -> None:
+        """Release resources held by the repository (nothing to do for synchronous writes)."""
+
+    @staticmethod
+    def _row(result: TranslationResponse) -> Tuple[Optional[str], ...]:
+        return (
+            result.original_text,
+            result.translated_text,
+            result.english_grammar,
+            result.japanese_text,
+            result.hiragana_pronunciation,
+            result.japanese_grammar,
+            result.timestamp.isoformat(),
+        )
@@ -1,7 +1,19 @@
-import sqlite3
+import heapq
 from contextlib import contextmanager
+from itertools import islice
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from pyapp.models.schemas import TaskClaimRequest
+from pyapp.repositories.connection import get_pool
+
+CLAIM_CREATED = "created"
+CLAIM_NOT_FOUND = "not_found"
+CLAIM_INPUT_CONFLICT = "input_conflict"
+CLAIM_TASK_CONFLICT = "task_conflict"
+
+# Stay well below SQLite's bound-parameter limit for IN (...) lookups.
+_IN_CHUNK = 500
 
 
 class TaskRepository:
@@ -9,42 +21,12 @@ class TaskRepository:
 
     def __init__(self, db_path: Path):
         self.db_path = Path(db_path)
-        self._ensure_schema()
+        self.pool = get_pool(self.db_path)
 
     @contextmanager
     def _connection(self):
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        try:
+        with self.pool.connection() as conn:
             yield conn
-        finally:
-            conn.close()
-
-    def _ensure_schema(self) -> None:
-        with self._connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                """
-                CREATE TABLE IF NOT EXISTS tasks (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    task_id INTEGER UNIQUE,
-                    input_hash TEXT UNIQUE NOT NULL,
-                    input_payload TEXT NOT NULL,
-                    result_hash TEXT,
-                    result_payload TEXT,
-                    status TEXT NOT NULL,
-                    requester TEXT,
-                    model TEXT,
-                    fee TEXT,
-                    chain_id INTEGER,
-                    tx_hash TEXT,
-                    block_number INTEGER,
-                    created_at TEXT NOT NULL,
-                    updated_at TEXT NOT NULL
-                )
-                """
-            )
-            conn.commit()
 
     def get_by_input_hash(self, input_hash: str) -> Optional[Dict[str, Any]]:
         with self._connection() as conn:
@@ -62,51 +44,120 @@ class TaskRepository:
             ).fetchone()
             return dict(row) if row else None
 
-    def insert_prepared(self, input_hash: str, input_payload: str, timestamp: str) -> None:
-        with self._connection() as conn:
-            conn.execute(
-                """
-                INSERT INTO tasks (input_hash, input_payload, status, created_at, updated_at)
-                VALUES (?, ?, ?, ?, ?)
-                """,
-                (input_hash, input_payload, "prepared", timestamp, timestamp),
-            )
-            conn.commit()
-
-    def update_claim(
+    def list_tasks(
         self,
-        task_id: int,
-        input_hash: str,
-        requester: Optional[str],
-        model: Optional[str],
-        fee: Optional[str],
-        chain_id: Optional[int],
-        tx_hash: Optional[str],
-        block_number: Optional[int],
-        timestamp: str,
-    ) -> None:
+        statuses: Optional[Sequence[str]],
+        updated_before: Optional[str],
+        after_id: Optional[int],
+        limit: int,
+    ) -> List[Dict[str, Any]]:
+        """Compact task rows (no payloads) in id order, after a keyset cursor.
+
+        Each status is read with its own keyset scan of idx_tasks_status_id and the runs are merged
+        by id here; a single `status IN (...)` query would sort the matches in a temp B-tree.
+        Without statuses, `updated_before` is checked row by row along the primary key: a page costs
+        as many rows as precede its `limit` matches, so callers filtering by age should pass a status.
+        """
+        clauses = ["id > ?"]
+        params: List[Any] = [after_id or 0]
+        if updated_before is not None:
+            clauses.append("updated_at < ?")
+            params.append(updated_before)
+        sql = f"""
+            SELECT id, task_id, input_hash, result_hash, status, created_at, updated_at
+            FROM tasks WHERE {{status}}{' AND '.join(clauses)}
+            ORDER BY id LIMIT ?
+        """
         with self._connection() as conn:
-            conn.execute(
+            if not statuses:
+                rows = conn.execute(sql.format(status=""), (*params, limit)).fetchall()
+                return [dict(row) for row in rows]
+            runs = [
+                conn.execute(sql.format(status="status = ? AND "), (status, *params, limit)).fetchall()
+                for status in dict.fromkeys(statuses)
+            ]
+            merged = heapq.merge(*runs, key=lambda row: row["id"])
+            return [dict(row) for row in islice(merged, limit)]
+
+    def prepare_many(self, entries: Sequence[Tuple[str, str]], timestamp: str) -> Tuple[Dict[str, str], Set[str]]:
+        """Insert (input_hash, input_payload) pairs that are not stored yet, in one transaction.
+
+        Returns the created_at of every hash and the set of hashes inserted by this call.
+        """
+        payloads = dict(entries)
+        hashes = list(payloads)
+        created: Dict[str, str] = {}
+        with self.pool.transaction() as conn:
+            for start in range(0, len(hashes), _IN_CHUNK):
+                chunk = hashes[start : start + _IN_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                rows = conn.execute(
+                    f"SELECT input_hash, created_at FROM tasks WHERE input_hash IN ({placeholders})",
+                    chunk,
+                ).fetchall()
+                created.update((row["input_hash"], row["created_at"]) for row in rows)
+            inserted = {input_hash for input_hash in hashes if input_hash not in created}
+            conn.executemany(
                 """
-                UPDATE tasks
-                SET task_id = ?, status = ?, requester = ?, model = ?, fee = ?,
-                    chain_id = ?, tx_hash = ?, block_number = ?, updated_at = ?
-                WHERE input_hash = ?
+                INSERT OR IGNORE INTO tasks (input_hash, input_payload, status, created_at, updated_at)
+                VALUES (?, ?, 'prepared', ?, ?)
                 """,
-                (
-                    task_id,
-                    "created",
-                    requester,
-                    model,
-                    fee,
-                    chain_id,
-                    tx_hash,
-                    block_number,
-                    timestamp,
-                    input_hash,
-                ),
+                [(input_hash, payloads[input_hash], timestamp, timestamp) for input_hash in inserted],
             )
-            conn.commit()
+        created.update((input_hash, timestamp) for input_hash in inserted)
+        return created, inserted
+
+    def claim_many(self, claims: Sequence[TaskClaimRequest], timestamp: str) -> List[str]:
+        """Bind task ids to prepared inputs in one transaction.
+
+        Each claim is a single conditional UPDATE ... RETURNING; the outcome per claim is
+        CLAIM_CREATED, CLAIM_NOT_FOUND, CLAIM_INPUT_CONFLICT or CLAIM_TASK_CONFLICT.
+        """
+        outcomes = []
+        with self.pool.transaction() as conn:
+            for claim in claims:
+                row = conn.execute(
+                    """
+                    UPDATE tasks
+                    SET task_id = ?, status = 'created', requester = ?, model = ?, fee = ?,
+                        chain_id = ?, tx_hash = ?, block_number = ?, updated_at = ?
+                    WHERE input_hash = ?
+                      AND (task_id IS NULL OR task_id = ?)
+                      AND NOT EXISTS (
+                          SELECT 1 FROM tasks AS other
+                          WHERE other.task_id = ? AND other.input_hash != ?
+                      )
+                    RETURNING id
+                    """,
+                    (
+                        claim.task_id,
+                        claim.requester,
+                        claim.model,
+                        claim.fee,
+                        claim.chain_id,
+                        claim.tx_hash,
+                        claim.block_number,
+                        timestamp,
+                        claim.input_hash,
+                        claim.task_id,
+                        claim.task_id,
+                        claim.input_hash,
+                    ),
+                ).fetchone()
+                if row is not None:
+                    outcomes.append(CLAIM_CREATED)
+                    continue
+                existing = conn.execute(
+                    "SELECT task_id FROM tasks WHERE input_hash = ?",
+                    (claim.input_hash,),
+                ).fetchone()
+                if existing is None:
+                    outcomes.append(CLAIM_NOT_FOUND)
+                elif existing["task_id"] is not None and existing["task_id"] != claim.task_id:
+                    outcomes.append(CLAIM_INPUT_CONFLICT)
+                else:
+                    outcomes.append(CLAIM_TASK_CONFLICT)
+        return outcomes
 
     def update_result(
         self,
@@ -0,0 +1,116 @@
+import atexit
+import logging
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from pyapp.models.schemas import TranslationResponse
+from pyapp.repositories.sqlite_repo import TranslationRepository
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class WriteQueueFullError(Exception):
+    pass
+
+
+class WriteBehindTranslationRepository(TranslationRepository):
+    """TranslationRepository whose saves are queued and group-committed by a background writer thread."""
+
+    def __init__(
+        self,
+        db_path: Path,
+        max_queue: int = 10_000,
+        batch_size: int = 200,
+        flush_interval: float = 0.2,
+        put_timeout: float = 5.0,
+    ):
+        super().__init__(db_path)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self._queue: "queue.Queue[object]" = queue.Queue(maxsize=max_queue)
+        self._closed = False
+        # Held while enqueueing so close() cannot slip _STOP in ahead of a producer's items.
+        self._put_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="translation-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def save(self, result: TranslationResponse, model: Optional[str] = None) -> None:
+        self.save_many([result], model)
+
+    def save_many(self, results: Iterable[TranslationResponse], model: Optional[str] = None) -> None:
+        """Queue results for the writer; blocks up to put_timeout per item when the queue is full."""
+        with self._put_lock:
+            if self._closed:
+                raise RuntimeError("write-behind repository is closed")
+            for result in results:
+                try:
+                    self._queue.put((result, model), timeout=self.put_timeout)
+                except queue.Full as exc:
+                    raise WriteQueueFullError("translation write queue is full") from exc
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def flush(self) -> None:
+        """Block until everything queued so far is committed."""
+        self._queue.join()
+
+    def close(self) -> None:
+        """Stop accepting writes, drain the queue and stop the writer."""
+        with self._put_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+        self._thread.join()
+        atexit.unregister(self.close)
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            batch: List[Tuple[TranslationResponse, Optional[str]]] = []
+            taken = 1
+            if item is _STOP:
+                stopping = True
+            else:
+                batch.append(item)
+                deadline = time.monotonic() + self.flush_interval
+                while len(batch) < self.batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = self._queue.get(timeout=remaining)
+                    except queue.Empty:
+                        break
+                    taken += 1
+                    if item is _STOP:
+                        stopping = True
+                        break
+                    batch.append(item)
+            if batch:
+                self._write(batch)
+            for _ in range(taken):
+                self._queue.task_done()
+
+    def _write(self, batch: List[Tuple[TranslationResponse, Optional[str]]]) -> None:
+        by_model: Dict[Optional[str], List[TranslationResponse]] = {}
+        for result, model in batch:
+            by_model.setdefault(model, []).append(result)
+        for model, results in by_model.items():
+            try:
+                super().save_many(results, model)
+            except Exception:
+                logger.exception("failed to persist %d queued translations", len(results))
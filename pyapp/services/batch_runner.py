@@ -0,0 +1,182 @@
+import json
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from pyapp.models.schemas import TaskInput, TranslationResponse
+from pyapp.repositories.batch_repo import BatchProgressRepository
+from pyapp.services.translator import TranslatorService
+from pyapp.utils.time_utils import format_utc_timestamp, utc_now
+
+
+@dataclass
+class BatchStats:
+    total: int
+    skipped: int = 0
+    done: int = 0
+    failed: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def processed(self) -> int:
+        return self.done + self.failed
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+
+    @property
+    def throughput(self) -> float:
+        return self.processed / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def eta_seconds(self) -> Optional[float]:
+        remaining = self.total - self.skipped - self.processed
+        if not self.throughput:
+            return None
+        return remaining / self.throughput
+
+
+class BatchRunner:
+    """Run a JSONL file of {text, mode, include_grammar} items through the translator, resumably.
+
+    Input is streamed line by line; at most `concurrency * 2` items are in flight. Each result is
+    appended to the output JSONL and flushed at once, then checkpointed in SQLite in groups, so an
+    interrupted run picks up where it stopped. Lines already in the output count as done even if the
+    run died before their checkpoint, so no line is written twice and a kill loses at most the
+    records still being translated. Failures go to a separate errors JSONL, rewritten on
+    every run, and are retried next time.
+    """
+
+    def __init__(
+        self,
+        translator: TranslatorService,
+        progress: BatchProgressRepository,
+        concurrency: int = 8,
+        checkpoint_every: int = 50,
+    ):
+        self.translator = translator
+        self.progress = progress
+        self.concurrency = concurrency
+        self.checkpoint_every = checkpoint_every
+
+    def run(
+        self,
+        input_path: Path,
+        output_path: Path,
+        run_id: str,
+        on_progress: Optional[Callable[[BatchStats], None]] = None,
+        errors_path: Optional[Path] = None,
+        restart: bool = False,
+    ) -> BatchStats:
+        """Translate every line not yet done; `restart` forgets earlier checkpoints and truncates the output."""
+        errors_path = errors_path or output_path.with_suffix(".errors.jsonl")
+        if restart:
+            self.progress.reset(run_id)
+            completed: Set[int] = set()
+        else:
+            completed = self.progress.completed_lines(run_id) | _written_lines(output_path)
+        stats = BatchStats(total=_count_lines(input_path))
+        checkpoints: List[Tuple[int, str, Optional[str]]] = []
+
+        pool = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="batch")
+        try:
+            with output_path.open("w" if restart else "a", encoding="utf-8") as output, errors_path.open(
+                "w", encoding="utf-8"
+            ) as errors:
+                in_flight: Dict[Future, int] = {}
+
+                def drain(block_until: int) -> None:
+                    while len(in_flight) > block_until:
+                        finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                        for future in finished:
+                            line_no = in_flight.pop(future)
+                            self._record(output, errors, stats, checkpoints, line_no, future)
+                        if len(checkpoints) >= self.checkpoint_every:
+                            self._checkpoint(output, run_id, checkpoints)
+                        if on_progress is not None:
+                            on_progress(stats)
+
+                try:
+                    for line_no, raw in _read_lines(input_path):
+                        if line_no in completed:
+                            stats.skipped += 1
+                            continue
+                        if not raw.strip():
+                            stats.skipped += 1
+                            continue
+                        in_flight[pool.submit(self._translate, raw)] = line_no
+                        drain(block_until=self.concurrency * 2)
+                    drain(block_until=0)
+                finally:
+                    # Also on errors and Ctrl-C: whatever reached the output is checkpointed.
+                    self._checkpoint(output, run_id, checkpoints)
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+        return stats
+
+    def _translate(self, raw: str) -> Tuple[TaskInput, TranslationResponse]:
+        item = TaskInput.model_validate_json(raw)
+        if item.mode == "translate-zh":
+            return item, self.translator.translate_chinese(item.text, include_grammar=item.include_grammar)
+        return item, self.translator.correct_english(item.text, include_grammar=item.include_grammar)
+
+    @staticmethod
+    def _record(output, errors, stats: BatchStats, checkpoints: list, line_no: int, future: Future) -> None:
+        try:
+            item, result = future.result()
+        except Exception as exc:
+            stats.failed += 1
+            checkpoints.append((line_no, "failed", str(exc)))
+            errors.write(json.dumps({"line": line_no, "error": str(exc)}, ensure_ascii=False) + "\n")
+            return
+        stats.done += 1
+        checkpoints.append((line_no, "done", None))
+        record = {"line": line_no, "input": item.model_dump(), "result": result.model_dump(mode="json")}
+        output.write(json.dumps(record, ensure_ascii=False) + "\n")
+        # The output file is the resume record; anything left in the buffer would be translated again.
+        output.flush()
+
+    def _checkpoint(self, output, run_id: str, checkpoints: list) -> None:
+        if not checkpoints:
+            return
+        output.flush()
+        self.progress.mark_many(run_id, checkpoints, format_utc_timestamp(utc_now()))
+        checkpoints.clear()
+
+
+def _read_lines(path: Path) -> Iterator[Tuple[int, str]]:
+    with path.open("r", encoding="utf-8") as handle:
+        for line_no, line in enumerate(handle, start=1):
+            yield line_no, line
+
+
+def _written_lines(path: Path) -> Set[int]:
+    """Line numbers already in an output file; a torn last record from a crash is cut off."""
+    written: Set[int] = set()
+    if not path.exists():
+        return written
+    end = 0
+    with path.open("rb+") as handle:
+        for record in handle:
+            if not record.endswith(b"\n"):
+                handle.truncate(end)
+                break
+            end += len(record)
+            try:
+                written.add(json.loads(record)["line"])
+            except (ValueError, KeyError, TypeError):
+                continue
+    return written
+
+
+def _count_lines(path: Path) -> int:
+    count = 0
+    last = b"\n"
+    with path.open("rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            count += block.count(b"\n")
+            last = block[-1:]
+    return count + (last != b"\n")
@@ -0,0 +1,121 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from pyapp.models.schemas import TranslationResponse
+from pyapp.repositories.cache_repo import CacheRepository
+from pyapp.utils.hash_utils import hash_payload
+
+
+def make_cache_key(
+    mode: str, text: str, include_grammar: bool, model: str, prompt_version: str, hiragana_engine: str = "model"
+) -> str:
+    """Content-addressed key for a translation request, including who produces the hiragana reading."""
+    cache_key, _ = hash_payload(
+        {
+            "mode": mode,
+            "text": text,
+            "include_grammar": include_grammar,
+            "model": model,
+            "prompt_version": prompt_version,
+            "hiragana_engine": hiragana_engine,
+        }
+    )
+    return cache_key
+
+
+class TranslationCache:
+    """Two-tier result cache: bounded in-process LRU in front of a SQLite table."""
+
+    def __init__(
+        self,
+        repository: Optional[CacheRepository],
+        max_entries: int = 1024,
+        ttl_seconds: Optional[float] = None,
+        persistent_max_entries: Optional[int] = None,
+        evict_every: int = 100,
+    ):
+        self.repository = repository
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.persistent_max_entries = persistent_max_entries
+        self.evict_every = evict_every
+        self._entries: "OrderedDict[str, Tuple[TranslationResponse, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._puts_since_evict = 0
+        self._hits = 0
+        self._persistent_hits = 0
+        self._misses = 0
+
+    def get(self, cache_key: str) -> Optional[TranslationResponse]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is not None:
+                result, created_at = entry
+                if not self._expired(created_at, now):
+                    self._entries.move_to_end(cache_key)
+                    self._hits += 1
+                    return result
+                del self._entries[cache_key]
+
+        if self.repository is not None:
+            row = self.repository.get(cache_key, accessed_at=now)
+            if row is not None:
+                payload, created_at = row
+                if not self._expired(created_at, now):
+                    result = TranslationResponse.model_validate_json(payload)
+                    with self._lock:
+                        self._remember(cache_key, result, created_at)
+                        self._hits += 1
+                        self._persistent_hits += 1
+                    return result
+                self.repository.delete(cache_key)
+
+        with self._lock:
+            self._misses += 1
+        return None
+
+    def put(self, cache_key: str, result: TranslationResponse) -> None:
+        now = time.time()
+        with self._lock:
+            self._remember(cache_key, result, now)
+            self._puts_since_evict += 1
+            run_evict = self._puts_since_evict >= self.evict_every
+            if run_evict:
+                self._puts_since_evict = 0
+        if self.repository is not None:
+            self.repository.put(cache_key, result.model_dump_json(), created_at=now)
+            if run_evict:
+                self.evict()
+
+    def evict(self) -> int:
+        """Apply TTL and size limits to the persistent tier."""
+        if self.repository is None:
+            return 0
+        created_before = time.time() - self.ttl_seconds if self.ttl_seconds else None
+        return self.repository.evict(created_before, self.persistent_max_entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "persistent_hits": self._persistent_hits,
+                "misses": self._misses,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+            }
+
+    def _remember(self, cache_key: str, result: TranslationResponse, created_at: float) -> None:
+        self._entries[cache_key] = (result, created_at)
+        self._entries.move_to_end(cache_key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return bool(self.ttl_seconds) and now - created_at > self.ttl_seconds
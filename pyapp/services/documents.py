@@ -0,0 +1,197 @@
+import logging
+import re
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Deque, Iterator, List, Literal, Optional, Tuple
+
+from pyapp.models.schemas import TranslationResponse
+from pyapp.services.translator import TranslatorService
+
+DocumentFormat = Literal["text", "markdown", "srt"]
+TargetLanguage = Literal["en", "ja"]
+
+# Put in front of a segment whose translation failed; the source text is kept so the document stays whole.
+UNTRANSLATED_MARKER = "[untranslated] "
+
+logger = logging.getLogger(__name__)
+
+_SENTENCE_END = re.compile(r"(?<=[。！？!?；;])|(?<=\.)(?=\s)")
+_SRT_TIMING = re.compile(r"^\d{2}:\d{2}:\d{2}[,.]\d{3}\s*-->\s*\d{2}:\d{2}:\d{2}[,.]\d{3}")
+_MARKDOWN_PREFIX = re.compile(r"^(\s*(?:#{1,6}\s+|[-*+]\s+|\d+[.)]\s+|>\s*)*)(.*)$")
+_TABLE_PIPE = re.compile(r"(?<!\\)\|")
+
+
+@dataclass
+class Segment:
+    """A piece of the document; only segments with translate=True are sent to the model."""
+
+    text: str
+    translate: bool = False
+    prefix: str = ""
+    suffix: str = ""
+    # Directly follows another sentence on the same line, as in "你好。我很好。"; English needs a space there.
+    joined: bool = False
+    # Line break to restore inside a multi-line segment, which is sent to the model joined with "\n".
+    newline: str = "\n"
+
+
+def split_sentences(text: str) -> List[str]:
+    parts = [part for part in _SENTENCE_END.split(text) if part]
+    return parts or [text]
+
+
+def segment_text(content: str) -> Iterator[Segment]:
+    """Plain text: each non-blank line is split into sentences, blank lines are kept as-is."""
+    for line in content.splitlines(keepends=True):
+        body = line.rstrip("\r\n")
+        ending = line[len(body) :]
+        if not body.strip():
+            yield Segment(line)
+            continue
+        sentences = split_sentences(body)
+        for index, sentence in enumerate(sentences):
+            stripped = sentence.strip()
+            leading = sentence[: len(sentence) - len(sentence.lstrip())]
+            trailing = sentence[len(sentence.rstrip()) :]
+            suffix = trailing + (ending if index == len(sentences) - 1 else "")
+            if stripped:
+                joined = index > 0 and not leading and not sentences[index - 1][-1:].isspace()
+                yield Segment(stripped, translate=True, prefix=leading, suffix=suffix, joined=joined)
+            else:
+                yield Segment(sentence + suffix)
+
+
+def segment_markdown(content: str) -> Iterator[Segment]:
+    """Markdown: translate text lines and table cells, keep code fences, table rules, blank lines and block markers."""
+    in_fence = False
+    for line in content.splitlines(keepends=True):
+        body = line.rstrip("\r\n")
+        ending = line[len(body) :]
+        if body.lstrip().startswith(("```", "~~~")):
+            in_fence = not in_fence
+            yield Segment(line)
+            continue
+        if in_fence or not body.strip() or set(body.strip()) <= set("-=*_|: "):
+            yield Segment(line)
+            continue
+        if body.lstrip().startswith("|"):
+            yield from _table_row(body, ending)
+            continue
+        marker, text = _MARKDOWN_PREFIX.match(body).groups()
+        if not text.strip():
+            yield Segment(line)
+            continue
+        yield Segment(text.strip(), translate=True, prefix=marker, suffix=ending)
+
+
+def _table_row(body: str, ending: str) -> Iterator[Segment]:
+    """Translate each cell of a Markdown table row on its own, keeping the pipes and cell padding."""
+    for index, cell in enumerate(_TABLE_PIPE.split(body)):
+        if index:
+            yield Segment("|")
+        text = cell.strip()
+        if not text:
+            yield Segment(cell)
+            continue
+        leading = cell[: len(cell) - len(cell.lstrip())]
+        trailing = cell[len(cell.rstrip()) :]
+        yield Segment(text, translate=True, prefix=leading, suffix=trailing)
+    yield Segment(ending)
+
+
+def segment_srt(content: str) -> Iterator[Segment]:
+    """SRT: cue numbers and timings pass through; each cue's text lines are translated together."""
+    cue: List[str] = []
+    for line in content.splitlines(keepends=True):
+        body = line.strip()
+        if not body:
+            yield from _srt_cue(cue)
+            cue = []
+            yield Segment(line)
+        else:
+            cue.append(line)
+    yield from _srt_cue(cue)
+
+
+def _srt_cue(lines: List[str]) -> Iterator[Segment]:
+    text_lines: List[str] = []
+    for index, line in enumerate(lines):
+        body = line.strip()
+        if not text_lines and (body.isdigit() or _SRT_TIMING.match(body)) and index < 2:
+            yield Segment(line)
+        else:
+            text_lines.append(body)
+    if text_lines:
+        ending = "\r\n" if lines[-1].endswith("\r\n") else "\n" if lines[-1].endswith("\n") else ""
+        yield Segment("\n".join(text_lines), translate=True, suffix=ending, newline=ending or "\n")
+
+
+SEGMENTERS = {
+    "text": segment_text,
+    "markdown": segment_markdown,
+    "srt": segment_srt,
+}
+
+
+def detect_format(filename: Optional[str]) -> DocumentFormat:
+    name = (filename or "").lower()
+    if name.endswith(".srt"):
+        return "srt"
+    if name.endswith((".md", ".markdown")):
+        return "markdown"
+    return "text"
+
+
+class DocumentTranslator:
+    """Segment a document, translate segments on a bounded worker pool and reassemble them in order."""
+
+    def __init__(self, translator: TranslatorService, workers: int = 8, window: Optional[int] = None):
+        self.translator = translator
+        self.workers = workers
+        self.window = window or workers * 4
+
+    def translate(
+        self,
+        content: str,
+        fmt: DocumentFormat = "text",
+        mode: str = "translate-zh",
+        target: TargetLanguage = "en",
+        include_grammar: bool = False,
+    ) -> Iterator[str]:
+        """Yield output chunks in document order as soon as each prefix of the document is done."""
+        translate_one = self._translate_fn(mode, include_grammar)
+        segments = SEGMENTERS[fmt](content)
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="doc-translate") as pool:
+            pending: Deque[Tuple[Segment, Optional[Future]]] = deque()
+            for segment in segments:
+                future = pool.submit(translate_one, segment.text) if segment.translate else None
+                pending.append((segment, future))
+                if len(pending) >= self.window:
+                    yield self._render(*pending.popleft(), target)
+            while pending:
+                yield self._render(*pending.popleft(), target)
+
+    def _translate_fn(self, mode: str, include_grammar: bool) -> Callable[[str], TranslationResponse]:
+        if mode == "translate-zh":
+            return lambda text: self.translator.translate_chinese(text, include_grammar=include_grammar)
+        if mode == "correct-en":
+            return lambda text: self.translator.correct_english(text, include_grammar=include_grammar)
+        raise ValueError(f"unsupported mode: {mode}")
+
+    @staticmethod
+    def _render(segment: Segment, future: Optional[Future], target: TargetLanguage) -> str:
+        if future is None:
+            return segment.text
+        try:
+            result: TranslationResponse = future.result()
+        except Exception:
+            # Earlier chunks may already be streamed, so a failure cannot turn into an error response.
+            logger.exception("failed to translate document segment; keeping the source text")
+            text = UNTRANSLATED_MARKER + segment.text
+        else:
+            text = result.translated_text if target == "en" else (result.japanese_text or result.translated_text)
+        if segment.newline != "\n":
+            text = text.replace("\r\n", "\n").replace("\n", segment.newline)
+        prefix = " " if segment.joined and target == "en" else segment.prefix
+        return f"{prefix}{text}{segment.suffix}"
@@ -0,0 +1,62 @@
+import re
+import threading
+from functools import lru_cache
+from typing import Optional
+
+# Readings rarely depend on context across punctuation, so clauses are the unit of memoisation.
+_SEPARATORS = r"\s、。，．,.!?！？「」『』（）()・：:；;…〜~"
+_SEGMENTS = re.compile(rf"([{_SEPARATORS}]+)")
+
+
+class HiraganaReader:
+    """Dictionary-based hiragana reading of Japanese text (pykakasi), memoised per clause.
+
+    pykakasi is an optional dependency and its dictionaries take a moment to load, so it
+    is imported and initialised on first use.
+    """
+
+    def __init__(self, cache_size: int = 65536):
+        self._kakasi = None
+        self._lock = threading.Lock()
+        self._read_segment = lru_cache(maxsize=cache_size)(self._convert)
+
+    def read(self, text: str) -> str:
+        """Return the hiragana reading of `text`; punctuation and whitespace pass through unchanged."""
+        # re.split with a capture group alternates segment, separator, segment, ...
+        parts = _SEGMENTS.split(text)
+        return "".join(part if index % 2 else self._read_segment(part) for index, part in enumerate(parts))
+
+    def warm_up(self) -> None:
+        """Load the dictionaries now rather than on the first request."""
+        self._converter()
+
+    def cache_info(self):
+        return self._read_segment.cache_info()
+
+    def _convert(self, segment: str) -> str:
+        if not segment:
+            return ""
+        kakasi = self._converter()
+        with self._lock:
+            tokens = kakasi.convert(segment)
+        return "".join(token["hira"] for token in tokens)
+
+    def _converter(self):
+        if self._kakasi is None:
+            with self._lock:
+                if self._kakasi is None:
+                    try:
+                        import pykakasi
+                    except ImportError as exc:
+                        raise RuntimeError("HIRAGANA_ENGINE=local requires pykakasi (pip install pykakasi)") from exc
+                    self._kakasi = pykakasi.kakasi()
+        return self._kakasi
+
+
+def create_reader(engine: str, cache_size: int = 65536) -> Optional[HiraganaReader]:
+    """Return a local reader for HIRAGANA_ENGINE=local, or None when the model supplies readings."""
+    if engine == "model":
+        return None
+    if engine == "local":
+        return HiraganaReader(cache_size=cache_size)
+    raise ValueError(f"unsupported hiragana engine: {engine}")
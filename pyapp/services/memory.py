@@ -0,0 +1,169 @@
+import hashlib
+import random
+import threading
+import unicodedata
+import zlib
+from dataclasses import dataclass
+from typing import FrozenSet, List, Optional, Sequence, Tuple
+
+from pyapp.models.schemas import TranslationResponse
+from pyapp.repositories.memory_repo import TranslationMemoryRepository
+
+_PRIME = (1 << 61) - 1
+_BANDS = 16
+_ROWS = 4
+_rng = random.Random(42)
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(_BANDS * _ROWS)]
+
+
+def normalize(text: str) -> str:
+    """Width/case-fold and drop whitespace and punctuation, so near-duplicates compare equal."""
+    folded = unicodedata.normalize("NFKC", text).casefold()
+    return "".join(ch for ch in folded if unicodedata.category(ch)[0] not in "PZC")
+
+
+def reuse_key(text: str) -> str:
+    """NFKC with whitespace runs collapsed; case and punctuation kept, since they change meaning."""
+    return " ".join(unicodedata.normalize("NFKC", text).split())
+
+
+def shingles(text: str) -> FrozenSet[str]:
+    """Character bigrams of the normalized text (a single character for one-character inputs)."""
+    norm = normalize(text)
+    if len(norm) < 2:
+        return frozenset([norm]) if norm else frozenset()
+    return frozenset(norm[i : i + 2] for i in range(len(norm) - 1))
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def band_keys(mode: str, model: Optional[str], grams: FrozenSet[str]) -> List[int]:
+    """MinHash the shingles and hash each band of rows (scoped to a mode and model) into a signed-64-bit-safe key."""
+    if not grams:
+        return []
+    hashed = [zlib.crc32(gram.encode("utf-8")) for gram in grams]
+    signature = [min((a * x + b) % _PRIME for x in hashed) for a, b in _PERMUTATIONS]
+    keys = []
+    for band in range(_BANDS):
+        rows = signature[band * _ROWS : (band + 1) * _ROWS]
+        digest = hashlib.blake2b(repr((mode, model, band, rows)).encode("utf-8"), digest_size=8).digest()
+        keys.append(int.from_bytes(digest, "big") >> 1)
+    return keys
+
+
+def infer_mode(source: str) -> str:
+    """The translations table does not record the mode; Chinese sources came from translate-zh."""
+    if any("\u3400" <= ch <= "\u9fff" or "\uf900" <= ch <= "\ufaff" for ch in source):
+        return "translate-zh"
+    return "correct-en"
+
+
+@dataclass
+class MemoryMatch:
+    translation_id: int
+    score: float
+    has_grammar: bool
+    result: TranslationResponse
+
+
+class TranslationMemory:
+    """Fuzzy lookup of earlier translations by character-bigram similarity.
+
+    MinHash band keys in SQLite narrow the search to the rows sharing the most bands
+    with the query; the exact Jaccard similarity of those candidates is then computed
+    in Python. Band keys include the model, so only output of the caller's model is found.
+    """
+
+    def __init__(
+        self,
+        repository: TranslationMemoryRepository,
+        candidate_limit: int = 64,
+        per_band_limit: int = 64,
+        sync_batch: int = 500,
+    ):
+        self.repository = repository
+        self.candidate_limit = candidate_limit
+        self.per_band_limit = per_band_limit
+        self.sync_batch = sync_batch
+        self._last_id: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def sync(self, limit: Optional[int] = None) -> int:
+        """Index translations stored since the last sync (by any writer), at most `limit` of them.
+
+        Returns how many rows were added.
+        """
+        added = 0
+        with self._lock:
+            if self._last_id is None:
+                self._last_id = self.repository.last_indexed_id()
+            while True:
+                batch = self.sync_batch if limit is None else min(self.sync_batch, limit - added)
+                rows = self.repository.unindexed_rows(self._last_id, batch) if batch > 0 else []
+                if not rows:
+                    return added
+                self.repository.index_many([self._entry(row) for row in rows])
+                self._last_id = rows[-1]["id"]
+                added += len(rows)
+                if len(rows) < batch:
+                    return added
+
+    def lookup(
+        self, mode: str, text: str, model: Optional[str], top_k: int = 3, min_score: float = 0.0
+    ) -> List[MemoryMatch]:
+        """Return up to top_k earlier translations of this mode and model (one per distinct source), most similar first.
+
+        Each lookup indexes at most one batch of new rows, so a large backlog is spread over requests.
+        """
+        self.sync(self.sync_batch)
+        grams = shingles(text)
+        scored = []
+        rows = self.repository.candidates(band_keys(mode, model, grams), self.per_band_limit, self.candidate_limit)
+        for row in rows:
+            score = jaccard(grams, shingles(row["chinese"]))
+            if score >= min_score:
+                scored.append((score, row))
+        # Among equally similar rows prefer one with the caller's exact source, as only that one may be reused.
+        key = reuse_key(text)
+        scored.sort(key=lambda item: (-item[0], reuse_key(item[1]["chinese"]) != key, -item[1]["id"]))
+        matches: List[MemoryMatch] = []
+        seen = set()
+        for score, row in scored:
+            source = normalize(row["chinese"])
+            if source in seen:
+                continue
+            seen.add(source)
+            matches.append(MemoryMatch(row["id"], score, bool(row["has_grammar"]), self._result(row)))
+            if len(matches) >= top_k:
+                break
+        return matches
+
+    @staticmethod
+    def _entry(row) -> Tuple[int, str, Optional[str], bool, List[int]]:
+        source = row["chinese"]
+        mode = infer_mode(source)
+        return row["id"], mode, row["model"], bool(row["has_grammar"]), band_keys(mode, row["model"], shingles(source))
+
+    @staticmethod
+    def _result(row) -> TranslationResponse:
+        return TranslationResponse(
+            original_text=row["chinese"],
+            translated_text=row["english"],
+            english_grammar=row["english_grammar"],
+            japanese_text=row["japanese"],
+            hiragana_pronunciation=row["hiragana"],
+            japanese_grammar=row["japanese_grammar"],
+            timestamp=row["timestamp"],
+        )
+
+
+def format_hints(matches: Sequence[MemoryMatch]) -> str:
+    """Compact few-shot lines: source => English | Japanese."""
+    return "\n".join(
+        f"{match.result.original_text} => {match.result.translated_text} | {match.result.japanese_text or ''}"
+        for match in matches
+    )
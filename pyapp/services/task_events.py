@@ -0,0 +1,154 @@
+import asyncio
+import itertools
+import secrets
+import threading
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass
+from typing import AsyncIterator, Callable, Deque, Dict, List, Optional, Set
+
+# Statuses after which a task's public state no longer changes on its own.
+SETTLED_STATUSES = frozenset({"completed", "failed", "refunded"})
+
+
+@dataclass(frozen=True)
+class TaskEvent:
+    seq: int
+    task_id: int
+    status: str
+    result_hash: Optional[str]
+    updated_at: str
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class Subscription:
+    """A bounded asyncio queue of events for one consumer (an SSE client).
+
+    Delivery never blocks the publisher: if the consumer falls `maxsize` events behind it is
+    marked `lagged` and receives no more events; it should reconnect and replay from its last event id.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, maxsize: int):
+        self.loop = loop
+        self.queue: "asyncio.Queue[Optional[TaskEvent]]" = asyncio.Queue(maxsize=maxsize + 1)
+        self.maxsize = maxsize
+        self.lagged = False
+
+    def _offer(self, event: TaskEvent) -> None:
+        if self.lagged:
+            return
+        if self.queue.qsize() >= self.maxsize:
+            self.lagged = True
+            self.queue.put_nowait(None)
+            return
+        self.queue.put_nowait(event)
+
+    async def get(self) -> Optional[TaskEvent]:
+        """The next event, or None once the subscription has lagged."""
+        return await self.queue.get()
+
+
+class TaskEventBus:
+    """In-process fan-out of task state changes to long-pollers, SSE streams and webhook senders.
+
+    publish() may be called from any thread. Waiters and subscriptions belong to an event loop
+    and are woken through call_soon_threadsafe; plain callbacks run on the publishing thread and
+    must not block. The last `history` events are kept for SSE replay after a reconnect.
+    Sequence numbers restart from 1 in every process, so event ids carry a random per-process
+    `boot_id` as well: "<boot_id>-<seq>".
+    """
+
+    def __init__(self, history: int = 1024):
+        self.boot_id = secrets.token_hex(4)
+        self._lock = threading.Lock()
+        self._seq = itertools.count(1)
+        self._history: Deque[TaskEvent] = deque(maxlen=history)
+        self._waiters: Dict[int, Set[asyncio.Event]] = {}
+        self._waiter_loops: Dict[asyncio.Event, asyncio.AbstractEventLoop] = {}
+        self._subscriptions: Set[Subscription] = set()
+        self._callbacks: List[Callable[[TaskEvent], None]] = []
+
+    def publish(self, task_id: int, status: str, result_hash: Optional[str], updated_at: str) -> TaskEvent:
+        with self._lock:
+            event = TaskEvent(next(self._seq), task_id, status, result_hash, updated_at)
+            self._history.append(event)
+            waiters = [(waiter, self._waiter_loops[waiter]) for waiter in self._waiters.pop(task_id, ())]
+            for waiter, _ in waiters:
+                del self._waiter_loops[waiter]
+            subscriptions = list(self._subscriptions)
+            callbacks = list(self._callbacks)
+        for waiter, loop in waiters:
+            _call_soon(loop, waiter.set)
+        for subscription in subscriptions:
+            _call_soon(subscription.loop, subscription._offer, event)
+        for callback in callbacks:
+            callback(event)
+        return event
+
+    @asynccontextmanager
+    async def watch(self, task_id: int) -> AsyncIterator[asyncio.Event]:
+        """An event set by the next publish for `task_id`.
+
+        Register it before reading the task's current state so a change in between is not missed.
+        """
+        waiter = asyncio.Event()
+        with self._lock:
+            self._waiters.setdefault(task_id, set()).add(waiter)
+            self._waiter_loops[waiter] = asyncio.get_running_loop()
+        try:
+            yield waiter
+        finally:
+            with self._lock:
+                self._waiter_loops.pop(waiter, None)
+                watchers = self._waiters.get(task_id)
+                if watchers is not None:
+                    watchers.discard(waiter)
+                    if not watchers:
+                        del self._waiters[task_id]
+
+    def subscribe(self, maxsize: int = 1000) -> Subscription:
+        subscription = Subscription(asyncio.get_running_loop(), maxsize)
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def add_callback(self, callback: Callable[[TaskEvent], None]) -> None:
+        with self._lock:
+            self._callbacks.append(callback)
+
+    def remove_callback(self, callback: Callable[[TaskEvent], None]) -> None:
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def event_id(self, event: TaskEvent) -> str:
+        return f"{self.boot_id}-{event.seq}"
+
+    def since(self, event_id: str) -> Optional[List[TaskEvent]]:
+        """Buffered events after `event_id`, or None when they cannot all be replayed.
+
+        None means the id is from another process (or an earlier run of this one), is malformed,
+        or is older than the oldest buffered event; the consumer has to resync from the database.
+        """
+        boot_id, _, seq_text = event_id.rpartition("-")
+        if boot_id != self.boot_id or not seq_text.isdigit():
+            return None
+        seq = int(seq_text)
+        with self._lock:
+            if not self._history or not self._history[0].seq - 1 <= seq <= self._history[-1].seq:
+                return None
+            return [event for event in self._history if event.seq > seq]
+
+
+def _call_soon(loop: asyncio.AbstractEventLoop, callback: Callable, *args) -> None:
+    try:
+        loop.call_soon_threadsafe(callback, *args)
+    except RuntimeError:
+        # The consumer's loop has closed; it will not read this event.
+        pass
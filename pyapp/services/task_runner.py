@@ -0,0 +1,174 @@
+import json
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from pyapp.models.schemas import TaskInput, TaskJobResponse, TaskResultPayload, TaskResultRequest
+from pyapp.repositories.job_repo import JOB_FAILED, JOB_SUCCEEDED, TaskJobRepository
+from pyapp.services.task_service import TaskNotFoundError, TaskService
+from pyapp.services.translator import TranslatorService
+from pyapp.utils.metrics import TASK_JOBS, TASK_STAGE_SECONDS
+from pyapp.utils.time_utils import format_utc_timestamp, utc_now
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueueFullError(Exception):
+    pass
+
+
+class TaskRunner:
+    """Execute claimed tasks server-side: load the stored input, translate, then store the result.
+
+    Jobs are queued durably in SQLite (task_jobs) and leased by a dispatcher thread onto a fixed
+    pool of `workers` threads, so at most that many tasks run at once per process. Failed attempts
+    are retried up to `max_attempts` after a jittered exponential backoff; jobs left running by a
+    dead process are picked up again once their lease expires. With workers=0 the process only
+    enqueues and another process executes.
+    """
+
+    def __init__(
+        self,
+        tasks: TaskService,
+        translator: TranslatorService,
+        jobs: TaskJobRepository,
+        workers: int = 4,
+        max_attempts: int = 3,
+        lease_seconds: float = 600.0,
+        poll_interval: float = 1.0,
+        max_queued: Optional[int] = None,
+        retry_backoff: float = 5.0,
+        retry_backoff_max: float = 300.0,
+    ):
+        self.tasks = tasks
+        self.translator = translator
+        self.jobs = jobs
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.max_queued = max_queued
+        self.retry_backoff = retry_backoff
+        self.retry_backoff_max = retry_backoff_max
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._slots = threading.Semaphore(workers)
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._dispatcher: Optional[threading.Thread] = None
+
+    def submit(self, task_id: int) -> TaskJobResponse:
+        """Queue execution of a claimed task (idempotent while a job is queued, running or succeeded)."""
+        if self.tasks.repository.get_by_task_id(task_id) is None:
+            raise TaskNotFoundError("task_id not found")
+        if self.max_queued is not None and self.jobs.queued_count() >= self.max_queued:
+            raise JobQueueFullError("task job queue is full")
+        row, queued = self.jobs.enqueue(task_id, format_utc_timestamp(utc_now()))
+        if queued:
+            TASK_JOBS.inc(outcome="queued")
+            self._wakeup.set()
+        return TaskJobResponse(**row)
+
+    def get(self, task_id: int) -> TaskJobResponse:
+        row = self.jobs.get(task_id)
+        if row is None:
+            raise TaskNotFoundError("no job for task_id")
+        return TaskJobResponse(**row)
+
+    def start(self) -> None:
+        if self.workers <= 0 or self._dispatcher is not None:
+            return
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="task-runner")
+        self._dispatcher = threading.Thread(target=self._dispatch, name="task-dispatcher", daemon=True)
+        self._dispatcher.start()
+
+    def stop(self) -> None:
+        """Stop leasing new jobs and wait for the running ones to finish."""
+        self._stopping.set()
+        self._wakeup.set()
+        if self._dispatcher is not None:
+            self._dispatcher.join()
+            self._dispatcher = None
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    def _dispatch(self) -> None:
+        while not self._stopping.is_set():
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+            while not self._stopping.is_set():
+                free = 0
+                while self._slots.acquire(blocking=False):
+                    free += 1
+                if not free:
+                    break
+                try:
+                    now = time.time()
+                    claimed = self.jobs.claim(free, now, now + self.lease_seconds, format_utc_timestamp(utc_now()))
+                except Exception:
+                    logger.exception("failed to lease task jobs")
+                    claimed = []
+                for _ in range(free - len(claimed)):
+                    self._slots.release()
+                for task_id, attempt in claimed:
+                    self._pool.submit(self._execute, task_id, attempt)
+                if not claimed or len(claimed) < free:
+                    break
+                # Every slot is busy and more jobs may be waiting: block until one frees up.
+                self._slots.acquire()
+                self._slots.release()
+
+    def _execute(self, task_id: int, attempt: int) -> None:
+        try:
+            if attempt > self.max_attempts:
+                self._finish(task_id, attempt, JOB_FAILED, error="lease expired on every attempt")
+                return
+            try:
+                result_hash = self._run(task_id)
+            except Exception as exc:
+                error = f"{type(exc).__name__}: {exc}"
+                if isinstance(exc, TaskNotFoundError) or attempt >= self.max_attempts:
+                    self._finish(task_id, attempt, JOB_FAILED, error=error)
+                else:
+                    logger.warning("task %s attempt %s failed, retrying: %s", task_id, attempt, error)
+                    if self.jobs.requeue(task_id, attempt, error, time.time() + self._retry_delay(attempt)):
+                        TASK_JOBS.inc(outcome="retried")
+                return
+            self._finish(task_id, attempt, JOB_SUCCEEDED, result_hash=result_hash)
+        except Exception:
+            logger.exception("failed to record outcome of task %s", task_id)
+        finally:
+            self._slots.release()
+            self._wakeup.set()
+
+    def _retry_delay(self, attempt: int) -> float:
+        """Backoff before retrying after `attempt` failed: doubling from retry_backoff, capped, with jitter."""
+        return min(self.retry_backoff_max, self.retry_backoff * 2 ** (attempt - 1)) * (0.5 + random.random() / 2)
+
+    def _finish(
+        self, task_id: int, attempt: int, status: str, result_hash: Optional[str] = None, error: Optional[str] = None
+    ) -> None:
+        if self.jobs.finish(task_id, attempt, status, format_utc_timestamp(utc_now()), result_hash, error):
+            TASK_JOBS.inc(outcome=status)
+
+    def _run(self, task_id: int) -> str:
+        with TASK_STAGE_SECONDS.time(operation="run", stage="load"):
+            row = self.tasks.repository.get_by_task_id(task_id)
+        if row is None:
+            raise TaskNotFoundError("task_id not found")
+        if row["result_hash"]:
+            return row["result_hash"]
+        item = TaskInput(**json.loads(row["input_payload"]))
+        with TASK_STAGE_SECONDS.time(operation="run", stage="model"):
+            if item.mode == "translate-zh":
+                result = self.translator.translate_chinese(item.text, include_grammar=item.include_grammar)
+            else:
+                result = self.translator.correct_english(item.text, include_grammar=item.include_grammar)
+        payload = TaskResultPayload(
+            **result.model_dump(exclude={"timestamp"}),
+            timestamp=format_utc_timestamp(result.timestamp),
+        )
+        return self.tasks.store_result(task_id, TaskResultRequest(result_payload=payload)).result_hash
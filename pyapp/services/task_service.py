@@ -1,11 +1,14 @@
 import json
-from typing import Optional, Tuple
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple
 
 from pyapp.models.schemas import (
+    TaskClaimBatchItem,
     TaskClaimRequest,
     TaskClaimResponse,
     TaskInput,
     TaskInputResponse,
+    TaskListResponse,
     TaskPrepareResponse,
     TaskPublicResponse,
     TaskResultPayload,
@@ -13,10 +16,18 @@ from pyapp.models.schemas import (
     TaskResultResponse,
     TaskStatusResponse,
     TaskStatusUpdateRequest,
+    TaskSummary,
 )
-from pyapp.db import init_task_repository
-from pyapp.repositories.task_repo import TaskRepository
+from pyapp.repositories.task_repo import (
+    CLAIM_CREATED,
+    CLAIM_INPUT_CONFLICT,
+    CLAIM_NOT_FOUND,
+    TaskRepository,
+)
+from pyapp.services.task_events import SETTLED_STATUSES, TaskEventBus
 from pyapp.utils.hash_utils import hash_payload
+from pyapp.utils.json_utils import splice_json
+from pyapp.utils.metrics import TASK_REPOSITORY_SECONDS, TASK_STAGE_SECONDS, TimedProxy
 from pyapp.utils.time_utils import format_utc_timestamp, parse_utc_timestamp, utc_now
 
 
@@ -33,59 +44,80 @@ class HashMismatchError(Exception):
 
 
 class TaskService:
-    def __init__(self, repository: TaskRepository):
-        self.repository = repository
+    def __init__(self, repository: TaskRepository, events: Optional[TaskEventBus] = None):
+        self.repository = TimedProxy(repository, TASK_REPOSITORY_SECONDS)
+        self.events = events
+
+    def _publish(self, task_id: int, status: str, result_hash: Optional[str], updated_at: str) -> None:
+        if self.events is not None:
+            self.events.publish(task_id, status, result_hash, updated_at)
 
     def prepare(self, payload: TaskInput) -> TaskPrepareResponse:
-        data = payload.model_dump()
-        input_hash, canonical = hash_payload(data)
-        existing = self.repository.get_by_input_hash(input_hash)
-        if existing:
-            return TaskPrepareResponse(
-                input_hash=input_hash,
-                input_ref=input_hash,
-                prepared_at=existing["created_at"],
-                deduped=True,
-            )
+        return self.prepare_many([payload])[0]
 
+    def prepare_many(self, payloads: Sequence[TaskInput]) -> List[TaskPrepareResponse]:
+        """Hash inputs, dedupe them within the batch and against stored tasks in one transaction."""
+        with TASK_STAGE_SECONDS.time(operation="prepare", stage="hash"):
+            hashed = [hash_payload(payload.model_dump()) for payload in payloads]
         prepared_at = format_utc_timestamp(utc_now())
-        self.repository.insert_prepared(input_hash, canonical, prepared_at)
-        return TaskPrepareResponse(
-            input_hash=input_hash,
-            input_ref=input_hash,
-            prepared_at=prepared_at,
-            deduped=False,
-        )
-
-    def claim(self, req: TaskClaimRequest) -> TaskClaimResponse:
-        row = self.repository.get_by_input_hash(req.input_hash)
-        if not row:
-            raise TaskNotFoundError("input_hash not found")
-        if row["task_id"] is not None and row["task_id"] != req.task_id:
-            raise TaskConflictError("input_hash already bound to a different task_id")
+        created, inserted = self.repository.prepare_many(hashed, prepared_at)
+        responses = []
+        seen = set()
+        for input_hash, _ in hashed:
+            responses.append(
+                TaskPrepareResponse(
+                    input_hash=input_hash,
+                    input_ref=input_hash,
+                    prepared_at=created[input_hash],
+                    deduped=input_hash in seen or input_hash not in inserted,
+                )
+            )
+            seen.add(input_hash)
+        return responses
 
-        existing_task = self.repository.get_by_task_id(req.task_id)
-        if existing_task and existing_task["input_hash"] != req.input_hash:
-            raise TaskConflictError("task_id already bound to a different input_hash")
+    _CLAIM_ERRORS = {
+        CLAIM_NOT_FOUND: "input_hash not found",
+        CLAIM_INPUT_CONFLICT: "input_hash already bound to a different task_id",
+    }
+    _TASK_CONFLICT = "task_id already bound to a different input_hash"
 
+    def claim(self, req: TaskClaimRequest) -> TaskClaimResponse:
         updated_at = format_utc_timestamp(utc_now())
-        self.repository.update_claim(
-            task_id=req.task_id,
-            input_hash=req.input_hash,
-            requester=req.requester,
-            model=req.model,
-            fee=req.fee,
-            chain_id=req.chain_id,
-            tx_hash=req.tx_hash,
-            block_number=req.block_number,
-            timestamp=updated_at,
-        )
+        outcome = self.repository.claim_many([req], timestamp=updated_at)[0]
+        if outcome == CLAIM_NOT_FOUND:
+            raise TaskNotFoundError(self._CLAIM_ERRORS[outcome])
+        if outcome != CLAIM_CREATED:
+            raise TaskConflictError(self._CLAIM_ERRORS.get(outcome, self._TASK_CONFLICT))
+        self._publish(req.task_id, "created", None, updated_at)
         return TaskClaimResponse(
             task_id=req.task_id,
             status="created",
             updated_at=updated_at,
         )
 
+    def claim_many(self, reqs: Sequence[TaskClaimRequest]) -> List[TaskClaimBatchItem]:
+        updated_at = format_utc_timestamp(utc_now())
+        outcomes = self.repository.claim_many(reqs, timestamp=updated_at)
+        items = []
+        for req, outcome in zip(reqs, outcomes):
+            if outcome == CLAIM_CREATED:
+                self._publish(req.task_id, "created", None, updated_at)
+                items.append(
+                    TaskClaimBatchItem(
+                        task_id=req.task_id, input_hash=req.input_hash, status="created", updated_at=updated_at
+                    )
+                )
+            else:
+                items.append(
+                    TaskClaimBatchItem(
+                        task_id=req.task_id,
+                        input_hash=req.input_hash,
+                        status="not_found" if outcome == CLAIM_NOT_FOUND else "conflict",
+                        error=self._CLAIM_ERRORS.get(outcome, self._TASK_CONFLICT),
+                    )
+                )
+        return items
+
     def get_input(self, input_hash: str) -> TaskInputResponse:
         row = self.repository.get_by_input_hash(input_hash)
         if not row:
@@ -97,12 +129,24 @@ class TaskService:
             prepared_at=row["created_at"],
         )
 
+    def get_input_raw(self, input_hash: str) -> bytes:
+        """get_input as response bytes, with the stored canonical payload spliced in unparsed."""
+        row = self.repository.get_by_input_hash(input_hash)
+        if not row:
+            raise TaskNotFoundError("input_hash not found")
+        return splice_json(
+            {"input_hash": input_hash, "prepared_at": row["created_at"]},
+            "input_payload",
+            row["input_payload"],
+        )
+
     def store_result(self, task_id: int, req: TaskResultRequest) -> TaskResultResponse:
         row = self.repository.get_by_task_id(task_id)
         if not row:
             raise TaskNotFoundError("task_id not found")
 
-        result_hash, canonical = self._hash_result_payload(req.result_payload)
+        with TASK_STAGE_SECONDS.time(operation="store_result", stage="hash"):
+            result_hash, canonical = self._hash_result_payload(req.result_payload)
         if req.result_hash and req.result_hash != result_hash:
             raise HashMismatchError("result_hash mismatch")
         if row["result_hash"] and row["result_hash"] != result_hash:
@@ -116,6 +160,7 @@ class TaskService:
                 result_payload=canonical,
                 timestamp=completed_at,
             )
+            self._publish(task_id, "completed", result_hash, completed_at)
         else:
             completed_at = row["updated_at"]
 
@@ -138,6 +183,7 @@ class TaskService:
             block_number=req.block_number,
             timestamp=updated_at,
         )
+        self._publish(task_id, req.status, row["result_hash"], updated_at)
         return TaskStatusResponse(
             task_id=task_id,
             status=req.status,
@@ -160,13 +206,49 @@ class TaskService:
             result=result_payload,
         )
 
+    def get_public_raw(self, task_id: int, include_result: bool) -> bytes:
+        """get_public as response bytes, with the stored canonical result spliced in unparsed."""
+        return self.poll_public(task_id, include_result)[0]
+
+    def poll_public(self, task_id: int, include_result: bool) -> Tuple[bytes, bool]:
+        """get_public_raw plus whether the task is settled (has a result or a final status)."""
+        row = self.repository.get_by_task_id(task_id)
+        if not row:
+            raise TaskNotFoundError("task_id not found")
+        settled = bool(row["result_hash"]) or row["status"] in SETTLED_STATUSES
+        body = splice_json(
+            {
+                "task_id": task_id,
+                "status": row["status"],
+                "input_hash": row["input_hash"],
+                "result_hash": row["result_hash"],
+            },
+            "result",
+            row["result_payload"] if include_result and row["result_payload"] else None,
+        )
+        return body, settled
+
+    def list_tasks(
+        self,
+        statuses: Optional[Sequence[str]] = None,
+        updated_before: Optional[datetime] = None,
+        after_id: Optional[int] = None,
+        limit: int = 100,
+    ) -> TaskListResponse:
+        """Page through tasks in id order, optionally only those in some statuses or not updated since a time."""
+        rows = self.repository.list_tasks(
+            statuses=statuses,
+            updated_before=format_utc_timestamp(updated_before) if updated_before is not None else None,
+            after_id=after_id,
+            limit=limit,
+        )
+        items = [TaskSummary(**row) for row in rows]
+        next_after_id = items[-1].id if len(items) == limit else None
+        return TaskListResponse(items=items, next_after_id=next_after_id)
+
     @staticmethod
     def _hash_result_payload(payload: TaskResultPayload) -> Tuple[str, str]:
         data = payload.model_dump()
         normalized_ts = format_utc_timestamp(parse_utc_timestamp(data["timestamp"]))
         data["timestamp"] = normalized_ts
         return hash_payload(data)
-
-
-def get_task_service() -> TaskService:
-    return TaskService(repository=init_task_repository())
@@ -1,69 +1,511 @@
+import asyncio
+import copy
+import json
 from datetime import datetime, timezone
-from typing import Optional
+from typing import AsyncIterator, ContextManager, Dict, Iterator, List, Optional, Sequence, Tuple, Type
 
-from pyapp.clients.openai_client import run_structured_chat
-from pyapp.db import init_repository
-from pyapp.models.schemas import TranslationResponse
+from pydantic import BaseModel, ValidationError
+
+from pyapp.clients.openai_client import (
+    StreamEvent,
+    run_structured_chat,
+    run_structured_chat_async,
+    stream_structured_chat,
+    stream_structured_chat_async,
+)
+from pyapp.clients.scheduler import Priority
+from pyapp.db import get_hiragana_reader, get_translation_cache, get_translation_memory, init_repository
+from pyapp.models.schemas import (
+    BatchItemResult,
+    ChineseTranslation,
+    ChineseTranslationBatch,
+    ChineseTranslationText,
+    ChineseTranslationTextBatch,
+    ChineseTranslationTextWithGrammar,
+    ChineseTranslationTextWithGrammarBatch,
+    ChineseTranslationWithGrammar,
+    ChineseTranslationWithGrammarBatch,
+    EnglishCorrection,
+    EnglishCorrectionText,
+    EnglishCorrectionTextWithGrammar,
+    EnglishCorrectionWithGrammar,
+    TextRequest,
+    TranslationRecord,
+    TranslationResponse,
+    TranslationSearchResponse,
+)
 from pyapp.repositories.sqlite_repo import TranslationRepository
+from pyapp.services.cache import TranslationCache, make_cache_key
+from pyapp.services.hiragana import HiraganaReader
+from pyapp.services.memory import MemoryMatch, TranslationMemory, format_hints, reuse_key
 from pyapp.settings import get_settings
+from pyapp.utils.metrics import TRANSLATION_MEMORY_LOOKUPS, TRANSLATOR_STAGE_SECONDS
+from pyapp.utils.singleflight import AsyncSingleFlight, SingleFlight
+from pyapp.utils.token_utils import estimate_tokens
+
+PROMPT_VERSION = "2"
+
+# Keyed by (mode, include_grammar, local_reading); with a local reader the model is not asked for hiragana.
+_RESPONSE_MODELS: Dict[Tuple[str, bool, bool], Type[BaseModel]] = {
+    ("translate-zh", False, False): ChineseTranslation,
+    ("translate-zh", True, False): ChineseTranslationWithGrammar,
+    ("correct-en", False, False): EnglishCorrection,
+    ("correct-en", True, False): EnglishCorrectionWithGrammar,
+    ("translate-zh", False, True): ChineseTranslationText,
+    ("translate-zh", True, True): ChineseTranslationTextWithGrammar,
+    ("correct-en", False, True): EnglishCorrectionText,
+    ("correct-en", True, True): EnglishCorrectionTextWithGrammar,
+}
+
+
+def response_model_for(mode: str, include_grammar: bool, local_reading: bool = False) -> Type[BaseModel]:
+    """The slim schema the model fills for a mode: only the fields the caller asked for."""
+    try:
+        return _RESPONSE_MODELS[(mode, include_grammar, local_reading)]
+    except KeyError:
+        raise ValueError(f"unsupported mode: {mode}") from None
 
 
 class TranslatorService:
     """Business logic for translating and grammar-checking text."""
 
-    def __init__(self, repository: TranslationRepository, model_name: Optional[str] = None):
+    def __init__(
+        self,
+        repository: TranslationRepository,
+        model_name: Optional[str] = None,
+        cache: Optional[TranslationCache] = None,
+        priority: Priority = Priority.INTERACTIVE,
+        memory: Optional[TranslationMemory] = None,
+        reader: Optional[HiraganaReader] = None,
+    ):
         self.repository = repository
         self.model_name = model_name or get_settings().openai_model
+        self.cache = cache
+        self.memory = memory
+        self.reader = reader
+        self.priority = priority
+        self._flights: SingleFlight[TranslationResponse] = SingleFlight()
+        self._async_flights: AsyncSingleFlight[TranslationResponse] = AsyncSingleFlight()
+
+    def with_priority(self, priority: Priority) -> "TranslatorService":
+        """Return a view of this service (same repository, cache and in-flight calls) at another priority."""
+        clone = copy.copy(self)
+        clone.priority = priority
+        return clone
 
     def translate_chinese(self, text: str, include_grammar: bool = False) -> TranslationResponse:
-        prompt = self._build_chinese_prompt(text, include_grammar)
-        ai_result = run_structured_chat(prompt, TranslationResponse)
-        result = self._with_timestamp(ai_result)
-        self.repository.save(result)
-        return result
+        return self._run("translate-zh", text, include_grammar)
 
     def correct_english(self, text: str, include_grammar: bool = False) -> TranslationResponse:
-        prompt = self._build_english_prompt(text, include_grammar)
-        ai_result = run_structured_chat(prompt, TranslationResponse)
-        result = self._with_timestamp(ai_result)
-        self.repository.save(result)
+        return self._run("correct-en", text, include_grammar)
+
+    def _run(self, mode: str, text: str, include_grammar: bool) -> TranslationResponse:
+        cache_key = self._cache_key(mode, text, include_grammar)
+        if self.cache is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+        return self._flights.do(cache_key, lambda: self._compute(cache_key, mode, text, include_grammar))
+
+    def _compute(self, cache_key: str, mode: str, text: str, include_grammar: bool) -> TranslationResponse:
+        with self._timed("memory_lookup", mode):
+            matches = self._recall(mode, text)
+        ai_result = self._reuse(mode, text, include_grammar, matches)
+        if ai_result is None:
+            with self._timed("prompt_build", mode):
+                prompt = self._build_prompt(mode, text, include_grammar, self._hints(matches), self._local_reading)
+            with self._timed("model_call", mode):
+                ai_result = run_structured_chat(
+                    prompt, self._response_model(mode, include_grammar), self.priority, self.model_name
+                )
+        with self._timed("timestamp", mode):
+            result = self._complete(text, ai_result)
+        with self._timed("db_write", mode):
+            self._store(cache_key, result)
         return result
 
-    @staticmethod
-    def _with_timestamp(result: TranslationResponse) -> TranslationResponse:
-        """Stamp result with current UTC timestamp (ignore model-provided timestamps)."""
-        return TranslationResponse(
-            **result.model_dump(exclude={"timestamp"}),
-            timestamp=datetime.now(timezone.utc),
+    async def translate_chinese_async(self, text: str, include_grammar: bool = False) -> TranslationResponse:
+        return await self._run_async("translate-zh", text, include_grammar)
+
+    async def correct_english_async(self, text: str, include_grammar: bool = False) -> TranslationResponse:
+        return await self._run_async("correct-en", text, include_grammar)
+
+    async def _run_async(self, mode: str, text: str, include_grammar: bool) -> TranslationResponse:
+        """Async twin of _run: the model call is awaited, SQLite work runs in worker threads."""
+        cache_key = self._cache_key(mode, text, include_grammar)
+        if self.cache is not None:
+            cached = await asyncio.to_thread(self.cache.get, cache_key)
+            if cached is not None:
+                return cached
+        return await self._async_flights.do(
+            cache_key, lambda: self._compute_async(cache_key, mode, text, include_grammar)
         )
 
+    async def _compute_async(self, cache_key: str, mode: str, text: str, include_grammar: bool) -> TranslationResponse:
+        with self._timed("memory_lookup", mode):
+            matches = await asyncio.to_thread(self._recall, mode, text)
+        ai_result = self._reuse(mode, text, include_grammar, matches)
+        if ai_result is None:
+            with self._timed("prompt_build", mode):
+                prompt = self._build_prompt(mode, text, include_grammar, self._hints(matches), self._local_reading)
+            with self._timed("model_call", mode):
+                ai_result = await run_structured_chat_async(
+                    prompt, self._response_model(mode, include_grammar), self.priority, self.model_name
+                )
+        with self._timed("timestamp", mode):
+            result = self._complete(text, ai_result)
+        with self._timed("db_write", mode):
+            await asyncio.to_thread(self._store, cache_key, result)
+        return result
+
+    def stream(self, mode: str, text: str, include_grammar: bool = False) -> Iterator[StreamEvent]:
+        """Yield fields as the model completes them, then a final event with the stored result."""
+        cache_key = self._cache_key(mode, text, include_grammar)
+        if self.cache is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                yield from self._replay(cached)
+                return
+
+        with self._timed("prompt_build", mode):
+            prompt = self._build_prompt(mode, text, include_grammar, local_reading=self._local_reading)
+        yield StreamEvent("field", "original_text", text)
+        for event in stream_structured_chat(
+            prompt, self._response_model(mode, include_grammar), self.priority, self.model_name
+        ):
+            if event.kind == "final":
+                with self._timed("timestamp", mode):
+                    result = self._complete(text, event.value)
+                with self._timed("db_write", mode):
+                    self._store(cache_key, result)
+                yield StreamEvent("final", None, result)
+            else:
+                yield from self._with_reading(event)
+
+    async def stream_async(self, mode: str, text: str, include_grammar: bool = False) -> AsyncIterator[StreamEvent]:
+        cache_key = self._cache_key(mode, text, include_grammar)
+        if self.cache is not None:
+            cached = await asyncio.to_thread(self.cache.get, cache_key)
+            if cached is not None:
+                for event in self._replay(cached):
+                    yield event
+                return
+
+        with self._timed("prompt_build", mode):
+            prompt = self._build_prompt(mode, text, include_grammar, local_reading=self._local_reading)
+        yield StreamEvent("field", "original_text", text)
+        response_model = self._response_model(mode, include_grammar)
+        async for event in stream_structured_chat_async(prompt, response_model, self.priority, self.model_name):
+            if event.kind == "final":
+                with self._timed("timestamp", mode):
+                    result = self._complete(text, event.value)
+                with self._timed("db_write", mode):
+                    await asyncio.to_thread(self._store, cache_key, result)
+                yield StreamEvent("final", None, result)
+            else:
+                for field_event in self._with_reading(event):
+                    yield field_event
+
+    def _with_reading(self, event: StreamEvent) -> Iterator[StreamEvent]:
+        """Pass a streamed field through, followed by the local reading once japanese_text is complete."""
+        yield event
+        if self.reader is not None and event.field == "japanese_text":
+            yield StreamEvent("field", "hiragana_pronunciation", self.reader.read(event.value))
+
     @staticmethod
-    def _build_chinese_prompt(text: str, include_grammar: bool) -> str:
-        grammar_clause = (
-            "Provide English and Japanese grammar explanations."
-            if include_grammar
-            else "Skip grammar explanations unless they are critical."
-        )
+    def _replay(result: TranslationResponse) -> Iterator[StreamEvent]:
+        for field, value in result.model_dump(exclude={"timestamp"}).items():
+            yield StreamEvent("field", field, value)
+        yield StreamEvent("final", None, result)
+
+    def translate_many(self, items: Sequence[TextRequest]) -> List[BatchItemResult]:
+        """Translate many Chinese texts, packing cache misses into as few model calls as possible."""
+        results, chunks, duplicates = self._plan_batch(items)
+        outputs = []
+        for chunk in chunks:
+            with self._timed("prompt_build", "batch"):
+                prompt = self._build_batch_prompt(items, chunk, self._local_reading)
+            try:
+                with self._timed("model_call", "batch"):
+                    outputs.append(
+                        run_structured_chat(prompt, self._batch_model(items, chunk), self.priority, self.model_name)
+                    )
+            except Exception as exc:
+                outputs.append(exc)
+        stored = self._settle_batch(items, results, chunks, outputs, duplicates)
+        with self._timed("db_write", "batch"):
+            self._store_many(stored)
+        return results
+
+    async def translate_many_async(self, items: Sequence[TextRequest]) -> List[BatchItemResult]:
+        results, chunks, duplicates = await asyncio.to_thread(self._plan_batch, items)
+        with self._timed("prompt_build", "batch"):
+            prompts = [self._build_batch_prompt(items, chunk, self._local_reading) for chunk in chunks]
+        with self._timed("model_call", "batch"):
+            outputs = await asyncio.gather(
+                *(
+                    run_structured_chat_async(prompt, self._batch_model(items, chunk), self.priority, self.model_name)
+                    for prompt, chunk in zip(prompts, chunks)
+                ),
+                return_exceptions=True,
+            )
+        stored = self._settle_batch(items, results, chunks, outputs, duplicates)
+        with self._timed("db_write", "batch"):
+            await asyncio.to_thread(self._store_many, stored)
+        return results
+
+    def _plan_batch(
+        self, items: Sequence[TextRequest]
+    ) -> Tuple[List[BatchItemResult], List[List[int]], Dict[int, List[int]]]:
+        """Serve cache hits and pack the remaining indexes into chunks within the input and output budgets.
+
+        A text repeated in the batch is sent once; the returned map lists, per sent index, the
+        indexes of its repeats, which get the same result.
+        """
+        settings = get_settings()
+        results: List[BatchItemResult] = []
+        pending = {False: [], True: []}
+        first: Dict[Tuple[str, bool], int] = {}
+        duplicates: Dict[int, List[int]] = {}
+        for index, item in enumerate(items):
+            cached = None
+            if self.cache is not None:
+                cached = self.cache.get(self._cache_key("translate-zh", item.text, item.include_grammar))
+            if cached is not None:
+                results.append(BatchItemResult(index=index, status="cached", result=cached))
+                continue
+            results.append(BatchItemResult(index=index, status="error", error="not processed"))
+            key = (item.text, item.include_grammar)
+            if key in first:
+                duplicates.setdefault(first[key], []).append(index)
+            else:
+                first[key] = index
+                pending[item.include_grammar].append(index)
+
+        chunks: List[List[int]] = []
+        for indexes in pending.values():
+            chunk: List[int] = []
+            chunk_tokens = chunk_output_tokens = 0
+            for index in indexes:
+                tokens = estimate_tokens(items[index].text)
+                output_tokens = self._estimate_batch_output_tokens(tokens, items[index].include_grammar)
+                if chunk and (
+                    len(chunk) >= settings.batch_max_items
+                    or chunk_tokens + tokens > settings.batch_max_prompt_tokens
+                    or chunk_output_tokens + output_tokens > settings.batch_max_output_tokens
+                ):
+                    chunks.append(chunk)
+                    chunk, chunk_tokens, chunk_output_tokens = [], 0, 0
+                chunk.append(index)
+                chunk_tokens += tokens
+                chunk_output_tokens += output_tokens
+            if chunk:
+                chunks.append(chunk)
+        return results, chunks, duplicates
+
+    def _estimate_batch_output_tokens(self, input_tokens: int, include_grammar: bool) -> int:
+        """Rough completion size of one batch item: its translations, reading and grammar notes plus JSON keys."""
+        # English and Japanese are each about as long as the Chinese; Hiragana spells out every kanji.
+        tokens = 2 * input_tokens + (0 if self._local_reading else 2 * input_tokens) + 20
+        if include_grammar:
+            # Two free-text explanations, which run longer than the sentence they explain.
+            tokens += 2 * max(100, 3 * input_tokens)
+        return tokens
+
+    def _settle_batch(
+        self,
+        items: Sequence[TextRequest],
+        results: List[BatchItemResult],
+        chunks: List[List[int]],
+        outputs: Sequence[object],
+        duplicates: Dict[int, List[int]],
+    ) -> List[Tuple[str, TranslationResponse]]:
+        """Split model outputs back onto their items (and repeats); return (cache_key, result) pairs to persist."""
+        stored: List[Tuple[str, TranslationResponse]] = []
+        for chunk, output in zip(chunks, outputs):
+            if isinstance(output, BaseException):
+                for index in chunk:
+                    results[index] = BatchItemResult(index=index, status="error", error=str(output))
+            elif len(output.items) != len(chunk):
+                message = f"model returned {len(output.items)} results for {len(chunk)} inputs"
+                for index in chunk:
+                    results[index] = BatchItemResult(index=index, status="error", error=message)
+            else:
+                for index, ai_result in zip(chunk, output.items):
+                    item = items[index]
+                    result = self._complete(item.text, ai_result)
+                    results[index] = BatchItemResult(index=index, status="ok", result=result)
+                    stored.append((self._cache_key("translate-zh", item.text, item.include_grammar), result))
+            for index in chunk:
+                for repeat in duplicates.get(index, ()):
+                    results[repeat] = results[index].model_copy(update={"index": repeat})
+        return stored
+
+    def _store_many(self, stored: List[Tuple[str, TranslationResponse]]) -> None:
+        if not stored:
+            return
+        self.repository.save_many([result for _, result in stored], self.model_name)
+        if self.cache is not None:
+            for cache_key, result in stored:
+                self.cache.put(cache_key, result)
+
+    def search_history(self, query: str, limit: int = 20, before_id: Optional[int] = None) -> TranslationSearchResponse:
+        rows = self.repository.search(query, limit=limit, before_id=before_id)
+        items = [
+            TranslationRecord(
+                id=row["id"],
+                original_text=row["chinese"],
+                translated_text=row["english"],
+                english_grammar=row["english_grammar"],
+                japanese_text=row["japanese"],
+                hiragana_pronunciation=row["hiragana"],
+                japanese_grammar=row["japanese_grammar"],
+                timestamp=row["timestamp"],
+            )
+            for row in rows
+        ]
+        next_before_id = items[-1].id if len(items) == limit else None
+        return TranslationSearchResponse(items=items, next_before_id=next_before_id)
+
+    def _recall(self, mode: str, text: str) -> List[MemoryMatch]:
+        """Earlier translations similar enough to reuse or to send as hints, best first."""
+        settings = get_settings()
+        thresholds = [t for t in (settings.tm_reuse_threshold, settings.tm_hint_threshold) if t is not None]
+        if self.memory is None or not thresholds:
+            return []
+        return self.memory.lookup(mode, text, self.model_name, top_k=settings.tm_top_k, min_score=min(thresholds))
+
+    def _reuse(self, mode: str, text: str, include_grammar: bool, matches: List[MemoryMatch]) -> Optional[BaseModel]:
+        """Return the stored output for the same text, if TM_REUSE_THRESHOLD is set and it has every field.
+
+        Similarity only finds the candidates: a stored result is served only when its source equals the
+        input after NFKC and whitespace normalisation (case and punctuation matter), and never in
+        correct-en, where the input's own mistakes are what the caller wants explained.
+        """
+        threshold = get_settings().tm_reuse_threshold
+        if self.memory is None:
+            return None
+        key = reuse_key(text)
+        for match in matches:
+            if threshold is None or mode == "correct-en" or match.score < threshold:
+                break
+            if reuse_key(match.result.original_text) != key:
+                continue
+            if include_grammar and not match.has_grammar:
+                continue
+            try:
+                ai_result = self._response_model(mode, include_grammar).model_validate(match.result.model_dump())
+            except ValidationError:
+                continue
+            TRANSLATION_MEMORY_LOOKUPS.inc(mode=mode, outcome="reuse")
+            return ai_result
+        TRANSLATION_MEMORY_LOOKUPS.inc(mode=mode, outcome="hint" if self._hint_matches(matches) else "miss")
+        return None
+
+    @staticmethod
+    def _hint_matches(matches: List[MemoryMatch]) -> List[MemoryMatch]:
+        threshold = get_settings().tm_hint_threshold
+        if threshold is None:
+            return []
+        return [match for match in matches if match.score >= threshold]
+
+    def _hints(self, matches: List[MemoryMatch]) -> str:
+        return format_hints(self._hint_matches(matches))
+
+    def _store(self, cache_key: str, result: TranslationResponse) -> None:
+        self.repository.save(result, self.model_name)
+        if self.cache is not None:
+            self.cache.put(cache_key, result)
+
+    def _timed(self, stage: str, mode: str) -> ContextManager[None]:
+        return TRANSLATOR_STAGE_SECONDS.time(stage=stage, mode=mode, model=self.model_name)
+
+    def _cache_key(self, mode: str, text: str, include_grammar: bool) -> str:
+        hiragana_engine = "local" if self._local_reading else "model"
+        return make_cache_key(mode, text, include_grammar, self.model_name, PROMPT_VERSION, hiragana_engine)
+
+    @classmethod
+    def _build_prompt(
+        cls, mode: str, text: str, include_grammar: bool, hints: str = "", local_reading: bool = False
+    ) -> str:
+        if mode == "translate-zh":
+            prompt = cls._build_chinese_prompt(text, include_grammar, local_reading)
+        elif mode == "correct-en":
+            prompt = cls._build_english_prompt(text, include_grammar, local_reading)
+        else:
+            raise ValueError(f"unsupported mode: {mode}")
+        if hints:
+            prompt += (
+                "\nKeep wording consistent with these earlier results for similar input "
+                f"(input => English | Japanese):\n{hints}"
+            )
+        return prompt
+
+    @property
+    def _local_reading(self) -> bool:
+        return self.reader is not None
+
+    def _complete(self, text: str, ai_result: BaseModel) -> TranslationResponse:
+        """Fill in the fields the model is no longer asked for: the input text, a UTC timestamp and,
+        with a local reader, the hiragana reading."""
+        fields = ai_result.model_dump()
+        if self.reader is not None:
+            fields["hiragana_pronunciation"] = self.reader.read(fields["japanese_text"])
+        return TranslationResponse(original_text=text, **fields, timestamp=datetime.now(timezone.utc))
+
+    def _response_model(self, mode: str, include_grammar: bool) -> Type[BaseModel]:
+        return response_model_for(mode, include_grammar, self._local_reading)
+
+    def _batch_model(self, items: Sequence[TextRequest], chunk: List[int]) -> Type[BaseModel]:
+        if self._local_reading:
+            if items[chunk[0]].include_grammar:
+                return ChineseTranslationTextWithGrammarBatch
+            return ChineseTranslationTextBatch
+        if items[chunk[0]].include_grammar:
+            return ChineseTranslationWithGrammarBatch
+        return ChineseTranslationBatch
+
+    @staticmethod
+    def _build_chinese_prompt(text: str, include_grammar: bool, local_reading: bool = False) -> str:
+        reading_clause = "" if local_reading else " Also provide Hiragana for the Japanese translation."
+        grammar_clause = " Also explain the English and Japanese grammar." if include_grammar else ""
+        instructions = f"{reading_clause}{grammar_clause}".strip()
+        return f"Translate the following Chinese text to English and Japanese:\n{text}\n{instructions}".rstrip()
+
+    @staticmethod
+    def _build_batch_prompt(items: Sequence[TextRequest], chunk: List[int], local_reading: bool = False) -> str:
+        include_grammar = items[chunk[0]].include_grammar
+        reading_clause = "" if local_reading else " Also provide Hiragana for each Japanese translation."
+        grammar_clause = " Also explain the English and Japanese grammar of each item." if include_grammar else ""
+        texts = json.dumps([items[index].text for index in chunk], ensure_ascii=False)
         return (
-            f"Translate the following Chinese text to English and Japanese:\n{text}\n"
-            f"Also provide Hiragana for the Japanese translation. {grammar_clause}"
+            "Translate each Chinese text in the following JSON array to English and Japanese:\n"
+            f"{texts}\n"
+            f"Return exactly {len(chunk)} items in the same order, one per input text."
+            f"{reading_clause}{grammar_clause}"
         )
 
     @staticmethod
-    def _build_english_prompt(text: str, include_grammar: bool) -> str:
+    def _build_english_prompt(text: str, include_grammar: bool, local_reading: bool = False) -> str:
+        reading_clause = "" if local_reading else " and its Hiragana pronunciation"
         grammar_clause = (
-            "Provide English and Japanese grammar explanations."
-            if include_grammar
-            else "Skip grammar explanations unless they are critical."
+            " Also explain what was wrong in the English and the grammar of the Japanese." if include_grammar else ""
         )
         return (
-            "Correct the grammar of the following English sentence and provide an explanation.\n"
+            "Correct the grammar of the following English sentence.\n"
             f"Original English: {text}\n"
-            f"Also provide a Japanese translation and Hiragana pronunciation. {grammar_clause}"
+            f"Also provide a Japanese translation of the corrected sentence{reading_clause}."
+            f"{grammar_clause}"
         )
 
 
-def get_service() -> TranslatorService:
+def get_service(priority: Priority = Priority.INTERACTIVE) -> TranslatorService:
     """Create a service with default dependencies."""
     repo = init_repository()
-    return TranslatorService(repository=repo)
+    return TranslatorService(
+        repository=repo,
+        cache=get_translation_cache(),
+        priority=priority,
+        memory=get_translation_memory(),
+        reader=get_hiragana_reader(),
+    )
@@ -0,0 +1,120 @@
+import hashlib
+import hmac
+import logging
+import queue
+import threading
+import time
+from typing import List, Optional
+
+import httpx
+import orjson
+
+from pyapp.services.task_events import TaskEvent
+from pyapp.utils.metrics import TASK_WEBHOOK_DELIVERIES
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class WebhookNotifier:
+    """Batch task events and POST them to a webhook URL from a background thread.
+
+    Register `notify` as a TaskEventBus callback. Events are queued without blocking (dropped with a
+    warning when `max_queue` is exceeded) and sent as {"events": [...]} once `batch_size` events are
+    waiting or `flush_interval` has passed. Transport errors, 429 and 5xx responses are retried with
+    exponential backoff up to `max_retries` times; the body is signed with HMAC-SHA256 when a secret is set.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        secret: Optional[str] = None,
+        batch_size: int = 100,
+        flush_interval: float = 0.5,
+        max_retries: int = 5,
+        max_queue: int = 10_000,
+        timeout: float = 10.0,
+        backoff: float = 0.5,
+        max_backoff: float = 30.0,
+    ):
+        self.url = url
+        self.secret = secret
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._client = httpx.Client(timeout=timeout)
+        self._queue: "queue.Queue[object]" = queue.Queue(maxsize=max_queue)
+        self._stopping = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="task-webhooks", daemon=True)
+        self._thread.start()
+
+    def notify(self, event: TaskEvent) -> None:
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            TASK_WEBHOOK_DELIVERIES.inc(outcome="dropped")
+            logger.warning("webhook queue is full; dropping event for task %s", event.task_id)
+
+    def close(self) -> None:
+        """Send what is queued (without waiting out retries) and stop the sender."""
+        if self._stopping.is_set():
+            return
+        self._stopping.set()
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._client.close()
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            batch: List[TaskEvent] = []
+            if item is _STOP:
+                stopping = True
+            else:
+                batch.append(item)
+                deadline = time.monotonic() + self.flush_interval
+                while len(batch) < self.batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = self._queue.get(timeout=remaining)
+                    except queue.Empty:
+                        break
+                    if item is _STOP:
+                        stopping = True
+                        break
+                    batch.append(item)
+            if batch:
+                self._deliver(batch)
+
+    def _deliver(self, batch: List[TaskEvent]) -> None:
+        body = orjson.dumps({"events": [event.to_dict() for event in batch]})
+        headers = {"Content-Type": "application/json"}
+        if self.secret:
+            digest = hmac.new(self.secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+            headers["X-Signature"] = f"sha256={digest}"
+        delay = self.backoff
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self._client.post(self.url, content=body, headers=headers)
+            except httpx.HTTPError as exc:
+                error = f"{type(exc).__name__}: {exc}"
+            else:
+                if response.status_code < 300:
+                    TASK_WEBHOOK_DELIVERIES.inc(len(batch), outcome="delivered")
+                    return
+                error = f"HTTP {response.status_code}"
+                if response.status_code != 429 and response.status_code < 500:
+                    break
+            if attempt == self.max_retries or self._stopping.is_set():
+                break
+            TASK_WEBHOOK_DELIVERIES.inc(len(batch), outcome="retried")
+            self._stopping.wait(delay)
+            delay = min(delay * 2, self.max_backoff)
+        TASK_WEBHOOK_DELIVERIES.inc(len(batch), outcome="dropped")
+        logger.warning("dropping %d task events after webhook failure: %s", len(batch), error)
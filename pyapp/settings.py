@@ -12,9 +12,65 @@ load_dotenv()
 class Settings(BaseSettings):
     openai_api_key: Optional[str] = Field(default=None, alias="OPENAI_API_KEY")
     openai_base_url: str = Field(default="https://api.chatanywhere.tech/v1", alias="OPENAI_BASE_URL")
+    openai_base_urls: Optional[str] = Field(default=None, alias="OPENAI_BASE_URLS")
+    openai_api_keys: Optional[str] = Field(default=None, alias="OPENAI_API_KEYS")
     openai_model: str = Field(default="gpt-4o-2024-08-06", alias="OPENAI_MODEL")
+    openai_timeout_seconds: float = Field(default=60.0, alias="OPENAI_TIMEOUT_SECONDS")
+    openai_connect_timeout_seconds: float = Field(default=10.0, alias="OPENAI_CONNECT_TIMEOUT_SECONDS")
+    openai_max_retries: int = Field(default=2, alias="OPENAI_MAX_RETRIES")
+    openai_max_connections: int = Field(default=500, alias="OPENAI_MAX_CONNECTIONS")
+    openai_max_keepalive_connections: int = Field(default=100, alias="OPENAI_MAX_KEEPALIVE_CONNECTIONS")
+    openai_keepalive_expiry_seconds: float = Field(default=30.0, alias="OPENAI_KEEPALIVE_EXPIRY_SECONDS")
+    openai_endpoint_failure_threshold: int = Field(default=3, alias="OPENAI_ENDPOINT_FAILURE_THRESHOLD")
+    openai_endpoint_cooldown_seconds: float = Field(default=30.0, alias="OPENAI_ENDPOINT_COOLDOWN_SECONDS")
+    model_hedge_delay_ms: Optional[int] = Field(default=None, alias="MODEL_HEDGE_DELAY_MS")
+    model_rpm: Optional[int] = Field(default=None, alias="MODEL_RPM")
+    model_tpm: Optional[int] = Field(default=None, alias="MODEL_TPM")
+    model_max_concurrency: int = Field(default=64, alias="MODEL_MAX_CONCURRENCY")
+    model_min_concurrency: int = Field(default=1, alias="MODEL_MIN_CONCURRENCY")
+    model_rate_limit_retries: int = Field(default=6, alias="MODEL_RATE_LIMIT_RETRIES")
+    model_output_tokens_estimate: int = Field(default=400, alias="MODEL_OUTPUT_TOKENS_ESTIMATE")
+    model_prompt_price_per_million: Optional[float] = Field(default=None, alias="MODEL_PROMPT_PRICE_PER_MILLION")
+    model_completion_price_per_million: Optional[float] = Field(
+        default=None, alias="MODEL_COMPLETION_PRICE_PER_MILLION"
+    )
     database_path: Path = Field(default=Path("translations.db"), alias="DB_PATH")
+    db_busy_timeout_ms: int = Field(default=5000, alias="DB_BUSY_TIMEOUT_MS")
+    db_cached_statements: int = Field(default=256, alias="DB_CACHED_STATEMENTS")
+    write_behind_enabled: bool = Field(default=False, alias="WRITE_BEHIND_ENABLED")
+    write_behind_queue_size: int = Field(default=10_000, alias="WRITE_BEHIND_QUEUE_SIZE")
+    write_behind_batch_size: int = Field(default=200, alias="WRITE_BEHIND_BATCH_SIZE")
+    write_behind_flush_interval_ms: int = Field(default=200, alias="WRITE_BEHIND_FLUSH_INTERVAL_MS")
     internal_api_key: Optional[str] = Field(default=None, alias="INTERNAL_API_KEY")
+    batch_max_items: int = Field(default=40, alias="BATCH_MAX_ITEMS")
+    batch_max_prompt_tokens: int = Field(default=4000, alias="BATCH_MAX_PROMPT_TOKENS")
+    batch_max_output_tokens: int = Field(default=8000, alias="BATCH_MAX_OUTPUT_TOKENS")
+    document_workers: int = Field(default=8, alias="DOCUMENT_WORKERS")
+    cache_enabled: bool = Field(default=True, alias="CACHE_ENABLED")
+    cache_max_entries: int = Field(default=1024, alias="CACHE_MAX_ENTRIES")
+    cache_ttl_seconds: Optional[float] = Field(default=30 * 24 * 3600, alias="CACHE_TTL_SECONDS")
+    cache_persistent_max_entries: Optional[int] = Field(default=100_000, alias="CACHE_PERSISTENT_MAX_ENTRIES")
+    hiragana_engine: str = Field(default="model", alias="HIRAGANA_ENGINE")
+    hiragana_cache_size: int = Field(default=65536, alias="HIRAGANA_CACHE_SIZE")
+    tm_enabled: bool = Field(default=False, alias="TM_ENABLED")
+    tm_reuse_threshold: Optional[float] = Field(default=None, alias="TM_REUSE_THRESHOLD")
+    tm_hint_threshold: Optional[float] = Field(default=0.6, alias="TM_HINT_THRESHOLD")
+    tm_top_k: int = Field(default=2, alias="TM_TOP_K")
+    tm_sync_batch: int = Field(default=500, alias="TM_SYNC_BATCH")
+    task_runner_workers: int = Field(default=4, alias="TASK_RUNNER_WORKERS")
+    task_job_max_attempts: int = Field(default=3, alias="TASK_JOB_MAX_ATTEMPTS")
+    task_job_lease_seconds: float = Field(default=600.0, alias="TASK_JOB_LEASE_SECONDS")
+    task_job_retry_backoff_seconds: float = Field(default=5.0, alias="TASK_JOB_RETRY_BACKOFF_SECONDS")
+    task_job_retry_backoff_max_seconds: float = Field(default=300.0, alias="TASK_JOB_RETRY_BACKOFF_MAX_SECONDS")
+    task_job_poll_interval_ms: int = Field(default=1000, alias="TASK_JOB_POLL_INTERVAL_MS")
+    task_job_queue_max: Optional[int] = Field(default=10_000, alias="TASK_JOB_QUEUE_MAX")
+    task_events_history: int = Field(default=1024, alias="TASK_EVENTS_HISTORY")
+    task_wait_recheck_ms: int = Field(default=1000, alias="TASK_WAIT_RECHECK_MS")
+    task_webhook_url: Optional[str] = Field(default=None, alias="TASK_WEBHOOK_URL")
+    task_webhook_secret: Optional[str] = Field(default=None, alias="TASK_WEBHOOK_SECRET")
+    task_webhook_batch_size: int = Field(default=100, alias="TASK_WEBHOOK_BATCH_SIZE")
+    task_webhook_flush_interval_ms: int = Field(default=500, alias="TASK_WEBHOOK_FLUSH_INTERVAL_MS")
+    task_webhook_max_retries: int = Field(default=5, alias="TASK_WEBHOOK_MAX_RETRIES")
 
     model_config = SettingsConfigDict(
             env_file=".env",
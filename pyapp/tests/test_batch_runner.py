@@ -0,0 +1,86 @@
+import json
+import time
+
+from pyapp.models.schemas import TranslationResponse
+from pyapp.repositories.batch_repo import BatchProgressRepository
+from pyapp.repositories.migrations import migrate
+from pyapp.services.batch_runner import BatchRunner, _written_lines
+
+
+class _FakeTranslator:
+    def __init__(self, on_call=None):
+        self.calls = []
+        self.on_call = on_call
+
+    def translate_chinese(self, text, include_grammar=False):
+        self.calls.append(text)
+        if self.on_call is not None:
+            self.on_call(text)
+        return TranslationResponse(original_text=text, translated_text=f"en:{text}")
+
+
+def _runner(tmp_path, translator, **kwargs) -> BatchRunner:
+    db_path = tmp_path / "batch.db"
+    migrate(db_path)
+    return BatchRunner(translator, BatchProgressRepository(db_path), concurrency=1, **kwargs)
+
+
+def _corpus(tmp_path, count: int):
+    path = tmp_path / "corpus.jsonl"
+    lines = (json.dumps({"text": f"文本{i}", "mode": "translate-zh"}) + "\n" for i in range(1, count + 1))
+    path.write_text("".join(lines))
+    return path
+
+
+def _record(line_no: int) -> str:
+    return json.dumps({"line": line_no, "input": {}, "result": {}}) + "\n"
+
+
+def _lines(path):
+    # Results are appended as they finish, not in input order.
+    return sorted(json.loads(line)["line"] for line in path.read_text().splitlines())
+
+
+def test_written_lines_cuts_a_torn_last_record(tmp_path):
+    output = tmp_path / "out.jsonl"
+    output.write_text(_record(1) + "not json\n" + _record(2) + '{"line": 3, "inp')
+    assert _written_lines(output) == {1, 2}
+    assert output.read_text() == _record(1) + "not json\n" + _record(2)
+    assert _written_lines(tmp_path / "missing.jsonl") == set()
+
+
+def test_resume_after_a_truncated_output_skips_written_lines(tmp_path):
+    corpus = _corpus(tmp_path, 5)
+    output = tmp_path / "out.jsonl"
+    # Killed mid-write with no checkpoint yet: lines 1-2 complete, line 3 torn.
+    output.write_text(_record(1) + _record(2) + '{"line": 3, "res')
+    translator = _FakeTranslator()
+    stats = _runner(tmp_path, translator).run(corpus, output, run_id="resume")
+
+    assert sorted(translator.calls) == ["文本3", "文本4", "文本5"]
+    assert (stats.skipped, stats.done, stats.failed) == (2, 3, 0)
+    assert _lines(output) == [1, 2, 3, 4, 5]
+
+    again = _FakeTranslator()
+    stats = _runner(tmp_path, again).run(corpus, output, run_id="resume")
+    assert again.calls == [] and stats.skipped == 5
+    assert _lines(output) == [1, 2, 3, 4, 5]
+
+
+def test_each_result_reaches_the_output_before_the_next_checkpoint(tmp_path):
+    corpus = _corpus(tmp_path, 6)
+    output = tmp_path / "out.jsonl"
+    on_disk = []
+
+    def wait_for_earlier_records(text: str) -> None:
+        # One worker and a window of two: line n-2 is recorded while line n is being translated.
+        expected = int(text[len("文本") :]) - 2
+        deadline = time.monotonic() + 2
+        while len(output.read_text().splitlines()) < expected and time.monotonic() < deadline:
+            time.sleep(0.01)
+        on_disk.append(len(output.read_text().splitlines()) >= expected)
+
+    _runner(tmp_path, _FakeTranslator(on_call=wait_for_earlier_records), checkpoint_every=50).run(
+        corpus, output, run_id="flush"
+    )
+    assert on_disk == [True] * 6
@@ -0,0 +1,39 @@
+import threading
+
+import pytest
+
+from pyapp.repositories.connection import ConnectionPool, close_pools, get_pool
+
+
+def test_connections_of_exited_threads_are_closed(tmp_path):
+    pool = ConnectionPool(tmp_path / "pool.db")
+    opened = []
+
+    def use_pool():
+        with pool.connection() as conn:
+            conn.execute("SELECT 1")
+            opened.append(conn)
+
+    for _ in range(5):
+        thread = threading.Thread(target=use_pool)
+        thread.start()
+        thread.join()
+    assert len(pool._connections) == 1
+    with pytest.raises(Exception):
+        opened[0].execute("SELECT 1")
+    pool.close()
+
+
+def test_closed_pool_refuses_use(tmp_path):
+    pool = get_pool(tmp_path / "closed.db")
+    with pool.connection() as conn:
+        conn.execute("SELECT 1")
+    close_pools()
+    assert pool.closed
+    with pytest.raises(RuntimeError, match="closed"):
+        with pool.connection():
+            pass
+    fresh = get_pool(tmp_path / "closed.db")
+    assert fresh is not pool
+    assert get_pool(tmp_path / "closed.db") is fresh
+    close_pools()
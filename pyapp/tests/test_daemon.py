@@ -0,0 +1,84 @@
+import socket
+import threading
+
+import pytest
+
+from pyapp import daemon
+
+
+@pytest.fixture
+def env(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for key in ("DB_PATH", "OPENAI_MODEL", "HIRAGANA_ENGINE"):
+        monkeypatch.delenv(key, raising=False)
+    return tmp_path
+
+
+def test_fingerprint_reads_environment_then_dotenv_and_resolves_the_db_path(env, monkeypatch):
+    assert daemon.settings_fingerprint() == {
+        "DB_PATH": str(env / "translations.db"),
+        "OPENAI_MODEL": None,
+        "HIRAGANA_ENGINE": None,
+    }
+    (env / ".env").write_text("OPENAI_MODEL=from-dotenv\nDB_PATH=data/t.db\nHIRAGANA_ENGINE=local\n")
+    monkeypatch.setenv("OPENAI_MODEL", "from-env")
+    assert daemon.settings_fingerprint() == {
+        "DB_PATH": str(env / "data" / "t.db"),
+        "OPENAI_MODEL": "from-env",
+        "HIRAGANA_ENGINE": "local",
+    }
+
+
+def test_daemon_refuses_requests_from_a_client_with_other_settings(env):
+    server = daemon.Daemon(env / "pyapp.sock")
+    client = dict(server.settings, OPENAI_MODEL="other-model")
+    events = list(server._run({"command": "zh", "text": "你好", "settings": client}))
+    assert events == [{"event": "mismatch", "settings": ["OPENAI_MODEL"]}]
+    assert list(server._run({"command": "zh", "text": "你好"})) == [{"event": "mismatch", "settings": ["DB_PATH"]}]
+
+
+def test_bind_replaces_a_socket_that_closes_without_answering(env):
+    path = env / "run" / "pyapp.sock"
+    daemon._private_dir(path.parent)
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(str(path))
+    stale.listen(1)
+
+    def hang_up():
+        conn, _ = stale.accept()
+        conn.close()
+
+    thread = threading.Thread(target=hang_up)
+    thread.start()
+    server = daemon.Daemon(path)
+    try:
+        server._bind()
+        thread.join(timeout=5)
+        assert daemon._owned_socket(path)
+        assert server._server is not None
+    finally:
+        server.stop()
+        stale.close()
+
+
+def test_bind_refuses_a_socket_with_a_live_daemon(env):
+    path = env / "run" / "pyapp.sock"
+    daemon._private_dir(path.parent)
+    live = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    live.bind(str(path))
+    live.listen(1)
+
+    def pong():
+        conn, _ = live.accept()
+        with conn, conn.makefile("rwb") as stream:
+            stream.readline()
+            stream.write(b'{"event": "pong"}\n')
+
+    thread = threading.Thread(target=pong)
+    thread.start()
+    try:
+        with pytest.raises(RuntimeError, match="already listening"):
+            daemon.Daemon(path)._bind()
+        thread.join(timeout=5)
+    finally:
+        live.close()
@@ -0,0 +1,90 @@
+import pytest
+
+from pyapp.models.schemas import TranslationResponse
+from pyapp.services.documents import UNTRANSLATED_MARKER, DocumentTranslator
+
+SRT = (
+    "1\r\n00:00:01,000 --> 00:00:02,500\r\n你好。\r\n世界！\r\n\r\n"
+    "2\r\n00:00:03,000 --> 00:00:04,000\r\n再见\r\n"
+)
+MARKDOWN = """# 标题
+
+- 第一项
+  1. 嵌套项
+> 引用
+
+| 名字 | 说明 |
+|------|:----:|
+| 苹果 | 水果 \\| 红色 |
+
+```python
+print("不翻译")
+```
+正文。第二句。
+"""
+TEXT = "你好。我很好。  还有一句\n\n\n最后一行"
+
+
+class _FakeTranslator:
+    """Returns each source wrapped in brackets for English and unchanged for Japanese."""
+
+    def __init__(self, fail_on=None):
+        self.fail_on = fail_on
+        self.calls = []
+
+    def translate_chinese(self, text, include_grammar=False):
+        self.calls.append(text)
+        if text == self.fail_on:
+            raise RuntimeError("model unavailable")
+        return TranslationResponse(original_text=text, translated_text=f"[{text}]", japanese_text=text)
+
+
+def _translate(content, fmt, target="en", translator=None):
+    translator = translator or _FakeTranslator()
+    return "".join(DocumentTranslator(translator, workers=2, window=3).translate(content, fmt, target=target))
+
+
+@pytest.mark.parametrize("fmt, content", [("srt", SRT), ("markdown", MARKDOWN), ("text", TEXT)])
+def test_identity_translation_reproduces_the_document(fmt, content):
+    assert _translate(content, fmt, target="ja") == content
+
+
+def test_srt_keeps_cue_numbers_and_timings():
+    assert _translate(SRT, "srt") == (
+        "1\r\n00:00:01,000 --> 00:00:02,500\r\n[你好。\r\n世界！]\r\n\r\n"
+        "2\r\n00:00:03,000 --> 00:00:04,000\r\n[再见]\r\n"
+    )
+
+
+def test_markdown_translates_text_and_cells_but_not_fences_or_rules():
+    translator = _FakeTranslator()
+    output = _translate(MARKDOWN, "markdown", translator=translator)
+    assert output.splitlines() == [
+        "# [标题]",
+        "",
+        "- [第一项]",
+        "  1. [嵌套项]",
+        "> [引用]",
+        "",
+        "| [名字] | [说明] |",
+        "|------|:----:|",
+        "| [苹果] | [水果 \\| 红色] |",
+        "",
+        "```python",
+        'print("不翻译")',
+        "```",
+        "[正文。第二句。]",
+    ]
+    assert 'print("不翻译")' not in translator.calls
+
+
+def test_text_splits_sentences_and_spaces_joined_ones_in_english():
+    assert _translate(TEXT, "text") == "[你好。] [我很好。]  [还有一句]\n\n\n[最后一行]"
+
+
+def test_failed_segment_keeps_its_source_in_place():
+    translator = _FakeTranslator(fail_on="我很好。")
+    assert _translate(TEXT, "text", translator=translator) == (
+        f"[你好。] {UNTRANSLATED_MARKER}我很好。  [还有一句]\n\n\n[最后一行]"
+    )
+
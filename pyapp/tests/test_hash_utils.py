@@ -0,0 +1,72 @@
+import json
+import random
+import sys
+
+import pytest
+
+from pyapp.utils.hash_utils import canonical_json_dumps, hash_payload, keccak_hex
+
+
+def _reference(payload):
+    # The encoding every stored input_hash/result_hash was computed from; must never change.
+    return json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+def _random_text(rng: random.Random) -> str:
+    chars = []
+    for _ in range(rng.randint(0, 12)):
+        code = rng.choice((rng.randint(0, 0x7F), rng.randint(0x80, 0xD7FF), rng.randint(0xE000, sys.maxunicode)))
+        chars.append(chr(code))
+    return "".join(chars)
+
+
+def _random_value(rng: random.Random, depth: int = 0):
+    kinds = ["str", "int", "bool", "none"] + (["dict", "list"] if depth < 3 else [])
+    kind = rng.choice(kinds)
+    if kind == "str":
+        return _random_text(rng)
+    if kind == "int":
+        return rng.randint(-(2**63), 2**64 - 1)
+    if kind == "bool":
+        return rng.random() < 0.5
+    if kind == "none":
+        return None
+    if kind == "dict":
+        return {_random_text(rng): _random_value(rng, depth + 1) for _ in range(rng.randint(0, 5))}
+    return [_random_value(rng, depth + 1) for _ in range(rng.randint(0, 5))]
+
+
+def test_every_code_point_matches_stdlib():
+    code_points = [c for c in range(sys.maxunicode + 1) if not 0xD800 <= c <= 0xDFFF]
+    for start in range(0, len(code_points), 4096):
+        chunk = "".join(map(chr, code_points[start : start + 4096]))
+        payload = {"text": chunk, chunk[:8]: chunk[-8:]}
+        assert canonical_json_dumps(payload) == _reference(payload)
+
+
+def test_random_payloads_match_stdlib():
+    rng = random.Random(20240611)
+    for _ in range(2000):
+        payload = {_random_text(rng): _random_value(rng) for _ in range(rng.randint(0, 6))}
+        assert canonical_json_dumps(payload) == _reference(payload)
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        {"float": 0.1, "nested": [1e16, -0.0, 1.5]},
+        {"big": 2**64, "negative": -(2**63) - 1},
+        {"surrogate": "\ud800"},
+        {"tuple": (1, "a")},
+        {"mode": "translate-zh", "text": "你好，世界！", "include_grammar": False, "timestamp": "2024-01-01T00:00:00Z"},
+    ],
+)
+def test_fallback_and_task_payloads_match_stdlib(payload):
+    assert canonical_json_dumps(payload) == _reference(payload)
+
+
+def test_hash_is_keccak_of_canonical_json():
+    payload = {"b": "二", "a": [1, None, True]}
+    digest, canonical = hash_payload(payload)
+    assert canonical == '{"a":[1,null,true],"b":"二"}'
+    assert digest == keccak_hex(canonical)
@@ -0,0 +1,92 @@
+import pytest
+
+from pyapp.models.schemas import TranslationResponse
+from pyapp.repositories.memory_repo import TranslationMemoryRepository
+from pyapp.repositories.migrations import migrate
+from pyapp.repositories.sqlite_repo import TranslationRepository
+from pyapp.services.memory import TranslationMemory, band_keys, jaccard, normalize, shingles
+
+
+def _result(source: str, english: str = "en") -> TranslationResponse:
+    return TranslationResponse(original_text=source, translated_text=english, japanese_text="ja")
+
+
+@pytest.fixture
+def stores(tmp_path):
+    db_path = tmp_path / "memory.db"
+    migrate(db_path)
+    return TranslationRepository(db_path), TranslationMemory(TranslationMemoryRepository(db_path), sync_batch=7)
+
+
+def test_similarity_ignores_width_case_and_punctuation():
+    assert normalize("Ｈｅｌｌｏ， World！") == "helloworld"
+    assert shingles("你好！") == shingles("你 好") == frozenset({"你好"})
+    assert shingles("好") == frozenset({"好"}) and shingles("。") == frozenset()
+    assert jaccard(shingles("我们去公园"), shingles("我们去学校")) == pytest.approx(2 / 6)
+
+
+def test_band_keys_are_scoped_to_mode_and_model():
+    grams = shingles("今天天气很好，我们去公园散步吧")
+    keys = band_keys("translate-zh", "model-a", grams)
+    assert len(keys) == 16 and all(0 <= key < 2**63 for key in keys)
+    assert keys == band_keys("translate-zh", "model-a", grams)
+    assert not set(keys) & set(band_keys("translate-zh", "model-b", grams))
+    assert not set(keys) & set(band_keys("correct-en", "model-a", grams))
+    assert not set(keys) & set(band_keys("translate-zh", None, grams))
+    assert band_keys("translate-zh", "model-a", frozenset()) == []
+
+
+def test_near_duplicates_share_bands_and_unrelated_text_does_not():
+    base = band_keys("translate-zh", "m", shingles("这个项目的性能瓶颈在数据库写入"))
+    near = band_keys("translate-zh", "m", shingles("这个项目的性能瓶颈在数据库写入了"))
+    unrelated = band_keys("translate-zh", "m", shingles("明天早上我要去机场接朋友"))
+    assert len(set(base) & set(near)) >= 4
+    assert not set(base) & set(unrelated)
+
+
+def test_lookup_ranks_by_similarity_and_only_returns_the_callers_model(stores):
+    repository, memory = stores
+    repository.save_many(
+        [_result("这个项目的性能瓶颈在数据库写入。", "writes"), _result("这个项目的性能瓶颈在数据库读取。", "reads")],
+        "model-a",
+    )
+    repository.save(_result("这个项目的性能瓶颈在数据库写入。", "other model"), "model-b")
+    repository.save(_result("这个项目的性能瓶颈在数据库写入。", "unknown model"))
+
+    matches = memory.lookup("translate-zh", "这个项目的性能瓶颈在数据库写入", "model-a", top_k=3)
+    assert [match.result.translated_text for match in matches] == ["writes", "reads"]
+    assert matches[0].score == 1.0 and matches[1].score < 1.0
+
+    assert [
+        m.result.translated_text for m in memory.lookup("translate-zh", "这个项目的性能瓶颈在数据库写入", "model-b")
+    ] == ["other model"]
+    assert memory.lookup("translate-zh", "这个项目的性能瓶颈在数据库写入", "model-c") == []
+    assert memory.lookup("correct-en", "这个项目的性能瓶颈在数据库写入", "model-a") == []
+    assert len(memory.lookup("translate-zh", "这个项目的性能瓶颈在数据库写入", "model-a", top_k=1)) == 1
+    assert len(memory.lookup("translate-zh", "这个项目的性能瓶颈在数据库写入", "model-a", min_score=1.0)) == 1
+
+
+def test_lookup_returns_one_match_per_source_preferring_the_exact_one(stores):
+    repository, memory = stores
+    repository.save_many(
+        [_result("我不去！", "exclaimed"), _result("我不去？", "asked"), _result("我不去？", "asked again")], "m"
+    )
+    matches = memory.lookup("translate-zh", "我不去？", "m", top_k=3)
+    assert [match.result.translated_text for match in matches] == ["asked again"]
+
+
+def test_rows_stored_later_are_indexed_in_batches(stores):
+    repository, memory = stores
+    repository.save(_result("今天天气很好"), "m")
+    assert memory.lookup("translate-zh", "今天天气很好", "m")
+    repository.save_many([_result(f"我们去公园散步吧{i}") for i in range(20)], "m")
+
+    # Each lookup indexes at most one batch (sync_batch=7) of the new rows.
+    memory.lookup("translate-zh", "今天天气很好", "m")
+    assert memory.repository.last_indexed_id() == 8
+    assert memory.sync() == 13
+    assert memory.repository.last_indexed_id() == 21
+    assert (
+        memory.lookup("translate-zh", "我们去公园散步吧19", "m", top_k=1)[0].result.original_text
+        == "我们去公园散步吧19"
+    )
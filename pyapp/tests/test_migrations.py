@@ -0,0 +1,65 @@
+import sqlite3
+
+from pyapp.repositories import migrations
+from pyapp.repositories.migrations import MIGRATIONS, migrate
+
+LATEST = MIGRATIONS[-1][0]
+
+
+def _versions(db_path):
+    with sqlite3.connect(db_path) as conn:
+        return [row[0] for row in conn.execute("SELECT version FROM schema_version ORDER BY version")]
+
+
+def _tables(db_path):
+    with sqlite3.connect(db_path) as conn:
+        return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+
+def test_migrate_empty_database(tmp_path):
+    db_path = tmp_path / "empty.db"
+    assert migrate(db_path) == LATEST
+    assert _versions(db_path) == [version for version, _ in MIGRATIONS]
+    assert {"translations", "tasks", "task_jobs", "schema_version"} <= _tables(db_path)
+
+
+def test_migrate_up_to_date_database_is_a_no_op(tmp_path):
+    db_path = tmp_path / "current.db"
+    migrate(db_path)
+    with sqlite3.connect(db_path) as conn:
+        applied = conn.execute("SELECT version, applied_at FROM schema_version").fetchall()
+    assert migrate(db_path) == LATEST
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT version, applied_at FROM schema_version").fetchall() == applied
+
+
+def test_migrate_older_database_applies_only_pending_versions(tmp_path, monkeypatch):
+    db_path = tmp_path / "old.db"
+    monkeypatch.setattr(migrations, "MIGRATIONS", MIGRATIONS[:2])
+    assert migrate(db_path) == 2
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(
+            "INSERT INTO translations (chinese, english, timestamp) VALUES ('你好', 'Hello', '2024-01-01T00:00:00Z')"
+        )
+    monkeypatch.setattr(migrations, "MIGRATIONS", MIGRATIONS)
+    assert migrate(db_path) == LATEST
+    assert _versions(db_path) == [version for version, _ in MIGRATIONS]
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT chinese, english FROM translations").fetchall() == [("你好", "Hello")]
+
+
+def test_task_listing_by_status_is_served_from_the_covering_index(tmp_path):
+    db_path = tmp_path / "plan.db"
+    migrate(db_path)
+    with sqlite3.connect(db_path) as conn:
+        indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        plan = " ".join(
+            row[3]
+            for row in conn.execute(
+                "EXPLAIN QUERY PLAN SELECT id, task_id, input_hash, result_hash, status, created_at, updated_at "
+                "FROM tasks WHERE status = ? AND id > ? AND updated_at < ? ORDER BY id LIMIT ?",
+                ("prepared", 0, "2024-01-01T00:00:00Z", 100),
+            )
+        )
+    assert "idx_tasks_updated_at" not in indexes
+    assert "COVERING INDEX idx_tasks_status_id" in plan and "TEMP B-TREE" not in plan
@@ -0,0 +1,141 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from openai import APIConnectionError
+
+from pyapp.clients import openai_client
+from pyapp.clients.router import Endpoint, EndpointRouter
+from pyapp.clients.scheduler import ModelScheduler, Priority
+from pyapp.settings import get_settings
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _endpoints(*names):
+    return [Endpoint(name=name, base_url=f"http://{name}", api_key="key") for name in names]
+
+
+def test_untried_endpoints_first_then_lowest_ewma():
+    router = EndpointRouter(_endpoints("a", "b"), alpha=0.5, clock=FakeClock())
+    a, b = router.endpoints
+    router.record_success(a, 1.0)
+    assert router.pick() is b
+    router.record_success(b, 3.0)
+    assert router.pick() is a
+    router.record_success(a, 9.0)
+    assert a.ewma_latency == 5.0
+    assert router.pick() is b
+    assert router.pick(exclude={b}) is a
+    router.record_success(b)  # streams report no latency
+    assert b.ewma_latency == 3.0 and b.requests == 2
+
+
+def test_failing_endpoint_is_ejected_until_the_cooldown_ends():
+    clock = FakeClock()
+    router = EndpointRouter(_endpoints("a", "b"), failure_threshold=2, cooldown_seconds=30, clock=clock)
+    a, b = router.endpoints
+    router.record_success(a, 0.1)
+    router.record_success(b, 0.5)
+    router.record_failure(a)
+    assert router.pick() is a
+    router.record_failure(a)
+    assert router.pick() is b
+    assert [entry["healthy"] for entry in router.snapshot()] == [False, True]
+
+    # With every candidate ejected, the one that recovers first is used.
+    assert router.pick(exclude={b}) is a
+    clock.now += 30
+    assert router.pick() is a
+    router.record_success(a, 0.1)
+    assert a.consecutive_failures == 0 and a.failures == 2
+
+
+class _FakeClient:
+    """Stands in for an endpoint's OpenAI client: answers after `delay` seconds, or fails."""
+
+    def __init__(self, delay: float = 0.0, fail: bool = False, tokens: int = 10):
+        self.delay = delay
+        self.fail = fail
+        self.tokens = tokens
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.fail:
+            raise APIConnectionError(request=httpx.Request("POST", "http://fake"))
+        usage = SimpleNamespace(prompt_tokens=1, completion_tokens=1, total_tokens=self.tokens)
+        completion = SimpleNamespace(usage=usage)
+        return SimpleNamespace(parse=lambda: completion)
+
+
+@pytest.fixture
+def routed(monkeypatch):
+    """Route _scheduled_call over a slow and a second endpoint with a 50 ms hedge delay."""
+    endpoints = _endpoints("slow", "other")
+    router = EndpointRouter(endpoints, failure_threshold=1)
+    # The slow endpoint looks fastest, so it is always the primary.
+    router.record_success(endpoints[0], 0.01)
+    router.record_success(endpoints[1], 0.02)
+    scheduler = ModelScheduler()
+    releases = []
+    release = scheduler.release
+
+    def recording_release(ticket, used_tokens=None, **kwargs):
+        releases.append(used_tokens)
+        release(ticket, used_tokens=used_tokens, **kwargs)
+
+    monkeypatch.setattr(scheduler, "release", recording_release)
+    settings = get_settings().model_copy(update={"model_hedge_delay_ms": 50, "openai_max_retries": 0})
+    monkeypatch.setattr(openai_client, "get_router", lambda: router)
+    monkeypatch.setattr(openai_client, "get_scheduler", lambda: scheduler)
+    monkeypatch.setattr(openai_client, "get_settings", lambda: settings)
+    monkeypatch.setattr(openai_client, "get_openai_client", lambda endpoint: endpoint.sync_client)
+    return SimpleNamespace(router=router, scheduler=scheduler, releases=releases, slow=endpoints[0], other=endpoints[1])
+
+
+def _call(routed):
+    return openai_client._scheduled_call(lambda client: client(), "你好", Priority.INTERACTIVE)
+
+
+def test_failed_hedge_is_ejected_and_the_slow_primary_still_answers(routed):
+    routed.slow.sync_client = _FakeClient(delay=0.2, tokens=7)
+    routed.other.sync_client = _FakeClient(fail=True)
+    completion = _call(routed)
+
+    assert completion.usage.total_tokens == 7
+    assert routed.other.sync_client.calls == 1 and routed.other.failures == 1
+    assert routed.router.pick() is routed.slow
+    assert routed.slow.ewma_latency > 0.01
+    assert routed.releases == [7] and routed.scheduler.stats()["in_flight"] == 0
+
+
+def test_ticket_is_held_until_the_losing_hedge_settles(routed):
+    finish_slow = threading.Event()
+    slow = _FakeClient(tokens=5)
+
+    def blocked_slow():
+        finish_slow.wait(timeout=5)
+        return slow()
+
+    routed.slow.sync_client = blocked_slow
+    routed.other.sync_client = _FakeClient(tokens=3)
+    completion = _call(routed)
+
+    assert completion.usage.total_tokens == 3
+    assert routed.releases == [] and routed.scheduler.stats()["in_flight"] == 1
+    finish_slow.set()
+    deadline = time.monotonic() + 2
+    while not routed.releases and time.monotonic() < deadline:
+        time.sleep(0.01)
+    # Both requests ran, so both are charged against the token budget.
+    assert routed.releases == [8] and routed.scheduler.stats()["in_flight"] == 0
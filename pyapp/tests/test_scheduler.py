@@ -0,0 +1,126 @@
+import threading
+import time
+
+from pyapp.clients.scheduler import ModelScheduler, Priority, _Bucket
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _acquire_in_thread(scheduler: ModelScheduler, tokens: int, priority: int = Priority.INTERACTIVE, granted=None):
+    granted = granted if granted is not None else []
+
+    def run():
+        ticket = scheduler.acquire(tokens, priority)
+        granted.append(priority)
+        scheduler.release(ticket)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread, granted
+
+
+def _wait_until(condition, timeout: float = 2.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_bucket_refills_continuously_up_to_capacity():
+    bucket = _Bucket(60, now=0.0)
+    bucket.take(60)
+    assert bucket.wait_time(1) == 1.0
+    bucket.refill(0.5)
+    assert bucket.level == 0.5 and bucket.wait_time(1) == 0.5
+    bucket.refill(600.0)
+    assert bucket.level == 60.0
+    bucket.adjust(-100)
+    assert bucket.level == 60.0
+    assert _Bucket(None, now=0.0).wait_time(10**9) == 0.0
+
+
+def test_token_budget_blocks_until_the_clock_refills_it():
+    clock = FakeClock()
+    # 6000 tokens per minute refill 100 per second, so 10 tokens take 0.1s.
+    scheduler = ModelScheduler(tpm=6000, clock=clock)
+    scheduler.release(scheduler.acquire(6000))
+
+    thread, granted = _acquire_in_thread(scheduler, 10)
+    time.sleep(0.3)
+    assert granted == [] and scheduler.stats()["waiting"] == 1
+    clock.now += 0.1
+    thread.join(timeout=2)
+    assert granted == [Priority.INTERACTIVE]
+
+
+def test_request_budget_and_usage_correction():
+    clock = FakeClock()
+    scheduler = ModelScheduler(rpm=600, tpm=6000, clock=clock)
+    ticket = scheduler.acquire(6000)
+    # The call used far fewer tokens than estimated: the difference is refunded at once.
+    scheduler.release(ticket, used_tokens=1000)
+    scheduler.release(scheduler.acquire(5000))
+    for _ in range(598):
+        scheduler.release(scheduler.acquire(0))
+
+    thread, granted = _acquire_in_thread(scheduler, 0)
+    time.sleep(0.2)
+    assert granted == []
+    clock.now += 0.1
+    thread.join(timeout=2)
+    assert granted == [Priority.INTERACTIVE]
+
+
+def test_concurrency_limit_halves_on_429_and_grows_on_success():
+    clock = FakeClock()
+    scheduler = ModelScheduler(max_concurrency=4, min_concurrency=1, clock=clock)
+    tickets = [scheduler.acquire(1) for _ in range(4)]
+    assert scheduler.stats()["concurrency_limit"] == 4
+
+    scheduler.release(tickets.pop(), rate_limited=True)
+    assert scheduler.stats()["concurrency_limit"] == 2
+    scheduler.release(tickets.pop())
+    assert scheduler.stats()["concurrency_limit"] == 2.5
+    for ticket in tickets:
+        scheduler.release(ticket, rate_limited=True)
+    assert scheduler.stats()["concurrency_limit"] == 1
+    assert scheduler.stats()["rate_limited"] == 3
+
+    clock.now += 1.0  # past the default one-second cooldown
+
+    for _ in range(100):
+        scheduler.release(scheduler.acquire(1))
+    assert scheduler.stats()["concurrency_limit"] == 4
+
+
+def test_retry_after_holds_new_calls_until_the_cooldown_ends():
+    clock = FakeClock()
+    scheduler = ModelScheduler(clock=clock)
+    scheduler.release(scheduler.acquire(1), rate_limited=True, retry_after=0.1)
+
+    thread, granted = _acquire_in_thread(scheduler, 1)
+    time.sleep(0.3)
+    assert granted == []
+    clock.now += 0.1
+    thread.join(timeout=2)
+    assert granted == [Priority.INTERACTIVE]
+
+
+def test_waiters_are_served_in_priority_order():
+    scheduler = ModelScheduler(max_concurrency=1, clock=FakeClock())
+    ticket = scheduler.acquire(1)
+    granted = []
+    threads = []
+    for count, priority in enumerate((Priority.BATCH, Priority.TASK, Priority.BATCH, Priority.INTERACTIVE), start=1):
+        threads.append(_acquire_in_thread(scheduler, 1, priority, granted)[0])
+        assert _wait_until(lambda: scheduler.stats()["waiting"] == count)
+    scheduler.release(ticket)
+    for thread in threads:
+        thread.join(timeout=2)
+    assert granted == [Priority.INTERACTIVE, Priority.TASK, Priority.BATCH, Priority.BATCH]
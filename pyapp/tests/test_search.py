@@ -0,0 +1,47 @@
+import pytest
+
+from pyapp.models.schemas import TranslationResponse
+from pyapp.repositories.migrations import migrate
+from pyapp.repositories.sqlite_repo import TranslationRepository
+
+
+@pytest.fixture
+def repository(tmp_path):
+    db_path = tmp_path / "search.db"
+    migrate(db_path)
+    repository = TranslationRepository(db_path)
+    repository.save_many(
+        TranslationResponse(
+            original_text=f"今天天气很好{i}" if i % 2 == 0 else f"我们去公园{i}",
+            translated_text=f"text {i}",
+            japanese_text="テスト",
+            hiragana_pronunciation="てすと",
+        )
+        for i in range(25)
+    )
+    return repository
+
+
+def test_search_pages_newest_first_without_overlap(repository):
+    seen = []
+    before_id = None
+    while True:
+        page = repository.search("天气很好", limit=5, before_id=before_id)
+        if not page:
+            break
+        ids = [row["id"] for row in page]
+        assert ids == sorted(ids, reverse=True)
+        seen.extend(ids)
+        before_id = ids[-1]
+    assert len(seen) == len(set(seen)) == 13
+    assert all(row["chinese"].startswith("今天天气很好") for row in repository.search("天气很好", limit=20))
+
+
+def test_search_matches_english_and_japanese_columns(repository):
+    assert len(repository.search("text 1", limit=50)) == 11
+    assert len(repository.search("テスト", limit=50)) == 25
+
+
+def test_search_rejects_queries_the_trigram_index_cannot_answer(repository):
+    with pytest.raises(ValueError):
+        repository.search("天气")
@@ -0,0 +1,138 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from pyapp.utils.singleflight import AsyncSingleFlight, SingleFlight
+
+CALLERS = 8
+
+
+def _run_threads(flight: SingleFlight, fn, release: threading.Event):
+    results, errors = [], []
+
+    def caller():
+        try:
+            results.append(flight.do("key", fn))
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=caller) for _ in range(CALLERS)]
+    for thread in threads:
+        thread.start()
+    # Followers only join while the leader's call is still running.
+    time.sleep(0.1)
+    release.set()
+    for thread in threads:
+        thread.join(timeout=5)
+    return results, errors
+
+
+def test_concurrent_threads_share_one_call():
+    flight: SingleFlight[str] = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def fn():
+        calls.append(1)
+        release.wait(timeout=5)
+        return "result"
+
+    results, errors = _run_threads(flight, fn, release)
+    assert len(calls) == 1
+    assert results == ["result"] * CALLERS and errors == []
+    assert flight.in_flight() == 0
+
+
+def test_thread_error_reaches_every_waiter():
+    flight: SingleFlight[str] = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def fn():
+        calls.append(1)
+        release.wait(timeout=5)
+        raise RuntimeError("model unavailable")
+
+    results, errors = _run_threads(flight, fn, release)
+    assert len(calls) == 1
+    assert results == [] and len(errors) == CALLERS
+    assert all(str(error) == "model unavailable" for error in errors)
+    assert flight.in_flight() == 0
+
+
+def test_finished_key_runs_again():
+    flight: SingleFlight[int] = SingleFlight()
+    calls = []
+    assert flight.do("key", lambda: calls.append(1) or len(calls)) == 1
+    assert flight.do("key", lambda: calls.append(1) or len(calls)) == 2
+
+
+async def _gather(flight: AsyncSingleFlight, fn, release: asyncio.Event):
+    callers = [asyncio.ensure_future(flight.do("key", fn)) for _ in range(CALLERS)]
+    await asyncio.sleep(0)
+    release.set()
+    return await asyncio.gather(*callers, return_exceptions=True)
+
+
+def test_concurrent_tasks_share_one_call():
+    calls = []
+
+    async def scenario():
+        flight: AsyncSingleFlight[str] = AsyncSingleFlight()
+        release = asyncio.Event()
+
+        async def fn():
+            calls.append(1)
+            await release.wait()
+            return "result"
+
+        results = await _gather(flight, fn, release)
+        return results, flight.in_flight()
+
+    results, in_flight = asyncio.run(scenario())
+    assert len(calls) == 1
+    assert results == ["result"] * CALLERS
+    assert in_flight == 0
+
+
+def test_task_error_reaches_every_waiter():
+    calls = []
+
+    async def scenario():
+        flight: AsyncSingleFlight[str] = AsyncSingleFlight()
+        release = asyncio.Event()
+
+        async def fn():
+            calls.append(1)
+            await release.wait()
+            raise RuntimeError("model unavailable")
+
+        return await _gather(flight, fn, release)
+
+    results = asyncio.run(scenario())
+    assert len(calls) == 1
+    assert len(results) == CALLERS
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+def test_cancelled_caller_does_not_cancel_the_shared_call():
+    async def scenario():
+        flight: AsyncSingleFlight[str] = AsyncSingleFlight()
+        release = asyncio.Event()
+
+        async def fn():
+            await release.wait()
+            return "result"
+
+        first = asyncio.ensure_future(flight.do("key", fn))
+        second = asyncio.ensure_future(flight.do("key", fn))
+        await asyncio.sleep(0)
+        first.cancel()
+        release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(scenario()) == "result"
@@ -0,0 +1,102 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+from pyapp.api.main import get_task, task_events
+from pyapp.models.schemas import TaskClaimRequest, TaskInput, TaskStatusUpdateRequest
+from pyapp.repositories.migrations import migrate
+from pyapp.repositories.task_repo import TaskRepository
+from pyapp.services.task_events import TaskEventBus
+from pyapp.services.task_service import TaskService
+
+TIMESTAMP = "2024-01-01T00:00:00Z"
+
+
+@pytest.fixture
+def bus():
+    return TaskEventBus(history=4)
+
+
+@pytest.fixture
+def service(tmp_path, bus):
+    db_path = tmp_path / "tasks.db"
+    migrate(db_path)
+    service = TaskService(TaskRepository(db_path), events=bus)
+    prepared = service.prepare(TaskInput(text="你好", mode="translate-zh"))
+    service.claim(TaskClaimRequest(task_id=1, input_hash=prepared.input_hash))
+    return service
+
+
+def test_since_replays_events_after_the_given_id(bus):
+    events = [bus.publish(task_id, "claimed", None, TIMESTAMP) for task_id in (1, 2, 3)]
+
+    assert bus.since(bus.event_id(events[0])) == events[1:]
+    assert bus.since(bus.event_id(events[-1])) == []
+    assert bus.since(f"{bus.boot_id}-0") == events
+
+
+def test_since_requires_resync_for_other_boot_ids_and_evicted_events(bus):
+    events = [bus.publish(task_id, "claimed", None, TIMESTAMP) for task_id in range(1, 7)]
+
+    assert bus.since(f"{TaskEventBus().boot_id}-{events[-2].seq}") is None
+    assert bus.since(f"{bus.boot_id}-x") is None
+    assert bus.since(bus.event_id(events[0])) is None  # events[1] fell out of the 4-event history
+    assert bus.since(bus.event_id(events[1])) == events[2:]
+
+
+def _read_stream(bus, last_event_id, count):
+    async def read():
+        response = await task_events(task_id=None, last_event_id=last_event_id, bus=bus)
+        iterator = response.body_iterator
+        try:
+            return [await iterator.__anext__() for _ in range(count)]
+        finally:
+            await iterator.aclose()
+
+    return asyncio.run(read())
+
+
+def test_stream_replays_from_last_event_id(bus):
+    first = bus.publish(1, "claimed", None, TIMESTAMP)
+    second = bus.publish(2, "claimed", None, TIMESTAMP)
+
+    (chunk,) = _read_stream(bus, bus.event_id(first), 1)
+    assert chunk.startswith(f"id: {bus.event_id(second)}\nevent: task\n")
+
+
+def test_stream_with_stale_boot_id_starts_with_resync(bus):
+    bus.publish(1, "claimed", None, TIMESTAMP)
+
+    (chunk,) = _read_stream(bus, "deadbeef-1", 1)
+    event, data = chunk.split("\n")[:2]
+    assert event == "event: resync"
+    assert json.loads(data.removeprefix("data: ")) == {"last_event_id": "deadbeef-1", "boot_id": bus.boot_id}
+
+
+def _poll(service, bus, wait):
+    async def poll():
+        started = time.monotonic()
+        response = await get_task(task_id=1, include_result=False, wait=wait, svc=service, bus=bus)
+        return json.loads(response.body), time.monotonic() - started
+
+    return asyncio.run(poll())
+
+
+def test_long_poll_returns_when_the_task_changes(service, bus):
+    timer = threading.Timer(0.1, service.update_status, (1, TaskStatusUpdateRequest(status="failed")))
+    timer.start()
+    try:
+        body, elapsed = _poll(service, bus, wait=10)
+    finally:
+        timer.join()
+    assert body["status"] == "failed"
+    assert elapsed < 5
+
+
+def test_long_poll_returns_current_state_on_timeout(service, bus):
+    body, elapsed = _poll(service, bus, wait=0.2)
+    assert body["status"] == "created"
+    assert elapsed >= 0.2
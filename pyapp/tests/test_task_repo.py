@@ -0,0 +1,96 @@
+import pytest
+
+from pyapp.models.schemas import TaskClaimRequest, TaskInput
+from pyapp.repositories.migrations import migrate
+from pyapp.repositories.task_repo import (
+    CLAIM_CREATED,
+    CLAIM_INPUT_CONFLICT,
+    CLAIM_NOT_FOUND,
+    CLAIM_TASK_CONFLICT,
+    TaskRepository,
+    _IN_CHUNK,
+)
+from pyapp.services.task_service import TaskService
+
+TIMESTAMP = "2024-01-01T00:00:00Z"
+
+
+@pytest.fixture
+def repository(tmp_path):
+    db_path = tmp_path / "tasks.db"
+    migrate(db_path)
+    repository = TaskRepository(db_path)
+    repository.prepare_many([("0xa", '{"text":"a"}'), ("0xb", '{"text":"b"}')], TIMESTAMP)
+    return repository
+
+
+def _claim(task_id: int, input_hash: str) -> TaskClaimRequest:
+    return TaskClaimRequest(task_id=task_id, input_hash=input_hash, requester="0xr", chain_id=1)
+
+
+def test_claim_many_outcomes(repository):
+    outcomes = repository.claim_many(
+        [
+            _claim(1, "0xa"),
+            _claim(1, "0xa"),  # already owned by the same task: idempotent
+            _claim(2, "0xa"),  # input bound to task 1
+            _claim(1, "0xb"),  # task 1 bound to another input
+            _claim(3, "0xmissing"),
+        ],
+        timestamp=TIMESTAMP,
+    )
+    assert outcomes == [CLAIM_CREATED, CLAIM_CREATED, CLAIM_INPUT_CONFLICT, CLAIM_TASK_CONFLICT, CLAIM_NOT_FOUND]
+    row = repository.get_by_task_id(1)
+    assert row["input_hash"] == "0xa" and row["status"] == "created" and row["chain_id"] == 1
+    assert repository.get_by_input_hash("0xb")["task_id"] is None
+
+
+def test_service_claim_many_reports_each_item(repository):
+    items = TaskService(repository).claim_many([_claim(1, "0xa"), _claim(1, "0xa"), _claim(2, "0xa"), _claim(3, "0xc")])
+    assert [item.status for item in items] == ["created", "created", "conflict", "not_found"]
+    assert items[0].updated_at is not None and items[0].error is None
+    assert items[2].error == "input_hash already bound to a different task_id"
+    assert items[3].error == "input_hash not found"
+
+
+def _count(repository) -> int:
+    with repository._connection() as conn:
+        return conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+
+
+def test_prepare_many_inserts_only_new_hashes(repository):
+    created, inserted = repository.prepare_many(
+        [("0xa", '{"text":"a"}'), ("0xc", '{"text":"c"}'), ("0xc", '{"text":"c"}')], "2024-02-01T00:00:00Z"
+    )
+    assert inserted == {"0xc"}
+    assert created == {"0xa": TIMESTAMP, "0xc": "2024-02-01T00:00:00Z"}
+    assert repository.get_by_input_hash("0xc")["status"] == "prepared"
+    assert _count(repository) == 3
+
+
+def test_prepare_many_spans_several_in_chunks(repository):
+    # Existing hashes sit on both sides of each chunk boundary.
+    entries = [(f"0x{i:06x}", f'{{"text":"{i}"}}') for i in range(2 * _IN_CHUNK + 7)]
+    existing = entries[_IN_CHUNK - 1 : _IN_CHUNK + 1] + entries[-1:]
+    repository.prepare_many(existing, TIMESTAMP)
+
+    created, inserted = repository.prepare_many(entries, "2024-02-01T00:00:00Z")
+    assert len(created) == len(entries)
+    assert inserted == {input_hash for input_hash, _ in entries} - {input_hash for input_hash, _ in existing}
+    assert all(created[input_hash] == TIMESTAMP for input_hash, _ in existing)
+    assert _count(repository) == 2 + len(entries)
+
+
+def test_service_prepare_many_flags_repeats_as_deduplicated(repository):
+    service = TaskService(repository)
+    first = TaskInput(text="你好", mode="translate-zh")
+    other = TaskInput(text="hello", mode="correct-en")
+    responses = service.prepare_many([first, TaskInput(text="你好", mode="translate-zh"), other])
+    assert [response.deduped for response in responses] == [False, True, False]
+    assert responses[0].input_hash == responses[1].input_hash != responses[2].input_hash
+    assert responses[0].prepared_at == responses[1].prepared_at
+
+    again = service.prepare_many([other] * (_IN_CHUNK + 1))
+    assert all(response.deduped for response in again)
+    assert {response.prepared_at for response in again} == {responses[2].prepared_at}
+    assert _count(repository) == 4
@@ -0,0 +1,86 @@
+import time
+
+import pytest
+
+from pyapp.models.schemas import TaskClaimRequest, TaskInput, TranslationResponse
+from pyapp.repositories.job_repo import JOB_FAILED, TaskJobRepository
+from pyapp.repositories.migrations import migrate
+from pyapp.repositories.task_repo import TaskRepository
+from pyapp.services.task_runner import TaskRunner
+from pyapp.services.task_service import TaskService
+
+TIMESTAMP = "2024-01-01T00:00:00Z"
+
+
+class FlakyTranslator:
+    def __init__(self, failures: int):
+        self.failures = failures
+        self.calls = 0
+
+    def translate_chinese(self, text, include_grammar=False):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise RuntimeError("upstream unavailable")
+        return TranslationResponse(original_text=text, translated_text="T:" + text)
+
+
+@pytest.fixture
+def service(tmp_path):
+    db_path = tmp_path / "tasks.db"
+    migrate(db_path)
+    service = TaskService(TaskRepository(db_path))
+    prepared = service.prepare(TaskInput(text="你好", mode="translate-zh"))
+    service.claim(TaskClaimRequest(task_id=1, input_hash=prepared.input_hash))
+    return service
+
+
+@pytest.fixture
+def jobs(tmp_path, service):
+    return TaskJobRepository(tmp_path / "tasks.db")
+
+
+def test_requeued_job_is_not_claimed_before_available_at(jobs):
+    jobs.enqueue(1, TIMESTAMP)
+    now = 1000.0
+    assert jobs.claim(10, now, now + 60, TIMESTAMP) == [(1, 1)]
+    assert jobs.requeue(1, 1, "boom", available_at=now + 30)
+
+    assert jobs.claim(10, now + 29, now + 89, TIMESTAMP) == []
+    assert jobs.claim(10, now + 30, now + 90, TIMESTAMP) == [(1, 2)]
+
+
+def test_reenqueued_failed_job_is_available_at_once(jobs):
+    jobs.enqueue(1, TIMESTAMP)
+    now = time.time()
+    jobs.claim(10, now, now + 60, TIMESTAMP)
+    jobs.requeue(1, 1, "boom", available_at=now + 3600)
+    jobs.claim(10, now + 3600, now + 3660, TIMESTAMP)
+    assert jobs.finish(1, 2, JOB_FAILED, TIMESTAMP, error="boom")
+
+    assert jobs.enqueue(1, TIMESTAMP)[1]
+    assert jobs.claim(10, now, now + 60, TIMESTAMP) == [(1, 1)]
+
+
+def test_retry_delay_doubles_with_jitter_and_is_capped(service, jobs, monkeypatch):
+    runner = TaskRunner(service, FlakyTranslator(0), jobs, workers=0, retry_backoff=2.0, retry_backoff_max=10.0)
+    monkeypatch.setattr("pyapp.services.task_runner.random.random", lambda: 1.0)
+    assert [runner._retry_delay(attempt) for attempt in range(1, 6)] == [2.0, 4.0, 8.0, 10.0, 10.0]
+    monkeypatch.setattr("pyapp.services.task_runner.random.random", lambda: 0.0)
+    assert runner._retry_delay(2) == 2.0
+
+
+def test_failed_attempt_waits_for_backoff(service, jobs):
+    translator = FlakyTranslator(1)
+    runner = TaskRunner(service, translator, jobs, workers=1, poll_interval=0.01, retry_backoff=60.0)
+    runner.start()
+    try:
+        runner.submit(1)
+        deadline = time.time() + 5
+        while translator.calls < 1 and time.time() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.1)
+        job = runner.get(1)
+        assert (job.status, job.attempts, translator.calls) == ("queued", 1, 1)
+        assert job.error == "RuntimeError: upstream unavailable"
+    finally:
+        runner.stop()
@@ -0,0 +1,82 @@
+import threading
+import time
+
+from pyapp.models.schemas import ChineseTranslation
+from pyapp.repositories.migrations import migrate
+from pyapp.repositories.sqlite_repo import TranslationRepository
+from pyapp.services import translator as translator_module
+from pyapp.services.cache import TranslationCache
+from pyapp.services.translator import TranslatorService
+
+
+def _service(tmp_path, **kwargs) -> TranslatorService:
+    db_path = tmp_path / "translations.db"
+    migrate(db_path)
+    return TranslatorService(repository=TranslationRepository(db_path), **kwargs)
+
+
+def test_model_name_is_sent_to_the_client_and_keys_the_cache(tmp_path, monkeypatch):
+    models = []
+
+    def fake_chat(prompt, response_model, priority=None, model=None):
+        models.append(model)
+        return ChineseTranslation(
+            translated_text="Hello", japanese_text="こんにちは", hiragana_pronunciation="こんにちは"
+        )
+
+    monkeypatch.setattr(translator_module, "run_structured_chat", fake_chat)
+    service = _service(tmp_path, model_name="model-a")
+    service.translate_chinese("你好")
+    assert models == ["model-a"]
+    other = _service(tmp_path, model_name="model-b")
+    assert service._cache_key("translate-zh", "你好", False) != other._cache_key("translate-zh", "你好", False)
+
+
+def test_concurrent_identical_requests_make_one_model_call(tmp_path, monkeypatch):
+    calls = []
+    release = threading.Event()
+
+    def fake_chat(prompt, response_model, priority=None, model=None):
+        calls.append(prompt)
+        release.wait(timeout=5)
+        return ChineseTranslation(
+            translated_text="Hello", japanese_text="こんにちは", hiragana_pronunciation="こんにちは"
+        )
+
+    monkeypatch.setattr(translator_module, "run_structured_chat", fake_chat)
+    service = _service(tmp_path)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(service.translate_chinese("你好"))) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.1)
+    release.set()
+    for thread in threads:
+        thread.join(timeout=5)
+    assert len(calls) == 1
+    assert [result.translated_text for result in results] == ["Hello"] * 6
+
+
+def test_result_cached_with_one_hiragana_engine_is_not_served_to_the_other(tmp_path, monkeypatch):
+    class FakeReader:
+        def read(self, text):
+            return "よみ"
+
+    calls = []
+
+    def fake_chat(prompt, response_model, priority=None, model=None):
+        calls.append(response_model)
+        fields = {"translated_text": "Hello", "japanese_text": "こんにちは"}
+        if "hiragana_pronunciation" in response_model.model_fields:
+            fields["hiragana_pronunciation"] = "こんにちは"
+        return response_model(**fields)
+
+    monkeypatch.setattr(translator_module, "run_structured_chat", fake_chat)
+    cache = TranslationCache(None)
+    assert _service(tmp_path, cache=cache).translate_chinese("你好").hiragana_pronunciation == "こんにちは"
+    assert (
+        _service(tmp_path, cache=cache, reader=FakeReader()).translate_chinese("你好").hiragana_pronunciation == "よみ"
+    )
+    assert len(calls) == 2
+    _service(tmp_path, cache=cache, reader=FakeReader()).translate_chinese("你好")
+    assert len(calls) == 2
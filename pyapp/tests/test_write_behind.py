@@ -0,0 +1,78 @@
+import atexit
+import threading
+
+import pytest
+
+from pyapp.models.schemas import TranslationResponse
+from pyapp.repositories.migrations import migrate
+from pyapp.repositories.write_behind import WriteBehindTranslationRepository
+
+
+def _result(i: int) -> TranslationResponse:
+    return TranslationResponse(original_text=f"你好{i}", translated_text=f"hello {i}")
+
+
+def _count(repository) -> int:
+    with repository._connection() as conn:
+        return conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+
+
+@pytest.fixture
+def repository(tmp_path):
+    db_path = tmp_path / "write_behind.db"
+    migrate(db_path)
+    repository = WriteBehindTranslationRepository(db_path, batch_size=7, flush_interval=5.0)
+    yield repository
+    repository.close()
+
+
+def test_flush_commits_everything_queued(repository):
+    repository.save_many(_result(i) for i in range(20))
+    repository.save(_result(20))
+    repository.flush()
+    assert repository.pending() == 0
+    assert _count(repository) == 21
+
+
+def test_close_drains_pending_writes_and_rejects_new_ones(repository):
+    # A long flush_interval keeps the last partial batch queued until close().
+    repository.save_many(_result(i) for i in range(10))
+    repository.close()
+    assert repository.closed
+    assert _count(repository) == 10
+    with pytest.raises(RuntimeError):
+        repository.save(_result(10))
+    repository.close()
+
+
+def test_concurrent_saves_racing_close_are_either_written_or_rejected(repository):
+    accepted, rejected = [], []
+
+    def producer(offset: int) -> None:
+        for i in range(offset, offset + 50):
+            try:
+                repository.save(_result(i))
+                accepted.append(i)
+            except RuntimeError:
+                rejected.append(i)
+
+    threads = [threading.Thread(target=producer, args=(n * 50,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    repository.close()
+    for thread in threads:
+        thread.join(timeout=5)
+    assert len(accepted) + len(rejected) == 200
+    assert _count(repository) == len(accepted)
+    # Nothing was enqueued behind the stop marker, so flush() returns.
+    repository.flush()
+
+
+def test_close_unregisters_the_exit_hook(tmp_path, monkeypatch):
+    unregistered = []
+    monkeypatch.setattr(atexit, "unregister", unregistered.append)
+    db_path = tmp_path / "write_behind.db"
+    migrate(db_path)
+    repository = WriteBehindTranslationRepository(db_path)
+    repository.close()
+    assert unregistered == [repository.close]
@@ -1,13 +1,39 @@
 import json
 from typing import Any, Dict, Tuple
 
+import orjson
 from eth_hash.auto import keccak
 
 
-def canonical_json_dumps(payload: Dict[str, Any]) -> str:
+def _has_float(value: Any) -> bool:
+    if isinstance(value, float):
+        return True
+    if isinstance(value, dict):
+        return any(_has_float(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return any(_has_float(item) for item in value)
+    return False
+
+
+def _stdlib_canonical_dumps(payload: Dict[str, Any]) -> str:
     return json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
 
 
+def canonical_json_dumps(payload: Dict[str, Any]) -> str:
+    """Sorted-key, compact, non-ASCII-preserving JSON; the bytes that get hashed.
+
+    orjson matches the stdlib output byte for byte for strings, bools, None and 64-bit ints.
+    Floats (different shortest-repr formatting) and anything orjson rejects (bigger ints,
+    non-str keys, lone surrogates) go through json.dumps so hashes never change.
+    """
+    if _has_float(payload):
+        return _stdlib_canonical_dumps(payload)
+    try:
+        return orjson.dumps(payload, option=orjson.OPT_SORT_KEYS).decode("utf-8")
+    except TypeError:
+        return _stdlib_canonical_dumps(payload)
+
+
 def keccak_hex(value: str) -> str:
     return "0x" + keccak(value.encode("utf-8")).hex()
 
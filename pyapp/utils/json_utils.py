@@ -0,0 +1,15 @@
+from typing import Any, Dict, Optional
+
+import orjson
+
+
+def splice_json(fields: Dict[str, Any], key: str, raw: Optional[str]) -> bytes:
+    """Serialize `fields` as a JSON object with `raw` (already-valid JSON text) appended under `key`.
+
+    Lets stored payloads go out without a parse/validate/serialize round trip; a None raw becomes null.
+    """
+    if raw is None:
+        return orjson.dumps({**fields, key: None})
+    head = orjson.dumps(fields)[:-1]
+    separator = b"," if fields else b""
+    return b"".join((head, separator, orjson.dumps(key), b":", raw.encode("utf-8"), b"}"))
@@ -0,0 +1,221 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram, rendered the way Prometheus client libraries do."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0.0] * (len(self.buckets) + 2)
+            series[bisect.bisect_left(self.buckets, value)] += 1
+            series[-1] += value
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._series.items())
+        lines = []
+        for key, series in items:
+            cumulative = 0.0
+            for bound, count in zip(self.buckets + (float("inf"),), series):
+                cumulative += count
+                labels = _format_labels(self.labelnames + ("le",), key + (_format_value(bound),))
+                lines.append(f"{self.name}_bucket{labels} {_format_value(cumulative)}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{labels} {_format_value(cumulative)}")
+        return lines
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def _register(self, metric: _Metric) -> Any:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"metric {metric.name} already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+
+class TimedProxy:
+    """Wrap an object so every public method call is observed in a histogram under a `method` label."""
+
+    def __init__(self, target: Any, histogram: Histogram):
+        self._target = target
+        self._histogram = histogram
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._target, name)
+        if name.startswith("_") or not callable(attr):
+            return attr
+
+        def timed(*args: Any, **kwargs: Any) -> Any:
+            with self._histogram.time(method=name):
+                return attr(*args, **kwargs)
+
+        return timed
+
+
+REGISTRY = Registry()
+
+TRANSLATOR_STAGE_SECONDS = REGISTRY.histogram(
+    "translator_stage_seconds",
+    "Time spent in each TranslatorService stage.",
+    ("stage", "mode", "model"),
+)
+MODEL_STAGE_SECONDS = REGISTRY.histogram(
+    "model_stage_seconds",
+    "Model call time per endpoint: HTTP request, structured-output parse, or a whole stream.",
+    ("stage", "model", "endpoint", "outcome"),
+)
+MODEL_TOKENS = REGISTRY.counter(
+    "model_tokens_total",
+    "Tokens reported in completion usage.",
+    ("model", "endpoint", "kind"),
+)
+MODEL_COST = REGISTRY.counter(
+    "model_cost_usd_total",
+    "Estimated spend from completion usage and the configured per-million-token prices.",
+    ("model", "endpoint"),
+)
+TASK_STAGE_SECONDS = REGISTRY.histogram(
+    "task_stage_seconds",
+    "Time spent hashing payloads in TaskService and in each stage of server-side task runs.",
+    ("operation", "stage"),
+)
+TASK_REPOSITORY_SECONDS = REGISTRY.histogram(
+    "task_repository_seconds",
+    "Time spent in each TaskRepository call made by TaskService.",
+    ("method",),
+)
+TRANSLATION_MEMORY_LOOKUPS = REGISTRY.counter(
+    "translation_memory_lookups_total",
+    "Translation memory lookups by outcome: reused a stored result, sent hints, or found nothing close.",
+    ("mode", "outcome"),
+)
+TASK_JOBS = REGISTRY.counter(
+    "task_jobs_total",
+    "Server-side task jobs by outcome: queued, retried, succeeded or failed.",
+    ("outcome",),
+)
+TASK_WEBHOOK_DELIVERIES = REGISTRY.counter(
+    "task_webhook_events_total",
+    "Task events sent to the webhook by outcome: delivered, retried or dropped.",
+    ("outcome",),
+)
@@ -0,0 +1,11 @@
+import unicodedata
+
+
+def _is_wide(char: str) -> bool:
+    return unicodedata.east_asian_width(char) in ("W", "F")
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate: one per CJK character, roughly four ASCII characters per token."""
+    wide = sum(1 for char in text if _is_wide(char))
+    return wide + (len(text) - wide + 3) // 4